@@ -0,0 +1,49 @@
+import json
+from typing import Dict, List
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for a streamed JSON array of objects.
+
+    Text can be fed in arbitrary chunks (as it arrives from the model);
+    every top-level object of the array is returned as soon as its closing
+    brace has been seen, without waiting for the rest of the array.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current: List[str] = None
+
+    def feed(self, text: str) -> List[Dict]:
+        completed = []
+        for char in text:
+            if self._current is not None:
+                self._current.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if char == "{" and self._depth == 2:
+                    self._current = [char]
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == 1 and self._current is not None:
+                    try:
+                        completed.append(json.loads("".join(self._current)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._current = None
+        return completed
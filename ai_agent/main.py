@@ -1,10 +1,14 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import logging
 import json
 import os
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from typing import List, Dict
+from json_stream import JSONArrayStreamParser
+from prompt_cache import PromptCache
 
 # --- Basic Configuration ---
 app = FastAPI()
@@ -18,6 +22,18 @@ if GEMINI_API_KEY:
 else:
     logger.warning("GEMINI_API_KEY not found. The /generate endpoint will not work.")
 
+# Seconds callers are told to wait when Gemini reports its quota is exhausted
+GEMINI_RETRY_AFTER = int(os.getenv("GEMINI_RETRY_AFTER", "10"))
+
+# --- Prompt Cache Configuration ---
+prompt_cache = PromptCache(
+    path=os.getenv("PROMPT_CACHE_DB_PATH", "./prompt_cache.db"),
+    ttl=float(os.getenv("PROMPT_CACHE_TTL", str(7 * 24 * 3600))),
+    maxsize=int(os.getenv("PROMPT_CACHE_MAXSIZE", "5000")),
+    # Distinct responses collected per prompt before hits are served from cache
+    variants=int(os.getenv("PROMPT_CACHE_VARIANTS", "3")),
+)
+
 class PromptRequest(BaseModel):
     prompt: str
 
@@ -58,13 +74,9 @@ Follow these rules strictly:
 ]
 """
 
-@app.post("/generate", response_model=List[Dict])
-async def generate(request: PromptRequest):
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=500, detail="Gemini API key is not configured on the server.")
-
+def build_model():
     # Use gemini-1.5-flash and enable JSON mode for reliable, structured output
-    model = genai.GenerativeModel(
+    return genai.GenerativeModel(
         'gemini-1.5-flash-latest',
         system_instruction=SYSTEM_PROMPT,
         generation_config=genai.types.GenerationConfig(
@@ -73,8 +85,29 @@ async def generate(request: PromptRequest):
         )
     )
 
+def build_user_prompt(prompt: str) -> str:
     # The user prompt is now simpler, as most instructions are in the system prompt
-    user_prompt = f"Create a playlist for the following request: \"{request.prompt}\""
+    return f"Create a playlist for the following request: \"{prompt}\""
+
+def quota_exceeded_error(e: Exception) -> HTTPException:
+    logger.warning(f"Gemini quota exhausted: {e}")
+    return HTTPException(
+        status_code=429,
+        detail="AI service rate limit reached, please retry later.",
+        headers={"Retry-After": str(GEMINI_RETRY_AFTER)}
+    )
+
+@app.post("/generate", response_model=List[Dict])
+async def generate(request: PromptRequest):
+    cached = prompt_cache.get(request.prompt)
+    if cached is not None:
+        return cached
+
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key is not configured on the server.")
+
+    model = build_model()
+    user_prompt = build_user_prompt(request.prompt)
 
     try:
         response = await model.generate_content_async(user_prompt)
@@ -82,8 +115,15 @@ async def generate(request: PromptRequest):
         # With JSON mode, the response text is clean JSON, so we can parse it directly.
         # No more manual string cleaning is needed!
         songs = json.loads(response.text)
+        prompt_cache.add(request.prompt, songs)
         return songs
 
+    except google_exceptions.ResourceExhausted as e:
+        # Rather serve a previous answer for this prompt than nothing
+        cached = prompt_cache.get(request.prompt, fallback=True)
+        if cached is not None:
+            return cached
+        raise quota_exceeded_error(e)
     except json.JSONDecodeError:
         logger.error(f"Failed to decode JSON from Gemini response. Response: {response.text}")
         raise HTTPException(status_code=500, detail="Failed to parse AI response.")
@@ -91,8 +131,62 @@ async def generate(request: PromptRequest):
         logger.error(f"An error occurred with the Gemini API: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred with the AI service: {str(e)}")
 
+@app.post("/generate/stream")
+async def generate_stream(request: PromptRequest):
+    """
+    Stream the recommended songs as NDJSON, one {"title", "artist"} object
+    per line, as soon as Gemini has finished writing each array element.
+    Errors after the stream has started are sent as an {"error"} line.
+    """
+    cached = prompt_cache.get(request.prompt)
+    if cached is not None:
+        return StreamingResponse(
+            (json.dumps(song) + "\n" for song in cached),
+            media_type="application/x-ndjson"
+        )
+
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key is not configured on the server.")
+
+    model = build_model()
+    try:
+        # Awaiting the call fetches the first chunk, so quota and auth
+        # errors still surface as proper HTTP errors
+        response = await model.generate_content_async(build_user_prompt(request.prompt), stream=True)
+    except google_exceptions.ResourceExhausted as e:
+        cached = prompt_cache.get(request.prompt, fallback=True)
+        if cached is not None:
+            return StreamingResponse(
+                (json.dumps(song) + "\n" for song in cached),
+                media_type="application/x-ndjson"
+            )
+        raise quota_exceeded_error(e)
+    except Exception as e:
+        logger.error(f"An error occurred with the Gemini API: {e}")
+        raise HTTPException(status_code=500, detail=f"An error occurred with the AI service: {str(e)}")
+
+    async def songs():
+        parser = JSONArrayStreamParser()
+        streamed = []
+        try:
+            async for chunk in response:
+                for song in parser.feed(chunk.text):
+                    if isinstance(song, dict) and song.get("title") and song.get("artist"):
+                        song = {"title": song["title"], "artist": song["artist"]}
+                        streamed.append(song)
+                        yield json.dumps(song) + "\n"
+        except Exception as e:
+            logger.error(f"Gemini stream failed: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+            return
+        # Only complete responses are worth caching
+        prompt_cache.add(request.prompt, streamed)
+
+    return StreamingResponse(songs(), media_type="application/x-ndjson")
+
 @app.get("/health")
 async def health_check():
     """Checks if the service is running and the API key is present."""
     if not GEMINI_API_KEY:
-        return {"status": "unhealthy", "reason": "GEMINI_API_KEY is not set"}
\ No newline at end of file
+        return {"status": "unhealthy", "reason": "GEMINI_API_KEY is not set", "prompt_cache": prompt_cache.stats()}
+    return {"status": "healthy", "prompt_cache": prompt_cache.stats()}
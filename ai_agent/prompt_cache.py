@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words that do not change what a playlist request is about
+FILLER_WORDS = {
+    "a", "an", "the", "some", "me", "my", "i", "please", "want", "need",
+    "give", "make", "create", "for", "of", "to", "with", "song", "songs",
+    "music", "track", "tracks", "playlist", "tunes",
+}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Reduce a prompt to a cache key: case, punctuation and filler words are
+    ignored, so "Give me happy party songs!" and "happy party" share one
+    entry. Word order and repeated words are kept, since "pop punk" and
+    "punk pop" are different requests.
+    """
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    words = re.sub(r"[^\w\s]", " ", text).split()
+    keywords = [word for word in words if word not in FILLER_WORDS]
+    return " ".join(keywords or words)
+
+
+class PromptCache:
+    """
+    Cache of Gemini playlists keyed on the normalized prompt. Each key
+    collects up to `variants` different responses; once it is full, hits
+    return a random one so repeated prompts still get some variety.
+
+    Entries live in an in-memory LRU in front of a SQLite file, so they
+    survive restarts. An entry expires `ttl` seconds after it was created.
+    """
+
+    def __init__(self, path: str, ttl: float, maxsize: int, variants: int):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.variants = variants
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prompt_cache ("
+            " key TEXT PRIMARY KEY,"
+            " responses TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+
+    def _load(self, key: str) -> Optional[tuple]:
+        entry = self._memory.get(key)
+        if entry is None:
+            row = self._conn.execute(
+                "SELECT responses, expires_at FROM prompt_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = (json.loads(row[0]), row[1])
+        if entry[1] <= time.time():
+            self._memory.pop(key, None)
+            self._conn.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, prompt: str, fallback: bool = False) -> Optional[List[Dict]]:
+        """
+        Return a cached response for the prompt, or None when Gemini should
+        be asked. Keys that have not collected all their variants yet count
+        as misses, unless `fallback` is set (e.g. Gemini is unavailable).
+        """
+        key = normalize_prompt(prompt)
+        try:
+            with self._lock:
+                entry = self._load(key)
+                if entry is not None:
+                    self._conn.execute(
+                        "UPDATE prompt_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Prompt cache read failed: {e}")
+            entry = None
+        if entry is None or (len(entry[0]) < self.variants and not fallback):
+            if not fallback:
+                self.misses += 1
+            return None
+        self.hits += 1
+        return random.choice(entry[0])
+
+    def add(self, prompt: str, songs: List[Dict]):
+        """Store a new response for the prompt, up to `variants` per key."""
+        if not songs:
+            return
+        key = normalize_prompt(prompt)
+        now = time.time()
+        try:
+            with self._lock:
+                entry = self._load(key)
+                responses, expires_at = entry if entry else ([], now + self.ttl)
+                if len(responses) >= self.variants or songs in responses:
+                    return
+                entry = (responses + [songs], expires_at)
+                self._remember(key, entry)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO prompt_cache (key, responses, expires_at, last_used)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(entry[0]), expires_at, now),
+                )
+                # Keep the file bounded too: drop expired and least recently used keys
+                cursor = self._conn.execute(
+                    "DELETE FROM prompt_cache WHERE expires_at <= ? OR key IN ("
+                    " SELECT key FROM prompt_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (now, self.maxsize),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+                self.stores += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Prompt cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM prompt_cache")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM prompt_cache").fetchone()[0]
+        return {
+            "size": size,
+            "in_memory": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
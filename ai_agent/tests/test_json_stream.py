@@ -0,0 +1,54 @@
+import json
+import pytest
+from json_stream import JSONArrayStreamParser
+
+SONGS = [
+    {"title": "Don't Stop Me Now", "artist": "Queen"},
+    {"title": "Say \"Hello\" {live}", "artist": "Back\\slash [band]"},
+    {"title": "Nested", "artist": "Someone", "tags": ["a", {"b": [1, 2]}], "meta": {"year": 1999}},
+]
+TEXT = json.dumps(SONGS, indent=2)
+
+def feed_all(parser, chunks):
+    results = []
+    for chunk in chunks:
+        results.extend(parser.feed(chunk))
+    return results
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(TEXT)])
+def test_objects_split_across_chunks(size):
+    chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+    assert feed_all(JSONArrayStreamParser(), chunks) == SONGS
+
+def test_split_at_every_boundary():
+    for cut in range(1, len(TEXT)):
+        assert feed_all(JSONArrayStreamParser(), [TEXT[:cut], TEXT[cut:]]) == SONGS
+
+def test_objects_are_returned_as_soon_as_they_close():
+    parser = JSONArrayStreamParser()
+    first = json.dumps(SONGS[0])
+    assert parser.feed("[" + first[:-1]) == []
+    assert parser.feed("}, {") == [SONGS[0]]
+
+def test_escaped_quotes_and_braces_inside_strings():
+    song = {"title": "}{ \\\" ][", "artist": "\"quoted\""}
+    assert JSONArrayStreamParser().feed(json.dumps([song])) == [song]
+
+def test_nested_objects_and_arrays_stay_inside_their_item():
+    assert JSONArrayStreamParser().feed(json.dumps(SONGS[2:])) == SONGS[2:]
+
+@pytest.mark.parametrize("wrapped", [
+    "Here are some songs you might like:\n" + TEXT,
+    "```json\n" + TEXT + "\n```",
+    "Sure! Here's your playlist:\n```json\n" + TEXT + "\n```\nEnjoy!",
+])
+def test_leading_prose_and_code_fences(wrapped):
+    assert JSONArrayStreamParser().feed(wrapped) == SONGS
+
+def test_truncated_final_object_is_dropped():
+    text = json.dumps(SONGS[:2])[:-1] + ', {"title": "Cut off", "art'
+    assert JSONArrayStreamParser().feed(text) == SONGS[:2]
+
+def test_invalid_object_is_skipped():
+    text = '[{"title": "Bad", "artist": }, {"title": "Good", "artist": "Band"}]'
+    assert JSONArrayStreamParser().feed(text) == [{"title": "Good", "artist": "Band"}]
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from prompt_cache import PromptCache, normalize_prompt
+
+SONGS_A = [{"title": "Happy", "artist": "Pharrell Williams"}]
+SONGS_B = [{"title": "Uptown Funk", "artist": "Mark Ronson"}]
+
+@pytest.fixture
+def clock():
+    with patch("prompt_cache.time.time") as now:
+        now.return_value = 1000.0
+        yield now
+
+def make_cache(tmp_path, **kwargs):
+    options = {"ttl": 60, "maxsize": 10, "variants": 2}
+    options.update(kwargs)
+    return PromptCache(str(tmp_path / "prompt_cache.db"), **options)
+
+def test_normalize_drops_case_punctuation_and_fillers():
+    assert normalize_prompt("Give me some HAPPY party songs!") == "happy party"
+    assert normalize_prompt("happy, party") == "happy party"
+    assert normalize_prompt("Ｈappy party") == "happy party"
+
+def test_normalize_keeps_word_order_and_repeats():
+    assert normalize_prompt("pop punk") != normalize_prompt("punk pop")
+    assert normalize_prompt("rock and rock") == "rock and rock"
+    # A prompt made only of fillers still gets a key of its own
+    assert normalize_prompt("Give me songs") == "give me songs"
+
+def test_key_collects_variants_before_hitting(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.add("Happy party songs!", SONGS_A)
+    assert cache.get("happy party") is None
+    # Only usable while Gemini is down
+    assert cache.get("happy party", fallback=True) == SONGS_A
+
+    cache.add("happy party", SONGS_A)  # duplicates do not count
+    assert cache.get("happy party") is None
+    cache.add("happy party", SONGS_B)
+    assert cache.get("happy party") in (SONGS_A, SONGS_B)
+
+    cache.add("happy party", [{"title": "Extra", "artist": "Nobody"}])
+    assert cache.stats()["stores"] == 2
+    assert cache.stats()["hits"] == 2
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, variants=1)
+    cache.add("chill jazz", SONGS_A)
+    clock.return_value += 59
+    assert cache.get("chill jazz") == SONGS_A
+
+    clock.return_value += 2
+    assert cache.get("chill jazz") is None
+    assert cache.stats()["size"] == 0
+
+def test_entries_survive_restart(tmp_path, clock):
+    make_cache(tmp_path, variants=1).add("chill jazz", SONGS_A)
+    assert make_cache(tmp_path, variants=1).get("chill jazz") == SONGS_A
+
+def test_disk_evicts_least_recently_used(tmp_path, clock):
+    cache = make_cache(tmp_path, maxsize=2, variants=1)
+    cache.add("first", SONGS_A)
+    clock.return_value += 1
+    cache.add("second", SONGS_A)
+    clock.return_value += 1
+    assert cache.get("first") == SONGS_A
+    clock.return_value += 1
+    cache.add("third", SONGS_B)
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+    # A fresh instance only sees the file
+    reopened = make_cache(tmp_path, maxsize=2, variants=1)
+    assert reopened.get("first") == SONGS_A
+    assert reopened.get("second") is None
+    assert reopened.get("third") == SONGS_B
@@ -1,22 +1,42 @@
-import httpx
-from typing import Dict,List
+from typing import AsyncIterator, Dict, List
+import json
 import logging
 from schemas.quiz import QuizRequest
+from utils.config import settings
+from utils.http_client import request, stream
 
 logger = logging.getLogger(__name__)
 
 class AIAgentClient:
-    def __init__(self, base_url: str = "http://ai_agent:8003"):
-        self.base_url = base_url
+    def __init__(self, base_url: str = None):
+        self.base_url = base_url or settings.AI_AGENT_URL
 
     async def generate(self, prompt: str) -> Dict:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.base_url}/generate",
-                json={"prompt": prompt}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await request(
+            "ai_agent", "POST",
+            f"{self.base_url}/generate",
+            json={"prompt": prompt}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[Dict]:
+        """Yield each {"title", "artist"} song as soon as the agent emits it."""
+        async with stream(
+            "ai_agent", "POST",
+            f"{self.base_url}/generate/stream",
+            json={"prompt": prompt}
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                song = json.loads(line)
+                if "error" in song:
+                    raise Exception(f"AI agent stream error: {song['error']}")
+                yield song
         
 def build_prompt_from_quiz(data: QuizRequest) -> str:
     genre_text = ", ".join(data.preferred_genres)
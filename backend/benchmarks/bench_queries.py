@@ -0,0 +1,139 @@
+"""
+Benchmark for the playlist query paths before and after the indexing
+migration (0002).
+
+Creates a SQLite database at the pre-index schema (revision 0001), fills
+it with synthetic users, playlists, favorites and tracks, then prints
+query plans and latency percentiles for the statements the playlist CRUD
+runs. It then upgrades to head and measures again.
+
+    cd backend && python benchmarks/bench_queries.py [tracks]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.dialects import sqlite  # noqa: E402
+from db.crud.playlist import favorited_by, playlist_crud  # noqa: E402
+from db.crud.track import TRACK_COLUMNS  # noqa: E402
+from db.migrate import upgrade_database  # noqa: E402
+from db.models import Playlist, Track  # noqa: E402
+
+TRACKS_PER_PLAYLIST = 20
+PLAYLISTS_PER_USER = 5
+FAVORITES_PER_USER = 10
+# Unindexed queries at 1M tracks can run for minutes; stop them after this
+QUERY_TIMEOUT = 10.0
+
+
+def sql(statement) -> str:
+    return str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def queries(user_id: int, playlist_id: int):
+    """The statements behind /my-playlists, /favorites and /playlist/{id}"""
+    return {
+        "my playlists": playlist_crud._summary_query(user_id).where(Playlist.user_id == user_id),
+        "favorites": playlist_crud._favorite_summary_query(user_id),
+        "detail tracks": select(*TRACK_COLUMNS).where(Track.playlist_id == playlist_id).order_by(Track.id),
+        "is favorite": select(favorited_by(user_id)).where(Playlist.id == playlist_id),
+    }
+
+
+def populate(conn: sqlite3.Connection, tracks: int, rng: random.Random):
+    playlists = max(1, tracks // TRACKS_PER_PLAYLIST)
+    users = max(1, playlists // PLAYLISTS_PER_USER)
+    conn.executemany(
+        "INSERT INTO users (id, username, email, hashed_password) VALUES (?, ?, ?, 'x')",
+        ((i, f"user{i}", f"user{i}@example.com") for i in range(1, users + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO playlists (id, name, user_id) VALUES (?, ?, ?)",
+        ((i, f"playlist {i}", rng.randint(1, users)) for i in range(1, playlists + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO user_favorites (user_id, playlist_id) VALUES (?, ?)",
+        ((user, rng.randint(1, playlists)) for user in range(1, users + 1) for _ in range(FAVORITES_PER_USER)),
+    )
+    conn.executemany(
+        "INSERT INTO tracks (id, name, artist, playlist_id) VALUES (?, ?, ?, ?)",
+        ((i, f"track {i}", f"artist {i % 5000}", rng.randint(1, playlists)) for i in range(1, tracks + 1)),
+    )
+    conn.commit()
+    return users, playlists
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def timed(conn: sqlite3.Connection, text: str) -> float:
+    """Milliseconds to run `text`, or infinity if it hit QUERY_TIMEOUT"""
+    deadline = time.perf_counter() + QUERY_TIMEOUT
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10000)
+    start = time.perf_counter()
+    try:
+        conn.execute(text).fetchall()
+    except sqlite3.OperationalError:
+        return float("inf")
+    finally:
+        conn.set_progress_handler(None, 0)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(conn: sqlite3.Connection, users: int, playlists: int, samples: int, rng: random.Random):
+    plans = {name: conn.execute(f"EXPLAIN QUERY PLAN {sql(statement)}").fetchall()
+             for name, statement in queries(1, 1).items()}
+    latencies = {name: [] for name in plans}
+    for _ in range(samples):
+        for name, statement in queries(rng.randint(1, users), rng.randint(1, playlists)).items():
+            # Once a query times out, further samples would only repeat that
+            if latencies[name] and latencies[name][-1] == float("inf"):
+                continue
+            latencies[name].append(timed(conn, sql(statement)))
+
+    for name, plan in plans.items():
+        print(f"  {name}")
+        for row in plan:
+            print(f"    plan: {row[3]}")
+        if latencies[name][-1] == float("inf"):
+            print(f"    timed out after {QUERY_TIMEOUT:.0f} s")
+        else:
+            print(f"    p50 {percentile(latencies[name], 0.50):9.3f} ms   p99 {percentile(latencies[name], 0.99):9.3f} ms")
+
+
+def main(tracks: int = 1_000_000):
+    rng = random.Random(42)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite:///{path}"
+    upgrade_database(url, "0001")
+
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    users, playlists = populate(conn, tracks, rng)
+    print(f"data:    {tracks} tracks, {playlists} playlists, {users} users ({time.perf_counter() - start:.1f}s)")
+
+    print("before (revision 0001):")
+    measure(conn, users, playlists, 5, rng)
+    conn.close()
+
+    start = time.perf_counter()
+    upgrade_database(url)
+    print(f"migration to head: {time.perf_counter() - start:.1f}s")
+
+    conn = sqlite3.connect(path)
+    print("after (head):")
+    measure(conn, users, playlists, 500, rng)
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for the /suggest prefix index.
+
+Builds an index at the configured size cap from synthetic tracks and
+artists, then reports lookup latency percentiles for typed prefixes of
+every length and the memory the index holds.
+
+    cd backend && python benchmarks/bench_suggest.py [entries]
+"""
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suggest_index import PrefixIndex, TRACK, ARTIST  # noqa: E402
+
+LATENCY_BUDGET_MS = 5.0
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def synthetic_suggestions(count: int, rng: random.Random):
+    artists = [" ".join(word(rng) for _ in range(rng.randint(1, 3))) for _ in range(count // 10)]
+    for artist in artists:
+        yield ARTIST, None, artist, rng.randint(1, 1000)
+    for _ in range(count - len(artists)):
+        title = " ".join(word(rng) for _ in range(rng.randint(1, 4)))
+        yield TRACK, title, rng.choice(artists), rng.randint(1, 1000)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(entries: int = 50000, queries: int = 20000):
+    rng = random.Random(42)
+    suggestions = list(synthetic_suggestions(entries, rng))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = PrefixIndex.build(suggestions, max_entries=entries)
+    build_seconds = time.perf_counter() - start
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    # Prefixes as typed: the first 1..n characters of known titles and artists
+    texts = [title or artist for _, title, artist, _ in suggestions]
+    prefixes = []
+    for _ in range(queries):
+        text = rng.choice(texts)
+        prefixes.append(text[:rng.randint(1, len(text))])
+
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.suggest(prefix, 8)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    incremental = []
+    for _ in range(1000):
+        start = time.perf_counter()
+        index.add(TRACK, word(rng), word(rng), rng.randint(1, 1000))
+        incremental.append((time.perf_counter() - start) * 1000)
+
+    p99 = percentile(latencies, 0.99)
+    print(f"entries:        {len(index)} suggestions, {index.stats()['keys']} keys")
+    print(f"build:          {build_seconds:.2f}s")
+    print(f"memory:         {memory_mb:.1f} MiB")
+    print(f"lookup p50:     {percentile(latencies, 0.50):.3f} ms")
+    print(f"lookup p99:     {p99:.3f} ms")
+    print(f"lookup max:     {max(latencies):.3f} ms")
+    print(f"add p99:        {percentile(incremental, 0.99):.3f} ms")
+    if p99 > LATENCY_BUDGET_MS:
+        print(f"FAIL: p99 above {LATENCY_BUDGET_MS} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000))
@@ -0,0 +1,161 @@
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.crud.catalog import catalog_crud
+from db.crud.track import track_crud
+from db.models.catalog import CatalogTrack
+from db.session import SessionLocal
+from fuzzy_matcher import track_matcher
+from search_index import search_index
+from utils.cache import normalize_query
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FIELDS = ("title", "artist", "mbid", "url", "image", "youtube_video_id")
+
+
+def catalog_key(title: str, artist: str) -> str:
+    return f"{normalize_query(title)}|{normalize_query(artist)}"
+
+
+def _as_dict(entry: CatalogTrack) -> Dict:
+    return {field: getattr(entry, field) for field in CATALOG_FIELDS}
+
+
+class TrackCatalog:
+    """
+    Our own record of every track we have resolved, keyed by normalized
+    (title, artist). Resolution paths read it before calling Last.fm,
+    Deezer or YouTube and write whatever they learn back into it.
+
+    A catalog failure is logged and treated as a miss, never as an error.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = None, max_age: float = None):
+        self.session_factory = session_factory or SessionLocal
+        self.max_age = timedelta(seconds=max_age or settings.CATALOG_MAX_AGE)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _is_fresh(self, entry: CatalogTrack) -> bool:
+        refreshed_at = entry.refreshed_at
+        if refreshed_at.tzinfo is None:
+            # SQLite hands datetimes back without their timezone
+            refreshed_at = refreshed_at.replace(tzinfo=UTC)
+        return datetime.now(UTC) - refreshed_at <= self.max_age
+
+    async def _lookup_many(self, keys: List[str]) -> Dict[str, Dict]:
+        async with self.session_factory() as db:
+            entries = await catalog_crud.get_many(db, keys)
+            return {key: _as_dict(entry) for key, entry in entries.items() if self._is_fresh(entry)}
+
+    async def lookup_many(self, pairs: List[Tuple[str, str]], field: str = None) -> List[Optional[Dict]]:
+        """
+        Return the catalog entry (or None) for each (title, artist) pair, in
+        input order. With `field`, entries missing that field count as misses.
+        """
+        keys = [catalog_key(title, artist) for title, artist in pairs]
+        try:
+            found = await self._lookup_many(keys)
+        except Exception as e:
+            logger.warning(f"Catalog lookup failed: {str(e)}")
+            found = {}
+        entries = []
+        for key in keys:
+            entry = found.get(key)
+            if entry is not None and (field is None or entry.get(field)):
+                self.hits += 1
+                entries.append(entry)
+            else:
+                self.misses += 1
+                entries.append(None)
+        return entries
+
+    async def lookup(self, title: str, artist: str, field: str = None) -> Optional[Dict]:
+        return (await self.lookup_many([(title, artist)], field=field))[0]
+
+    async def _remember(self, entries: List[Tuple[List[str], str, str, Dict]]):
+        async with self.session_factory() as db:
+            for keys, title, artist, fields in entries:
+                for key in keys:
+                    await catalog_crud.upsert(db, key, title, artist, **fields)
+        search_index.add_many(
+            {"title": title, "artist": artist, "image": fields.get("image")}
+            for _, title, artist, fields in entries
+        )
+        for _, title, artist, fields in entries:
+            if fields.get("image"):
+                track_matcher.add(title, artist, fields["image"])
+
+    async def remember_many(self, entries: List[Dict]):
+        """
+        Store what was learned about tracks. Each entry holds the canonical
+        "title" and "artist", optionally the (title, artist) "query" the
+        track was looked up by, and any other catalog fields.
+        """
+        rows = []
+        for entry in entries:
+            fields = dict(entry)
+            title, artist, query = fields.pop("title"), fields.pop("artist"), fields.pop("query", None)
+            keys = [catalog_key(title, artist)]
+            if query is not None and catalog_key(*query) not in keys:
+                keys.append(catalog_key(*query))
+            rows.append((keys, title, artist, fields))
+        if not rows:
+            return
+        try:
+            await self._remember(rows)
+            self.writes += sum(len(keys) for keys, *_ in rows)
+        except Exception as e:
+            logger.warning(f"Catalog write failed: {str(e)}")
+
+    async def remember(self, title: str, artist: str, query: Tuple[str, str] = None, **fields):
+        """Store one track under its canonical title and artist and the query it was looked up by."""
+        await self.remember_many([dict(fields, title=title, artist=artist, query=query)])
+
+    async def _forget(self, field: str, key: Optional[str]) -> int:
+        async with self.session_factory() as db:
+            return await catalog_crud.clear_field(db, field, key)
+
+    async def forget(self, field: str, title: str = None, artist: str = None) -> bool:
+        """Drop a field (e.g. a wrong video ID) for one track, or for all tracks."""
+        key = None if title is None and artist is None else catalog_key(title or "", artist or "")
+        try:
+            return await self._forget(field, key) > 0
+        except Exception as e:
+            logger.warning(f"Catalog update failed: {str(e)}")
+            return False
+
+    async def _reindex(self) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(select(CatalogTrack.title, CatalogTrack.artist, CatalogTrack.image))
+            entries = result.all()
+            saved = await track_crud.get_saved_track_counts(db)
+        search_index.rebuild(
+            ({"title": t, "artist": a, "image": i} for t, a, i in entries),
+            ({"title": t, "artist": a, "saves": count} for t, a, count in saved),
+        )
+        track_matcher.add_many({"title": t, "artist": a, "image": i} for t, a, i in entries if i)
+        return len(entries) + len(saved)
+
+    async def reindex(self):
+        """Load every catalog entry and saved track into the search index and fuzzy matcher."""
+        try:
+            count = await self._reindex()
+            logger.info(f"Search index loaded with {count} tracks")
+        except Exception as e:
+            logger.warning(f"Search index rebuild failed: {str(e)}")
+
+    async def clear(self):
+        async with self.session_factory() as db:
+            await catalog_crud.clear(db)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+track_catalog = TrackCatalog()
@@ -0,0 +1,65 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import datetime, UTC
+from db.models.catalog import CatalogTrack
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CatalogCRUD:
+    async def get_by_key(self, db: AsyncSession, key: str) -> Optional[CatalogTrack]:
+        result = await db.execute(select(CatalogTrack).where(CatalogTrack.key == key))
+        return result.scalars().first()
+
+    async def get_many(self, db: AsyncSession, keys: List[str]) -> Dict[str, CatalogTrack]:
+        if not keys:
+            return {}
+        result = await db.execute(select(CatalogTrack).where(CatalogTrack.key.in_(set(keys))))
+        return {row.key: row for row in result.scalars().all()}
+
+    async def upsert(self, db: AsyncSession, key: str, title: str, artist: str, **fields) -> CatalogTrack:
+        """Create or refresh a catalog entry; fields given as None keep their stored value."""
+        try:
+            try:
+                return await self._upsert(db, key, title, artist, fields)
+            except IntegrityError:
+                # Another request inserted the same key first; update that row
+                await db.rollback()
+                return await self._upsert(db, key, title, artist, fields)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error updating catalog entry {key}: {str(e)}")
+            raise
+
+    async def _upsert(self, db: AsyncSession, key: str, title: str, artist: str, fields: Dict) -> CatalogTrack:
+        entry = await self.get_by_key(db, key)
+        if entry is None:
+            entry = CatalogTrack(key=key, title=title, artist=artist)
+            db.add(entry)
+        else:
+            entry.title = title
+            entry.artist = artist
+        for name, value in fields.items():
+            if value is not None:
+                setattr(entry, name, value)
+        entry.refreshed_at = datetime.now(UTC)
+        await db.commit()
+        return entry
+
+    async def clear_field(self, db: AsyncSession, field: str, key: str = None) -> int:
+        """Forget one field of an entry, or of every entry when no key is given."""
+        statement = update(CatalogTrack).where(getattr(CatalogTrack, field).isnot(None))
+        if key is not None:
+            statement = statement.where(CatalogTrack.key == key)
+        result = await db.execute(statement.values({field: None}).execution_options(synchronize_session=False))
+        await db.commit()
+        return result.rowcount
+
+    async def clear(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(CatalogTrack))
+        await db.commit()
+        return result.rowcount
+
+catalog_crud = CatalogCRUD()
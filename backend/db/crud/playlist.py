@@ -1,13 +1,38 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from collections import Counter
 from typing import List, Optional
 from db.models.playlist import Playlist
+from db.models.track import Track
+from db.crud.track import TRACK_COLUMNS, track_crud
+from db.models.user import user_favorites
 from schemas.playlist import PlaylistCreate, PlaylistUpdate
+from schemas.track import TrackBase
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Relationships the routes read; async sessions cannot lazy load them later.
+# Favoriters are never loaded: favorite checks go through favorited_by()
+WITH_RELATIONS = (selectinload(Playlist.tracks),)
+
+def track_key(track) -> tuple:
+    return track.name, track.artist, track.url
+
+def favorited_by(user_id: int):
+    """EXISTS clause: the playlist is one of `user_id`'s favorites"""
+    return exists().where(
+        user_favorites.c.playlist_id == Playlist.id,
+        user_favorites.c.user_id == user_id,
+    )
+
 class PlaylistCRUD:
-    def create_playlist(self, db: Session, playlist: PlaylistCreate, user_id: int) -> Playlist:
+    async def create_playlist(self, db: AsyncSession, playlist: PlaylistCreate, user_id: int) -> dict:
+        """
+        Save a playlist and its tracks in one transaction and return the
+        PlaylistOut fields
+        """
         try:
             logger.debug(f"Creating playlist '{playlist.name}' for user {user_id}")
             
@@ -19,21 +44,26 @@ class PlaylistCRUD:
             )
             
             db.add(db_playlist)
-            db.commit()
-            db.refresh(db_playlist)
+            await db.flush()
+            tracks = await track_crud.insert_tracks(db, db_playlist.id, playlist.tracks)
+            await db.commit()
             
-            logger.info(f"Successfully created playlist {db_playlist.id}")
-            return db_playlist
+            logger.info(f"Successfully created playlist {db_playlist.id} with {len(tracks)} tracks")
+            # Read back like GET /playlist/{id}, so both return the stored values
+            return await self.get_playlist_detail(db, db_playlist.id, user_id)
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error creating playlist: {str(e)}", exc_info=True)
             raise
         
-    def get_playlist(self, db: Session, playlist_id: int) -> Optional[Playlist]:
+    async def get_playlist(self, db: AsyncSession, playlist_id: int) -> Optional[Playlist]:
         try:
             logger.debug(f"Attempting to fetch playlist with ID: {playlist_id}")
-            playlist = db.query(Playlist).filter(Playlist.id == playlist_id).first()
+            result = await db.execute(
+                select(Playlist).options(*WITH_RELATIONS).where(Playlist.id == playlist_id)
+            )
+            playlist = result.scalars().first()
             if playlist:
                 logger.info(f"Found playlist: {playlist.id}")
             else:
@@ -44,61 +74,166 @@ class PlaylistCRUD:
             raise
 
 
-    def get_user_playlists(self, db: Session, user_id: int) -> List[Playlist]:
-        return db.query(Playlist).filter(Playlist.user_id == user_id).all()
+    async def get_playlist_owner(self, db: AsyncSession, playlist_id: int) -> Optional[int]:
+        """The owner's user ID, or None when the playlist does not exist"""
+        result = await db.execute(select(Playlist.user_id).where(Playlist.id == playlist_id))
+        return result.scalar()
+
+    async def get_playlist_detail(self, db: AsyncSession, playlist_id: int, viewer_id: int) -> Optional[dict]:
+        """
+        PlaylistOut fields for `viewer_id` in two queries: the playlist with
+        its favorite flag, then its tracks as plain rows.
+        """
+        result = await db.execute(
+            select(
+                Playlist.id,
+                Playlist.name,
+                Playlist.description,
+                Playlist.created_at,
+                Playlist.user_id,
+                favorited_by(viewer_id).label("is_favorite"),
+            ).where(Playlist.id == playlist_id)
+        )
+        playlist = result.mappings().first()
+        if playlist is None:
+            return None
+        tracks = await db.execute(
+            select(*TRACK_COLUMNS).where(Track.playlist_id == playlist_id).order_by(Track.id)
+        )
+        return dict(playlist, tracks=[dict(track) for track in tracks.mappings().all()])
+
+    def _summary_query(self, viewer_id: int):
+        """
+        Summary columns for playlists as seen by `viewer_id`, in one statement:
+        counts and the favorite flag are subqueries, so no collection is loaded.
+        """
+        track_count = (
+            select(func.count(Track.id))
+            .where(Track.playlist_id == Playlist.id)
+            .scalar_subquery()
+        )
+        favorite_count = (
+            select(func.count())
+            .select_from(user_favorites)
+            .where(user_favorites.c.playlist_id == Playlist.id)
+            .scalar_subquery()
+        )
+        return select(
+            Playlist.id,
+            Playlist.name,
+            Playlist.description,
+            Playlist.created_at,
+            track_count.label("track_count"),
+            favorite_count.label("favorite_count"),
+            favorited_by(viewer_id).label("is_favorite"),
+        ).order_by(Playlist.id)
+
+    def _favorite_summary_query(self, user_id: int):
+        # Driven from the user's favorites (a primary key range), not a scan of all playlists
+        favorites = select(user_favorites.c.playlist_id).where(user_favorites.c.user_id == user_id)
+        return self._summary_query(user_id).where(Playlist.id.in_(favorites))
+
+    async def get_user_playlist_summaries(self, db: AsyncSession, user_id: int) -> List[dict]:
+        """Summaries of the playlists owned by `user_id`"""
+        result = await db.execute(self._summary_query(user_id).where(Playlist.user_id == user_id))
+        return [dict(row) for row in result.mappings().all()]
 
-    def update_playlist(self, db: Session, playlist_id: int, playlist: PlaylistUpdate) -> Optional[Playlist]:
-        db_playlist = self.get_playlist(db, playlist_id)
+    async def update_playlist(self, db: AsyncSession, playlist_id: int, playlist: PlaylistUpdate) -> Optional[List[TrackBase]]:
+        """
+        Update the playlist's fields and, when tracks are given, replace its
+        tracks with them. Returns the tracks that were not in the playlist
+        before, or None when the playlist does not exist.
+        """
+        db_playlist = await db.get(Playlist, playlist_id)
         if not db_playlist:
             return None
         
-        for key, value in playlist.dict(exclude_unset=True).items():
+        changes = playlist.model_dump(exclude_unset=True)
+        changes.pop("tracks", None)
+        for key, value in changes.items():
             setattr(db_playlist, key, value)
         
         try:
-            db.commit()
-            db.refresh(db_playlist)
-            return db_playlist
+            added = []
+            if playlist.tracks is not None:
+                added = await self._sync_tracks(db, playlist_id, playlist.tracks)
+            await db.commit()
+            return added
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating playlist: {str(e)}")
             raise
 
-    def favorite_playlist(self, db: Session, playlist_id: int, user) -> bool:
-        playlist = self.get_playlist(db, playlist_id)
-        if not playlist:
+    async def _sync_tracks(self, db: AsyncSession, playlist_id: int, tracks: List[TrackBase]) -> List[TrackBase]:
+        """
+        Make the stored tracks equal `tracks`, in order. Track order is row
+        order, so the common leading tracks keep their rows and everything
+        from the first difference on is deleted and inserted again.
+        """
+        result = await db.execute(select(*TRACK_COLUMNS).where(Track.playlist_id == playlist_id).order_by(Track.id))
+        stored = result.all()
+
+        same = 0
+        while same < min(len(stored), len(tracks)) and track_key(stored[same]) == track_key(tracks[same]):
+            same += 1
+
+        if same < len(stored):
+            await db.execute(delete(Track).where(Track.id.in_([track.id for track in stored[same:]])))
+        await track_crud.insert_tracks(db, playlist_id, tracks[same:])
+
+        # Tracks moved within the playlist are not new
+        known = Counter(track_key(track) for track in stored)
+        added = []
+        for track in tracks:
+            key = track_key(track)
+            if known[key]:
+                known[key] -= 1
+            else:
+                added.append(track)
+        return added
+
+    async def is_favorite(self, db: AsyncSession, playlist_id: int, user_id: int) -> bool:
+        result = await db.execute(select(favorited_by(user_id)).where(Playlist.id == playlist_id))
+        return bool(result.scalar())
+
+    async def favorite_playlist(self, db: AsyncSession, playlist_id: int, user) -> bool:
+        if not await db.get(Playlist, playlist_id):
             return False
-        if user not in playlist.favorited_by:
-            playlist.favorited_by.append(user)
-            db.commit()
+        if not await self.is_favorite(db, playlist_id, user.id):
+            await db.execute(insert(user_favorites).values(user_id=user.id, playlist_id=playlist_id))
+            await db.commit()
         return True
     
-    def unfavorite_playlist(self, db: Session, playlist_id: int, user) -> bool:
-        playlist = self.get_playlist(db, playlist_id)
-        if not playlist:
+    async def unfavorite_playlist(self, db: AsyncSession, playlist_id: int, user) -> bool:
+        if not await db.get(Playlist, playlist_id):
             return False
-        if user in playlist.favorited_by:
-            playlist.favorited_by.remove(user)
-            db.commit()
+        await db.execute(
+            delete(user_favorites).where(
+                user_favorites.c.playlist_id == playlist_id,
+                user_favorites.c.user_id == user.id,
+            )
+        )
+        await db.commit()
         return True
     
-    def get_my_favorite_playlists(seld,db: Session, user_id: int):
-        return db.query(Playlist).filter(Playlist.favorited_by.any(id=user_id)).all()
+    async def get_favorite_playlist_summaries(self, db: AsyncSession, user_id: int) -> List[dict]:
+        """Summaries of the playlists `user_id` has favorited"""
+        result = await db.execute(self._favorite_summary_query(user_id))
+        return [dict(row) for row in result.mappings().all()]
 
-    def delete_playlist(self, db: Session, playlist_id: int) -> bool:
-        db_playlist = self.get_playlist(db, playlist_id)
+    async def delete_playlist(self, db: AsyncSession, playlist_id: int) -> bool:
+        db_playlist = await self.get_playlist(db, playlist_id)
         if not db_playlist:
             return False
         
         try:
-            db.delete(db_playlist)
-            db.commit()
+            await db.delete(db_playlist)
+            await db.commit()
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting playlist: {str(e)}")
             raise
         
 
 playlist_crud = PlaylistCRUD()
-
@@ -1,13 +1,17 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from db.models.track import Track
-from schemas.track import TrackCreate
+from schemas.track import TrackBase, TrackCreate
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Track columns of TrackOut, read as plain rows
+TRACK_COLUMNS = (Track.id, Track.name, Track.artist, Track.url, Track.playlist_id)
+
 class TrackCRUD:
-    def add_track_to_playlist(self, db: Session, track: TrackCreate) -> Track:
+    async def add_track_to_playlist(self, db: AsyncSession, track: TrackCreate) -> Track:
         try:
             db_track = Track(
                 name=track.name,
@@ -16,28 +20,59 @@ class TrackCRUD:
                 playlist_id=track.playlist_id
             )
             db.add(db_track)
-            db.commit()
-            db.refresh(db_track)
+            await db.commit()
+            await db.refresh(db_track)
             return db_track
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error adding track: {str(e)}")
             raise
 
-    def remove_track(self, db: Session, track_id: int) -> bool:
+    async def insert_tracks(self, db: AsyncSession, playlist_id: int, tracks: List[TrackBase]) -> List[dict]:
+        """Insert tracks with one batched INSERT in the caller's transaction"""
+        if not tracks:
+            return []
+        result = await db.execute(
+            insert(Track).returning(*TRACK_COLUMNS),
+            [dict(track.model_dump(), playlist_id=playlist_id) for track in tracks],
+        )
+        # IDs are handed out in VALUES order; asking the driver to sort
+        # RETURNING rows would split the INSERT into one per row
+        return sorted((dict(row) for row in result.mappings().all()), key=lambda row: row["id"])
+
+    async def add_tracks_to_playlist(self, db: AsyncSession, playlist_id: int, tracks: List[TrackBase]) -> List[dict]:
+        """Insert tracks with one batched INSERT and one commit; either all are saved or none"""
         try:
-            track = db.query(Track).filter(Track.id == track_id).first()
+            rows = await self.insert_tracks(db, playlist_id, tracks)
+            await db.commit()
+            return rows
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error adding tracks: {str(e)}")
+            raise
+
+    async def remove_track(self, db: AsyncSession, track_id: int) -> bool:
+        try:
+            track = await self.get_track(db, track_id)
             if track:
-                db.delete(track)
-                db.commit()
+                await db.delete(track)
+                await db.commit()
                 return True
             return False
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error removing track: {str(e)}")
             raise
 
-    def get_track(self, db: Session, track_id: int) -> Optional[Track]:
-        return db.query(Track).filter(Track.id == track_id).first()
+    async def get_track(self, db: AsyncSession, track_id: int) -> Optional[Track]:
+        return await db.get(Track, track_id)
+
+    async def get_saved_track_counts(self, db: AsyncSession) -> List[Tuple[str, str, int]]:
+        """(name, artist, number of playlists it was saved to) for every saved track"""
+        result = await db.execute(
+            select(Track.name, Track.artist, func.count(Track.id))
+            .group_by(Track.name, Track.artist)
+        )
+        return [tuple(row) for row in result.all()]
 
-track_crud = TrackCRUD()
\ No newline at end of file
+track_crud = TrackCRUD()
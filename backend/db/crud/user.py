@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import Optional, List
 from db.models.user import User
+from db.models.playlist import Playlist
 from schemas.user import UserCreate
 from passlib.context import CryptContext
 from utils.security import get_password_hash
@@ -10,8 +13,14 @@ logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# UserOut includes the user's playlists and favorites with their tracks
+WITH_PLAYLISTS = (
+    selectinload(User.playlists).selectinload(Playlist.tracks),
+    selectinload(User.favorites).selectinload(Playlist.tracks),
+)
+
 class UserCRUD:
-    def create_user(self, db: Session, user: UserCreate) -> User:
+    async def create_user(self, db: AsyncSession, user: UserCreate) -> User:
         try:
             hashed_password = get_password_hash(user.password)
             db_user = User(
@@ -22,46 +31,51 @@ class UserCRUD:
                 hashed_password=hashed_password
             )
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
-            return db_user
+            await db.commit()
+            return await self.get_user(db, db_user.id)
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error creating user: {str(e)}", exc_info=True)
             raise
 
-    def get_user(self, db: Session, user_id: int) -> Optional[User]:
-        return db.query(User).filter(User.id == user_id).first()
+    async def get_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        result = await db.execute(select(User).options(*WITH_PLAYLISTS).where(User.id == user_id))
+        return result.scalars().first()
 
-    def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+    async def get_user_by_email(self, db: AsyncSession, email: str, with_playlists: bool = False) -> Optional[User]:
+        query = select(User).where(User.email == email)
+        if with_playlists:
+            query = query.options(*WITH_PLAYLISTS)
+        result = await db.execute(query)
+        return result.scalars().first()
     
-    def get_user_by_username(self, db: Session, username: str) -> Optional[User]:
-        return db.query(User).filter(User.username == username).first()
+    async def get_user_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
 
-    def get_users(self, db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-        return db.query(User).offset(skip).limit(limit).all()
+    async def get_users(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
+        result = await db.execute(select(User).options(*WITH_PLAYLISTS).offset(skip).limit(limit))
+        return list(result.scalars().all())
 
-    def update_user(self, db: Session, user_id: int, user_data: dict) -> Optional[User]:
-        db_user = self.get_user(db, user_id)
+    async def update_user(self, db: AsyncSession, user_id: int, user_data: dict) -> Optional[User]:
+        db_user = await self.get_user(db, user_id)
         if not db_user:
             return None
         
         for key, value in user_data.items():
             setattr(db_user, key, value)
         
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
         return db_user
 
-    def delete_user(self, db: Session, user_id: int) -> bool:
-        db_user = self.get_user(db, user_id)
+    async def delete_user(self, db: AsyncSession, user_id: int) -> bool:
+        db_user = await self.get_user(db, user_id)
         if not db_user:
             return False
         
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
         return True
 
 # Create a single instance to be used throughout the app
-user_crud = UserCRUD()
\ No newline at end of file
+user_crud = UserCRUD()
@@ -0,0 +1,23 @@
+import os
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def alembic_config(url: str = None) -> Config:
+    config = Config(ALEMBIC_INI)
+    # Keep the application's logging setup when migrating from inside the app
+    config.attributes["configure_logger"] = False
+    if url:
+        config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def upgrade_database(url: str = None, revision: str = "head"):
+    """
+    Bring the database schema up to `revision`. Blocking (the migration
+    environment runs its own event loop), so call it from a worker thread
+    inside the app.
+    """
+    command.upgrade(alembic_config(url), revision)
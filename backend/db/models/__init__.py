@@ -2,5 +2,6 @@ from .base import Base
 from .user import User
 from .playlist import Playlist
 from .track import Track
+from .catalog import CatalogTrack
 
-__all__ = ["Base", "User", "Playlist", "Track"]
\ No newline at end of file
+__all__ = ["Base", "User", "Playlist", "Track", "CatalogTrack"]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, UTC
+from .base import Base
+
+class CatalogTrack(Base):
+    __tablename__ = "catalog_tracks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Normalized "title|artist" lookup key
+    key = Column(String, unique=True, index=True, nullable=False)
+    title = Column(String, nullable=False)
+    artist = Column(String, nullable=False)
+    mbid = Column(String, nullable=True)
+    url = Column(String, nullable=True)
+    image = Column(String, nullable=True)
+    youtube_video_id = Column(String, nullable=True)
+    refreshed_at = Column(DateTime, default=lambda: datetime.now(UTC))
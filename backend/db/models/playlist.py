@@ -11,7 +11,7 @@ class Playlist(Base):
     description = Column(String, nullable=True)
     # is_favorite = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
     # Relationships
     owner = relationship("User", back_populates="playlists")
@@ -9,7 +9,7 @@ class Track(Base):
     name = Column(String)
     artist = Column(String)
     url = Column(String, nullable=True)
-    playlist_id = Column(Integer, ForeignKey("playlists.id"))
+    playlist_id = Column(Integer, ForeignKey("playlists.id"), index=True)
     
     # Relationship
     playlist = relationship("Playlist", back_populates="tracks")
\ No newline at end of file
@@ -2,12 +2,13 @@ from sqlalchemy import Column, String, Integer, Table, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
 
-# Association table for user favorites
+# Association table for user favorites; the primary key keeps each
+# favorite unique and serves lookups by user, the index lookups by playlist
 user_favorites = Table(
     'user_favorites',
     Base.metadata,
-    Column('user_id', Integer, ForeignKey('users.id')),
-    Column('playlist_id', Integer, ForeignKey('playlists.id'))
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    Column('playlist_id', Integer, ForeignKey('playlists.id'), primary_key=True, index=True)
 )
 
 class User(Base):
@@ -1,29 +1,40 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from utils.config import settings
 
-# Load environment variables
-load_dotenv()
+# Async drivers for the database URLs we accept
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
 
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./backend.db")
+def async_database_url(url: str) -> str:
+    """Map a plain sqlite:// or postgresql:// URL onto its async driver."""
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+def create_engine_for(url: str):
+    url = async_database_url(url)
+    if url.startswith("sqlite"):
+        return create_async_engine(url, connect_args={"check_same_thread": False}, echo=settings.DB_ECHO)
+    # Server databases get a bounded, health-checked connection pool
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO,
+    )
 
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
+engine = create_engine_for(settings.DATABASE_URL)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory; objects stay usable after commit, since lazy
+# loading is not available on async sessions
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
-
-        
\ No newline at end of file
@@ -1,52 +1,107 @@
-import requests
+import logging
+from typing import Optional
+from utils.cache import MISSING, TieredCache, normalize_query
+from utils.config import settings
+from utils.http_client import deezer_quota_exceeded, request
+from utils.rate_limit import RateLimitExceeded
+from utils.singleflight import SingleFlight
 
-BASEURL="https://api.deezer.com"
+BASEURL = "https://api.deezer.com"
 
-import requests
+logger = logging.getLogger(__name__)
 
-BASEURL = "https://api.deezer.com"
+image_cache = TieredCache(
+    "deezer_images",
+    ttl=settings.IMAGE_CACHE_TTL,
+    negative_ttl=settings.IMAGE_CACHE_NEGATIVE_TTL,
+    maxsize=settings.IMAGE_CACHE_MAXSIZE,
+)
+deezer_flight = SingleFlight("deezer")
+
+def _provider(background: bool) -> str:
+    return "deezer_background" if background else "deezer"
 
-def search_deezer_track_image(query: str) -> str:
+async def _cached_lookup(key: str, fetch, raise_errors: bool) -> Optional[str]:
     """
-    Search for a Deezer track and return the album cover if available,
-    otherwise fallback to artist picture.
+    Serve an image from the cache, or fetch and cache it. Errors are not
+    cached; they come back as None unless raise_errors is set.
     """
+    image = image_cache.get(key)
+    if image is not MISSING:
+        return image
+
+    async def fetch_and_store():
+        image = await fetch()
+        image_cache.set(key, image)
+        return image
+
     try:
-        url = f"{BASEURL}/search?q={query}"
-        response = requests.get(url)
-        data = response.json()
-        if not data.get("data"):
-            return None
+        # Concurrent misses for the same key share one Deezer request
+        return await deezer_flight.do(key, fetch_and_store)
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.debug(f"Deezer lookup failed for {key}: {str(e)}")
+        return None
 
-        first_result = data["data"][0]
+async def _fetch_track_image(query: str, background: bool = False) -> Optional[str]:
+    response = await request(_provider(background), "GET", f"{BASEURL}/search", params={"q": query})
+    if deezer_quota_exceeded(response):
+        raise RateLimitExceeded("Deezer quota exceeded")
+    data = response.json()
+    if response.status_code != 200 or "error" in data:
+        raise Exception(f"Deezer API error: {data.get('error')}")
+    if not data.get("data"):
+        return None
 
-        # Try getting track album cover first
-        if "album" in first_result and "cover_medium" in first_result["album"]:
-            return first_result["album"]["cover_medium"]
+    first_result = data["data"][0]
 
-        # Fallback: get artist picture
-        if "artist" in first_result and "picture_medium" in first_result["artist"]:
-            return first_result["artist"]["picture_medium"]
+    # Try getting track album cover first
+    if "album" in first_result and "cover_medium" in first_result["album"]:
+        return first_result["album"]["cover_medium"]
 
-        return None
-    except Exception:
+    # Fallback: get artist picture
+    if "artist" in first_result and "picture_medium" in first_result["artist"]:
+        return first_result["artist"]["picture_medium"]
+
+    return None
+
+async def _fetch_artist_image(artist_name: str, background: bool = False) -> Optional[str]:
+    response = await request(_provider(background), "GET", f"{BASEURL}/search/artist", params={"q": artist_name})
+    if deezer_quota_exceeded(response):
+        raise RateLimitExceeded("Deezer quota exceeded")
+    data = response.json()
+    if response.status_code != 200 or "error" in data:
+        raise Exception(f"Deezer API error: {data.get('error')}")
+    if not data.get("data"):
         return None
 
-def search_deezer_artist_image(artist_name: str) -> str:
+    first_result = data["data"][0]
+    if "picture_medium" in first_result:
+        return first_result["picture_medium"]
+
+    return None
+
+async def search_deezer_track_image(query: str, background: bool = False,
+                                    raise_errors: bool = False) -> Optional[str]:
     """
-    Search for a Deezer artist and return their picture.
+    Search for a Deezer track and return the album cover if available,
+    otherwise fallback to artist picture. Background lookups use the
+    separate background rate limit.
     """
-    try:
-        url = f"{BASEURL}/search/artist?q={artist_name}"
-        response = requests.get(url)
-        data = response.json()
-        if not data.get("data"):
-            return None
+    return await _cached_lookup(
+        f"track:{normalize_query(query)}",
+        lambda: _fetch_track_image(query, background),
+        raise_errors,
+    )
 
-        first_result = data["data"][0]
-        if "picture_medium" in first_result:
-            return first_result["picture_medium"]
-
-        return None
-    except Exception:
-        return None
\ No newline at end of file
+async def search_deezer_artist_image(artist_name: str, background: bool = False,
+                                     raise_errors: bool = False) -> Optional[str]:
+    """
+    Search for a Deezer artist and return their picture.
+    """
+    return await _cached_lookup(
+        f"artist:{normalize_query(artist_name)}",
+        lambda: _fetch_artist_image(artist_name, background),
+        raise_errors,
+    )
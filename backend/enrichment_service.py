@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Awaitable, List, Optional, Tuple
+from catalog import track_catalog
+from deezer_client import search_deezer_track_image, search_deezer_artist_image
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+class IncompleteEnrichment(Exception):
+    """Raised by strict enrichment when lookups failed; carries the images that were found."""
+
+    def __init__(self, images: List[Optional[str]], failed: int):
+        super().__init__(f"{failed}/{len(images)} image lookups failed")
+        self.images = images
+        self.failed = failed
+
+class ImageEnrichmentService:
+    """
+    Hydrates a whole page of tracks or artists with Deezer images at once.
+    Lookups run concurrently and share a single deadline; anything still
+    pending when it expires is cancelled and comes back as None.
+
+    With strict=True a failed or dropped lookup raises IncompleteEnrichment
+    instead, so snapshot loaders can tell "no image" from "not looked up".
+    """
+
+    def __init__(self, max_concurrency: int = None, deadline: float = None, background: bool = False):
+        self.max_concurrency = max_concurrency or settings.ENRICHMENT_CONCURRENCY
+        self.deadline = deadline or settings.ENRICHMENT_DEADLINE
+        self.background = background
+
+    async def _gather(self, lookups: List[Awaitable[Optional[str]]], strict: bool = False) -> List[Optional[str]]:
+        if not lookups:
+            return []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(lookup):
+            async with semaphore:
+                return await lookup
+
+        tasks = [asyncio.ensure_future(bounded(lookup)) for lookup in lookups]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Image enrichment deadline hit, {len(pending)}/{len(tasks)} lookups dropped")
+
+        images = []
+        failed = 0
+        for task in tasks:
+            if task in done and not task.exception():
+                images.append(task.result())
+            else:
+                images.append(None)
+                failed += 1
+        if failed and strict:
+            raise IncompleteEnrichment(images, failed)
+        return images
+
+    async def track_images(self, tracks: List[Tuple[str, str]], strict: bool = False) -> List[Optional[str]]:
+        """
+        Return one image (or None) per (title, artist) pair, in input order.
+        Images already in the track catalog are not looked up again.
+        """
+        entries = await track_catalog.lookup_many(tracks, field="image")
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        try:
+            found = await self._gather([
+                search_deezer_track_image(
+                    f"{tracks[i][0]} {tracks[i][1]}", background=self.background, raise_errors=True
+                )
+                for i in missing
+            ], strict)
+            incomplete = None
+        except IncompleteEnrichment as e:
+            found, incomplete = e.images, e
+        await track_catalog.remember_many([
+            {"title": tracks[i][0], "artist": tracks[i][1], "image": image}
+            for i, image in zip(missing, found)
+            if image and tracks[i][0] and tracks[i][1]
+        ])
+        images = [entry["image"] if entry else None for entry in entries]
+        for i, image in zip(missing, found):
+            images[i] = image
+        if incomplete:
+            raise IncompleteEnrichment(images, incomplete.failed)
+        return images
+
+    async def artist_images(self, artists: List[str], strict: bool = False) -> List[Optional[str]]:
+        """Return one image (or None) per artist name, in input order."""
+        return await self._gather([
+            search_deezer_artist_image(name or "", background=self.background, raise_errors=True)
+            for name in artists
+        ], strict)
+
+
+image_enricher = ImageEnrichmentService()
+# Chart snapshots and genre pools: own Deezer budget and a longer deadline
+background_enricher = ImageEnrichmentService(deadline=settings.BACKGROUND_ENRICH_DEADLINE, background=True)
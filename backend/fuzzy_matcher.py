@@ -0,0 +1,162 @@
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Set
+import numpy as np
+from utils.cache import normalize_query
+from utils.config import settings
+
+# Decorations the LLM (or a streaming service) adds around a canonical title
+_BRACKETS = re.compile(r"[\(\[][^\)\]]*[\)\]]")
+_DASH_SUFFIX = re.compile(
+    r"\s+-\s+.*\b(remaster(ed)?|live|version|edit|mix|mono|stereo|acoustic|demo)\b.*$", re.IGNORECASE
+)
+_FEATURING = re.compile(r"\s+(feat\.?|ft\.?|featuring)\s+.*$", re.IGNORECASE)
+
+
+def clean_title(text: str) -> str:
+    """Strip "(Remastered)", "- Live at ...", "feat. X" and the like, then normalize."""
+    stripped = _FEATURING.sub("", _DASH_SUFFIX.sub("", _BRACKETS.sub(" ", text or "")))
+    return normalize_query(stripped) or normalize_query(text)
+
+
+def clean_artist(text: str) -> str:
+    """Keep the main artist of "A ft. B" / "A feat. B", then normalize."""
+    return normalize_query(_FEATURING.sub("", text or "")) or normalize_query(text)
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrigramColumn:
+    """Inverted trigram index over one text field, scored with the Dice coefficient."""
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.sizes = array("i")
+
+    def add(self, entry_id: int, text: str):
+        grams = trigrams(text)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, array("i")).append(entry_id)
+
+    def similarity(self, text: str, count: int) -> np.ndarray:
+        """Dice similarity of `text` against every entry, as one vector."""
+        grams = trigrams(text)
+        lists = [np.frombuffer(self.postings[g], dtype=np.int32) for g in grams if g in self.postings]
+        if not lists:
+            return np.zeros(count)
+        shared = np.bincount(np.concatenate(lists), minlength=count)[:count]
+        sizes = np.frombuffer(self.sizes, dtype=np.int32)[:count]
+        return 2.0 * shared / (sizes + len(grams))
+
+
+class FuzzyTrackMatcher:
+    """
+    Approximate (title, artist) matcher over tracks we already resolved.
+
+    Titles and artists are cleaned of decorations ("(Remastered)", "ft. X")
+    and indexed by character trigrams. A lookup scores every known track in
+    one vectorized pass (title weighted over artist) and returns the best
+    one if it clears the confidence threshold, so near-duplicates of known
+    songs never reach Last.fm. The title alone must also be nearly identical:
+    a matching artist must not turn "Hell" into "Hello".
+
+    At most max_tracks are indexed; when full, the older half is dropped.
+    """
+
+    TITLE_WEIGHT = 0.65
+
+    def __init__(self, threshold: float = 0.8, min_title_similarity: float = 0.9,
+                 max_tracks: int = 20000):
+        self.threshold = threshold
+        self.min_title_similarity = min_title_similarity
+        self.max_tracks = max_tracks
+        self._tracks: List[Dict] = []
+        self._keys: Dict[str, int] = {}
+        self._titles = _TrigramColumn()
+        self._artists = _TrigramColumn()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def add(self, title: str, artist: str, image: Optional[str] = None):
+        if not title or not artist:
+            return
+        clean = (clean_title(title), clean_artist(artist))
+        key = "|".join(clean)
+        with self._lock:
+            entry_id = self._keys.get(key)
+            if entry_id is not None:
+                if image:
+                    self._tracks[entry_id]["image"] = image
+                return
+            if len(self._tracks) >= self.max_tracks:
+                self._reindex(self._tracks[len(self._tracks) // 2:])
+            self._index(key, clean, {"title": title, "artist": artist, "image": image})
+
+    def _index(self, key: str, clean, track: Dict):
+        entry_id = len(self._tracks)
+        self._keys[key] = entry_id
+        self._tracks.append(track)
+        self._titles.add(entry_id, clean[0])
+        self._artists.add(entry_id, clean[1])
+
+    def _reindex(self, tracks: List[Dict]):
+        """Rebuild the index from the given tracks (postings cannot be removed in place)."""
+        self._tracks = []
+        self._keys = {}
+        self._titles = _TrigramColumn()
+        self._artists = _TrigramColumn()
+        for track in tracks:
+            clean = (clean_title(track["title"]), clean_artist(track["artist"]))
+            self._index("|".join(clean), clean, track)
+
+    def add_many(self, tracks):
+        for track in tracks:
+            self.add(track.get("title"), track.get("artist"), track.get("image"))
+
+    def match(self, title: str, artist: str) -> Optional[Dict]:
+        """Return the best known {"title", "artist", "image", "score"} above the threshold, or None."""
+        self.lookups += 1
+        with self._lock:
+            count = len(self._tracks)
+            if not count:
+                return None
+            titles = self._titles.similarity(clean_title(title), count)
+            scores = (
+                self.TITLE_WEIGHT * titles
+                + (1 - self.TITLE_WEIGHT) * self._artists.similarity(clean_artist(artist), count)
+            )
+            scores[titles < self.min_title_similarity] = 0.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self.matches += 1
+            return dict(self._tracks[best], score=float(scores[best]))
+
+    def clear(self):
+        with self._lock:
+            self._tracks.clear()
+            self._keys.clear()
+            self._titles = _TrigramColumn()
+            self._artists = _TrigramColumn()
+
+    def stats(self) -> Dict:
+        return {
+            "tracks": len(self._tracks),
+            "lookups": self.lookups,
+            "avoided_upstream_lookups": self.matches,
+            "avoided_rate": round(self.matches / self.lookups, 3) if self.lookups else None,
+        }
+
+
+track_matcher = FuzzyTrackMatcher(
+    settings.FUZZY_MATCH_THRESHOLD, settings.FUZZY_MATCH_MIN_TITLE_SIMILARITY, settings.FUZZY_MATCH_MAX_TRACKS
+)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+from enrichment_service import IncompleteEnrichment, background_enricher, image_enricher
+from schemas.track import Track
+from utils.config import settings
+from utils.snapshot import PartialValue, Snapshot
+
+logger = logging.getLogger(__name__)
+
+class GenrePool:
+    """
+    Per-tag pool of image-enriched tracks covering the first few Last.fm
+    pages of tag.getTopTracks. Pools are refreshed in the background like
+    the chart snapshots, and each request gets a random sample of the pool.
+
+    Pools are only kept for known tags. A request for a tag without a
+    loaded pool is answered from the first page alone, enriched within the
+    normal request deadline, while a known tag's pool fills in the background.
+    """
+
+    def __init__(self, fetch_page: Callable[[str, int], Awaitable[List[dict]]],
+                 pages: int = None, max_age: float = None, max_tags: int = None,
+                 known_tags: List[str] = None):
+        self.fetch_page = fetch_page
+        self.pages = pages or settings.GENRE_POOL_PAGES
+        self.max_age = max_age or settings.GENRE_POOL_MAX_AGE
+        self.max_tags = max_tags or settings.GENRE_POOL_MAX_TAGS
+        self.known_tags = {tag.strip().lower() for tag in (known_tags or settings.GENRE_WARMUP_TAGS)}
+        self.enricher = background_enricher
+        self.page_enricher = image_enricher
+        self._pools: "OrderedDict[str, Snapshot]" = OrderedDict()
+
+    async def _load(self, tag: str) -> List[Track]:
+        pages = await asyncio.gather(
+            *(self.fetch_page(tag, page) for page in range(1, self.pages + 1)),
+            return_exceptions=True
+        )
+        errors = [page for page in pages if isinstance(page, Exception)]
+        if len(errors) == len(pages):
+            raise errors[0]
+
+        pairs = self._pairs(page for page in pages if not isinstance(page, Exception))
+        try:
+            images = await self.enricher.track_images(pairs, strict=True)
+        except IncompleteEnrichment as e:
+            # Serve what we have, but do not keep it for the whole max age
+            raise PartialValue(
+                self._tracks(pairs, e.images), f"genre pool '{tag}': {str(e)}", settings.SNAPSHOT_RETRY_AFTER
+            )
+        logger.info(f"Genre pool '{tag}' loaded with {len(pairs)} tracks")
+        return self._tracks(pairs, images)
+
+    async def _first_page(self, tag: str, limit: int) -> List[Track]:
+        pairs = self._pairs([await self.fetch_page(tag, 1)])
+        pairs = random.sample(pairs, min(limit, len(pairs)))
+        images = await self.page_enricher.track_images(pairs)
+        return self._tracks(pairs, images)
+
+    @staticmethod
+    def _pairs(pages: Iterable[List[dict]]) -> List[Tuple[str, str]]:
+        seen = set()
+        pairs = []
+        for page in pages:
+            for t in page:
+                pair = (t["name"], t["artist"]["name"])
+                if pair not in seen:
+                    seen.add(pair)
+                    pairs.append(pair)
+        return pairs
+
+    @staticmethod
+    def _tracks(pairs, images) -> List[Track]:
+        return [
+            Track(title=name, artist=artist, image=image)
+            for (name, artist), image in zip(pairs, images)
+        ]
+
+    def _pool(self, tag: str) -> Snapshot:
+        key = tag.strip().lower()
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = Snapshot(f"genre:{key}", lambda: self._load(key), self.max_age)
+            self._pools[key] = pool
+            while len(self._pools) > self.max_tags:
+                self._pools.popitem(last=False)
+        self._pools.move_to_end(key)
+        return pool
+
+    def warm(self, tags: List[str]) -> List[asyncio.Task]:
+        """Start filling the pools for the given tags in the background."""
+        return [self._pool(tag).refresh() for tag in tags]
+
+    async def sample(self, tag: str, limit: int) -> List[Track]:
+        key = tag.strip().lower()
+        if key in self._pools or key in self.known_tags:
+            pool = self._pool(key)
+            if pool.updated_at is not None:
+                tracks = await pool.get()
+                return random.sample(tracks, min(limit, len(tracks)))
+            # Cold pool: fill it in the background, answer from page 1 meanwhile
+            pool.refresh()
+        return await self._first_page(key, limit)
+
+    def cached_tracks(self) -> List[Track]:
+        """Tracks of every pool loaded so far, without triggering any loads."""
+        return [track for pool in self._pools.values() for track in (pool.value or [])]
+
+    def clear(self):
+        self._pools.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {tag: len(pool.value or []) for tag, pool in self._pools.items()}
@@ -1,18 +1,26 @@
 import os
-import requests
 from typing import Optional
 from dotenv import load_dotenv
 from schemas.track import Track
 import random
+from catalog import track_catalog
 from deezer_client import search_deezer_track_image
+from fuzzy_matcher import track_matcher
+from utils.cache import normalize_query
+from utils.http_client import request
+from utils.singleflight import SingleFlight, singleflight
 
 load_dotenv()
 
 LASTFM_API_KEY = os.getenv("LASTFM_API_KEY")
 BASE_URL = "http://ws.audioscrobbler.com/2.0/"
 
+# Identical in-flight Last.fm calls (popular charts, genre pages) share one request
+lastfm_flight = SingleFlight("lastfm")
 
-def get_lastfm_top_tracks(limit=15):
+
+@singleflight(lastfm_flight)
+async def get_lastfm_top_tracks(limit=15):
     api_key = LASTFM_API_KEY
     if not api_key:
         raise Exception("Missing LASTFM_API_KEY environment variable")
@@ -22,14 +30,15 @@ def get_lastfm_top_tracks(limit=15):
         "format": "json",
         "limit": limit
     }
-    response = requests.get(BASE_URL, params=params)
+    response = await request("lastfm", "GET", BASE_URL, params=params)
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data from Last.fm: {response.text}")
 
     data = response.json()
     return data.get("tracks", {}).get("track", [])
 
-def get_lastfm_top_artists(limit=10):
+@singleflight(lastfm_flight)
+async def get_lastfm_top_artists(limit=10):
     api_key = LASTFM_API_KEY
     if not api_key:
         raise Exception("Missing LASTFM_API_KEY environment variable")
@@ -39,14 +48,15 @@ def get_lastfm_top_artists(limit=10):
         "format": "json",
         "limit": limit
     }
-    response = requests.get(BASE_URL, params=params)
+    response = await request("lastfm", "GET", BASE_URL, params=params)
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data from Last.fm: {response.text}")
 
     data = response.json()
     return data.get("artists", {}).get("artist", [])
 
-def search_lastfm_tracks(query: str, limit: int = 10):
+@singleflight(lastfm_flight)
+async def search_lastfm_tracks(query: str, limit: int = 10):
     api_key = LASTFM_API_KEY
     params = {
         "method": "track.search",
@@ -55,7 +65,7 @@ def search_lastfm_tracks(query: str, limit: int = 10):
         "format": "json",
         "limit": limit
     }
-    response = requests.get(BASE_URL, params=params)
+    response = await request("lastfm", "GET", BASE_URL, params=params)
     if response.status_code == 200:
         data = response.json()
         tracks = data.get("results", {}).get("trackmatches", {}).get("track", [])
@@ -63,7 +73,8 @@ def search_lastfm_tracks(query: str, limit: int = 10):
     else:
         raise Exception(f"Failed to search tracks on Last.fm: {response.text}")
     
-def get_tracks_by_tags(tag: str, limit: int = 20, page: int = None):
+@singleflight(lastfm_flight)
+async def get_tracks_by_tags(tag: str, limit: int = 20, page: int = None):
     if not page:
         page = random.randint(1, 5)
     
@@ -76,7 +87,7 @@ def get_tracks_by_tags(tag: str, limit: int = 20, page: int = None):
         "format": "json"
     }
 
-    response = requests.get(BASE_URL, params=params)
+    response = await request("lastfm", "GET", BASE_URL, params=params)
     if response.status_code != 200:
         raise Exception(f"Error fetching genre tracks: {response.text}")
     
@@ -92,6 +103,16 @@ class LastFMClient:
             raise Exception("Missing LASTFM_API_KEY environment variable")
 
     async def search_tracks(self, title: str, artist: str) -> Optional[Track]:
+        entry = await track_catalog.lookup(title, artist, field="image")
+        if entry is None:
+            # Near-duplicates ("ft. X", "(Remastered)", typos) of a known track
+            entry = track_matcher.match(title, artist)
+        if entry is not None:
+            return Track(title=entry["title"], artist=entry["artist"], image=entry["image"])
+        key = ("search_tracks", normalize_query(title), normalize_query(artist))
+        return await lastfm_flight.do(key, lambda: self._search_tracks(title, artist))
+
+    async def _search_tracks(self, title: str, artist: str) -> Optional[Track]:
         params = {
             "method": "track.search",
             "track": title,
@@ -100,12 +121,19 @@ class LastFMClient:
             "format": "json",
             "limit": 1,
         }
-        response = requests.get(self.base_url, params=params) 
+        response = await request("lastfm", "GET", self.base_url, params=params)
         data = response.json()
         try:
             track_data = data["results"]["trackmatches"]["track"][0]
+            deezer_image = await search_deezer_track_image(f"{track_data['name']} {track_data['artist']}")
+            # Only Deezer artwork is canonical; without it the catalog keeps no
+            # image, so the next lookup tries Deezer again
+            await track_catalog.remember(
+                track_data["name"], track_data["artist"], query=(title, artist),
+                mbid=track_data.get("mbid") or None, url=track_data.get("url"), image=deezer_image
+            )
             image = (
-                search_deezer_track_image(f"{track_data['name']} {track_data['artist']}")
+                deezer_image
                 or (track_data["image"][-1]["#text"] if track_data.get("image") else None)
                 or "https://placehold.co/400x400?text=No+Image"
             )
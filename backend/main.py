@@ -1,19 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes.playlist import router as playlist_router
-from routes.lastfm import router as lastfm_router
+from routes.lastfm import router as lastfm_router, top_tracks_snapshot, top_artists_snapshot, genre_pool, suggestions_snapshot
 from routes.auth import router as auth_router
 from routes.user import router as user_router
 from routes.track import router as track_router
 from routes import ai
 from db.session import engine
-from db.models import Base, user
+from db.migrate import upgrade_database
+from utils.http_client import upstream_clients
+from catalog import track_catalog
+from search_index import search_index
+from fuzzy_matcher import track_matcher
+from utils.cache import cache_stats
+from utils.singleflight import singleflight_stats
+from utils.snapshot import snapshot_stats
+from utils.config import settings
 
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the database schema up to date
+    await asyncio.to_thread(upgrade_database)
+    if settings.WARM_CACHES_ON_STARTUP:
+        # Fire-and-forget: the landing page charts load in the background
+        top_tracks_snapshot.refresh()
+        top_artists_snapshot.refresh()
+        suggestions_snapshot.refresh()
+        genre_pool.warm(settings.GENRE_WARMUP_TAGS)
+        asyncio.get_running_loop().create_task(track_catalog.reindex())
+    if settings.QUIZ_PREGENERATE_ON_STARTUP:
+        ai.quiz_store.start()
+    yield
+    await ai.quiz_store.stop()
+    # Close pooled upstream connections on shutdown
+    await upstream_clients.aclose()
+    await engine.dispose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for frontend
 app.add_middleware(CORSMiddleware,
@@ -35,3 +62,22 @@ app.include_router(track_router)
 async def root():
     return {"message": "Welcome to VibeTune backend!"}
 
+
+@app.get("/health", response_model=dict)
+async def health():
+    """Service health, upstream circuit breaker states and cache/limiter counters"""
+    breakers = upstream_clients.breaker_stats()
+    degraded = [name for name, breaker in breakers.items() if breaker["state"] != "closed"]
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "degraded_providers": degraded,
+        "caches": cache_stats(),
+        "coalescing": singleflight_stats(),
+        "snapshots": snapshot_stats(),
+        "quiz_playlists": ai.quiz_store.stats(),
+        "catalog": track_catalog.stats(),
+        "search_index": search_index.stats(),
+        "fuzzy_matcher": track_matcher.stats(),
+        "rate_limits": upstream_clients.stats(),
+        "circuit_breakers": breakers,
+    }
@@ -0,0 +1,90 @@
+"""Initial schema, as created by create_all before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created with create_all already have these tables; they
+    # are adopted as they are and brought up to date by later revisions
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("first_name", sa.String()),
+            sa.Column("last_name", sa.String()),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "playlists" not in existing:
+        op.create_table(
+            "playlists",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        )
+        op.create_index("ix_playlists_id", "playlists", ["id"])
+        op.create_index("ix_playlists_name", "playlists", ["name"])
+
+    if "tracks" not in existing:
+        op.create_table(
+            "tracks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("artist", sa.String()),
+            sa.Column("url", sa.String(), nullable=True),
+            sa.Column("playlist_id", sa.Integer(), sa.ForeignKey("playlists.id")),
+        )
+        op.create_index("ix_tracks_id", "tracks", ["id"])
+
+    if "user_favorites" not in existing:
+        op.create_table(
+            "user_favorites",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("playlist_id", sa.Integer(), sa.ForeignKey("playlists.id")),
+        )
+
+    if "catalog_tracks" not in existing:
+        op.create_table(
+            "catalog_tracks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("key", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("artist", sa.String(), nullable=False),
+            sa.Column("mbid", sa.String(), nullable=True),
+            sa.Column("url", sa.String(), nullable=True),
+            sa.Column("image", sa.String(), nullable=True),
+            sa.Column("youtube_video_id", sa.String(), nullable=True),
+            sa.Column("refreshed_at", sa.DateTime()),
+        )
+        op.create_index("ix_catalog_tracks_id", "catalog_tracks", ["id"])
+        op.create_index("ix_catalog_tracks_key", "catalog_tracks", ["key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_tracks")
+    op.drop_table("user_favorites")
+    op.drop_table("tracks")
+    op.drop_table("playlists")
+    op.drop_table("users")
@@ -0,0 +1,53 @@
+"""Index foreign keys and give user_favorites a composite primary key
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Playlist detail, track counts and "my playlists" filter on these
+    op.create_index("ix_tracks_playlist_id", "tracks", ["playlist_id"])
+    op.create_index("ix_playlists_user_id", "playlists", ["user_id"])
+
+    # Rebuild user_favorites with (user_id, playlist_id) as primary key,
+    # dropping duplicate and half-empty rows the old table allowed
+    op.create_table(
+        "user_favorites_new",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("playlist_id", sa.Integer(), sa.ForeignKey("playlists.id"), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "playlist_id", name="pk_user_favorites"),
+    )
+    op.execute(
+        "INSERT INTO user_favorites_new (user_id, playlist_id)"
+        " SELECT DISTINCT user_id, playlist_id FROM user_favorites"
+        " WHERE user_id IS NOT NULL AND playlist_id IS NOT NULL"
+    )
+    op.drop_table("user_favorites")
+    op.rename_table("user_favorites_new", "user_favorites")
+    op.create_index("ix_user_favorites_playlist_id", "user_favorites", ["playlist_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_favorites_playlist_id", table_name="user_favorites")
+    op.create_table(
+        "user_favorites_old",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("playlist_id", sa.Integer(), sa.ForeignKey("playlists.id")),
+    )
+    op.execute("INSERT INTO user_favorites_old (user_id, playlist_id) SELECT user_id, playlist_id FROM user_favorites")
+    op.drop_table("user_favorites")
+    op.rename_table("user_favorites_old", "user_favorites")
+    op.drop_index("ix_playlists_user_id", table_name="playlists")
+    op.drop_index("ix_tracks_playlist_id", table_name="tracks")
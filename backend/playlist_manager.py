@@ -1,16 +1,84 @@
-from typing import List
+import asyncio
+import logging
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple, Union
 from schemas import Track
 from schemas.track import LLMResponseItem  
 from lastfm_client import LastFMClient
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
 
 class PlaylistService:
-    def __init__(self):
+    def __init__(self, max_concurrency: int = None, song_timeout: float = None):
         self.lastfm = LastFMClient()
+        self.max_concurrency = max_concurrency or settings.PLAYLIST_RESOLVE_CONCURRENCY
+        self.song_timeout = song_timeout or settings.PLAYLIST_RESOLVE_TIMEOUT
+
+    async def resolve_song(self, song: LLMResponseItem, semaphore: asyncio.Semaphore) -> Optional[Track]:
+        """Resolve a single LLM suggestion, returning None if it fails or times out."""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self.lastfm.search_tracks(song.title.strip(), song.artist.strip()),
+                    timeout=self.song_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out resolving '{song.title}' by {song.artist}")
+            except Exception as e:
+                logger.warning(f"Error resolving '{song.title}' by {song.artist}: {str(e)}")
+        return None
 
     async def generate_playlist_from_llm_response(self, songs: List[LLMResponseItem]) -> List[Track]:
-        playlist = []
-        for song in songs:
-            track = await self.lastfm.search_tracks(song.title.strip(), song.artist.strip())
-            if track:
-                playlist.append(track)
-        return playlist
\ No newline at end of file
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # gather keeps the LLM's order regardless of completion order
+        tracks = await asyncio.gather(*(self.resolve_song(song, semaphore) for song in songs))
+        return [track for track in tracks if track]
+
+    async def iter_playlist_from_llm_response(
+        self, songs: Union[List[LLMResponseItem], AsyncIterable[LLMResponseItem]]
+    ) -> AsyncIterator[Tuple[int, Track]]:
+        """
+        Yield (index, track) pairs as soon as each song resolves, where index
+        is the song's position in the LLM response. Dropped songs are skipped.
+
+        songs may be an async iterable (e.g. the streamed LLM response), in
+        which case each song starts resolving as soon as it arrives.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        tasks = []
+
+        async def resolve(index: int, song: LLMResponseItem):
+            await results.put((index, await self.resolve_song(song, semaphore)))
+
+        async def feed():
+            if isinstance(songs, list):
+                for index, song in enumerate(songs):
+                    tasks.append(asyncio.ensure_future(resolve(index, song)))
+                return
+            index = 0
+            async for song in songs:
+                tasks.append(asyncio.ensure_future(resolve(index, song)))
+                index += 1
+
+        feeder = asyncio.ensure_future(feed())
+        received = 0
+        try:
+            while not (feeder.done() and received == len(tasks)):
+                waiter = asyncio.ensure_future(results.get())
+                pending = {waiter} if feeder.done() else {waiter, feeder}
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if not waiter.done():
+                    waiter.cancel()
+                    continue
+                received += 1
+                index, track = waiter.result()
+                if track:
+                    yield index, track
+            # Re-raise a failure of the song source once started songs are done
+            feeder.result()
+        finally:
+            # The client may disconnect mid-stream
+            feeder.cancel()
+            for task in tasks:
+                task.cancel()
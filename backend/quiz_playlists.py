@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import logging
+import random
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+from schemas import QuizRequest
+from schemas.track import Track
+from utils.cache import MISSING, TieredCache, normalize_query
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Options offered by the quiz in the frontend (pages/generate.jsx), most
+# commonly picked first so the pre-generation budget goes to them first
+QUIZ_MOODS = ["happy", "relaxed", "focused", "sleepy", "energetic"]
+QUIZ_ACTIVITIES = ["studying", "working_out", "commuting", "relaxing", "party"]
+QUIZ_GENRES = ["Pop", "Rock", "Hip Hop", "R&B", "Electronic", "Jazz", "Classical", "Country"]
+QUIZ_DECADES = ["80s", "90s", "00s", "10s", "20s"]
+QUIZ_DISCOVERY_MODES = ["mix", "popular", "fresh"]
+
+
+def quiz_key(request: QuizRequest) -> str:
+    """Key quiz answers so that genre order and casing do not matter."""
+    genres = sorted({normalize_query(genre) for genre in request.preferred_genres})
+    return "|".join([
+        normalize_query(request.mood),
+        normalize_query(request.activity),
+        ",".join(genres),
+        normalize_query(request.decade),
+        normalize_query(request.discovery_mode),
+    ])
+
+
+def quiz_matrix() -> Iterator[QuizRequest]:
+    """
+    Every single-genre answer combination the quiz can produce, ordered so
+    that combinations of the more common options come first.
+    """
+    options = [QUIZ_MOODS, QUIZ_ACTIVITIES, QUIZ_GENRES, QUIZ_DECADES, QUIZ_DISCOVERY_MODES]
+    ranked = sorted(
+        itertools.product(*(range(len(values)) for values in options)),
+        key=sum
+    )
+    for ranks in ranked:
+        mood, activity, genre, decade, discovery_mode = (
+            values[rank] for values, rank in zip(options, ranks)
+        )
+        yield QuizRequest(
+            mood=mood,
+            activity=activity,
+            preferred_genres=[genre],
+            decade=decade,
+            discovery_mode=discovery_mode,
+        )
+
+
+class QuizPlaylistStore:
+    """
+    Store of fully resolved quiz playlists, a few variants per answer
+    combination. Requests are served a random stored variant; live
+    generations are written back, and a background job fills in the
+    quiz matrix within a budget of LLM calls per run.
+    """
+
+    MAX_DEMAND = 1000
+
+    def __init__(self, generate: Callable[[QuizRequest], Awaitable[List[Track]]],
+                 variants: int = None, ttl: float = None):
+        self.generate = generate
+        self.variants = variants or settings.QUIZ_PLAYLIST_VARIANTS
+        self.cache = TieredCache("quiz_playlists", ttl=ttl or settings.QUIZ_PLAYLIST_TTL,
+                                 maxsize=settings.QUIZ_PLAYLIST_MAXSIZE)
+        # Combinations users asked for that were not stored yet
+        self.demand: Counter = Counter()
+        self._requests: Dict[str, QuizRequest] = {}
+        self.hits = 0
+        self.misses = 0
+        self.llm_calls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _variants(self, key: str) -> List[List[dict]]:
+        stored = self.cache.get(key)
+        return [] if stored is MISSING else stored
+
+    def get(self, request: QuizRequest) -> Optional[List[Track]]:
+        key = quiz_key(request)
+        stored = self._variants(key)
+        if not stored:
+            self.misses += 1
+            if key in self.demand or len(self.demand) < self.MAX_DEMAND:
+                self.demand[key] += 1
+                self._requests[key] = request
+            return None
+        self.hits += 1
+        return [Track(**track) for track in random.choice(stored)]
+
+    def add(self, request: QuizRequest, playlist: List[Track]):
+        if not playlist:
+            return
+        key = quiz_key(request)
+        stored = self._variants(key)
+        if len(stored) >= self.variants:
+            return
+        stored.append([Track.model_validate(track).model_dump() for track in playlist])
+        self.cache.set(key, stored)
+        if len(stored) >= self.variants:
+            self.demand.pop(key, None)
+            self._requests.pop(key, None)
+
+    def _pending(self) -> Iterator[QuizRequest]:
+        """Combinations still short of variants: asked-for ones first, then the matrix."""
+        for key, _ in self.demand.most_common():
+            # Live requests may complete a key while pre-generation awaits
+            request = self._requests.get(key)
+            if request is not None:
+                yield request
+        yield from quiz_matrix()
+
+    async def pregenerate(self, budget: int = None, delay: float = None) -> int:
+        """
+        Generate and resolve missing variants until `budget` LLM calls have
+        been made. Returns the number of playlists stored.
+        """
+        budget = settings.QUIZ_PREGENERATE_BUDGET if budget is None else budget
+        delay = settings.QUIZ_PREGENERATE_DELAY if delay is None else delay
+        stored = failures = calls = 0
+        for request in self._pending():
+            while calls < budget and len(self._variants(quiz_key(request))) < self.variants:
+                calls += 1
+                self.llm_calls += 1
+                try:
+                    playlist = await self.generate(request)
+                except Exception as e:
+                    failures += 1
+                    logger.warning(f"Quiz pre-generation failed: {str(e)}")
+                    if failures >= 3:
+                        logger.warning("Stopping quiz pre-generation after repeated failures")
+                        return stored
+                    break
+                failures = 0
+                if not playlist:
+                    break
+                self.add(request, playlist)
+                stored += 1
+                # Leave LLM quota for live requests
+                await asyncio.sleep(delay)
+            if calls >= budget:
+                break
+        logger.info(f"Quiz pre-generation stored {stored} playlists using {calls} LLM calls")
+        return stored
+
+    def start(self, interval: float = None):
+        """Run pre-generation in the background now and then every `interval` seconds."""
+        interval = interval or settings.QUIZ_PREGENERATE_INTERVAL
+
+        async def run():
+            while True:
+                try:
+                    await self.pregenerate()
+                except Exception:
+                    logger.exception("Quiz pre-generation run failed")
+                await asyncio.sleep(interval)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def clear(self):
+        self.cache.clear()
+        self.demand.clear()
+        self._requests.clear()
+
+    def stats(self) -> Dict[str, int]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "llm_calls": self.llm_calls,
+            "pending_demand": len(self.demand),
+        }
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
-from typing import List
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+import httpx
+import json
 import logging
 from schemas import Track, QuizRequest
 from ai_agent_client import AIAgentClient, build_prompt_from_quiz
 from playlist_manager import PlaylistService
+from quiz_playlists import QuizPlaylistStore
 from schemas.track import LLMResponseItem
+from utils.rate_limit import RateLimitExceeded, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -17,6 +22,37 @@ playlist_service = PlaylistService()
 class PromptRequest(BaseModel):
     prompt: str
 
+def ai_service_error(e: Exception) -> HTTPException:
+    """Report throttling by the AI agent as 503 instead of a generic 500."""
+    retry_after = None
+    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+        retry_after = retry_after_seconds(e.response.headers.get("Retry-After")) or 10
+    elif isinstance(e, RateLimitExceeded):
+        retry_after = 10
+    if retry_after is not None:
+        logger.warning(f"AI service throttled: {str(e)}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is busy, please try again shortly",
+            headers={"Retry-After": str(int(retry_after))}
+        )
+    logger.error(f"AI service error: {str(e)}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"AI service error: {str(e)}"
+    )
+
+def parse_llm_song(song: Any) -> Optional[LLMResponseItem]:
+    """Validate one song from the AI agent; invalid items are logged and skipped."""
+    try:
+        return LLMResponseItem.model_validate(song)
+    except ValidationError as e:
+        logger.warning(f"Skipping invalid song from AI agent: {song!r} ({e.error_count()} errors)")
+        return None
+
+def parse_llm_songs(songs: Iterable[Any]) -> List[LLMResponseItem]:
+    return [item for item in map(parse_llm_song, songs) if item is not None]
+
 @router.post("/playlist-from-prompt", response_model=List[Track])
 async def playlist_from_prompt(request: PromptRequest):
     try:
@@ -24,7 +60,7 @@ async def playlist_from_prompt(request: PromptRequest):
         songs = await ai_agent.generate(request.prompt)
         # songs is a list of dicts: [{ "title": ..., "artist": ... }, ...]
         # 2. Convert to LLMResponseItem list
-        llm_songs = [LLMResponseItem(**song) for song in songs]
+        llm_songs = parse_llm_songs(songs)
         # 3. Search Last.fm for each song
         playlist = await playlist_service.generate_playlist_from_llm_response(llm_songs)
         if not playlist:
@@ -33,18 +69,120 @@ async def playlist_from_prompt(request: PromptRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"AI service error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"AI service error: {str(e)}"
-        )
+        raise ai_service_error(e)
+
+async def generate_quiz_playlist(request: QuizRequest) -> List[Track]:
+    songs = await ai_agent.generate(build_prompt_from_quiz(request))
+    llm_songs = parse_llm_songs(songs)
+    return await playlist_service.generate_playlist_from_llm_response(llm_songs)
+
+quiz_store = QuizPlaylistStore(generate_quiz_playlist)
 
 @router.post("/playlist-from-quiz", response_model=List[Track])
 async def playlist_from_quiz(request: QuizRequest):
-    user_prompt = build_prompt_from_quiz(request)
-    songs = await ai_agent.generate(user_prompt)
-    llm_songs = [LLMResponseItem(**song) for song in songs]
-    playlist = await playlist_service.generate_playlist_from_llm_response(llm_songs)
+    # Common answer combinations are pre-generated in the background
+    stored = quiz_store.get(request)
+    if stored is not None:
+        return stored
+    try:
+        playlist = await generate_quiz_playlist(request)
+    except Exception as e:
+        raise ai_service_error(e)
     if not playlist:
         raise HTTPException(status_code=404, detail="No valid tracks found")
-    return playlist
\ No newline at end of file
+    quiz_store.add(request, playlist)
+    return playlist
+
+
+async def start_song_stream(prompt: str) -> AsyncIterator[Any]:
+    """
+    Start streaming raw songs from the AI agent. The first song is awaited
+    up front so that agent errors still map to a proper HTTP status.
+    """
+    songs = ai_agent.generate_stream(prompt)
+    try:
+        first = await songs.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        raise ai_service_error(e)
+
+    async def all_songs():
+        if first is None:
+            return
+        yield first
+        async for song in songs:
+            yield song
+
+    return all_songs()
+
+def track_event(index: int, track: Track) -> str:
+    return json.dumps({"event": "track", "index": index, "track": track.model_dump()}) + "\n"
+
+def summary_event(requested: int, resolved: int) -> str:
+    return json.dumps({
+        "event": "summary",
+        "requested": requested,
+        "resolved": resolved,
+        "dropped": requested - resolved,
+    }) + "\n"
+
+def stream_playlist(songs: AsyncIterator[Any],
+                    on_complete: Callable[[List[Track]], None] = None) -> StreamingResponse:
+    """
+    Stream a playlist as NDJSON: one "track" event per resolved song, in
+    resolution order, followed by a "summary" event. Songs start resolving
+    while the LLM is still generating the rest of the list. Invalid songs
+    are skipped but still counted as requested (and dropped). If the stream
+    finishes without errors, on_complete gets the playlist in LLM order.
+    """
+    requested = 0
+
+    async def valid_songs():
+        nonlocal requested
+        async for song in songs:
+            requested += 1
+            item = parse_llm_song(song)
+            if item is not None:
+                yield item
+
+    async def events():
+        resolved = []
+        try:
+            async for index, track in playlist_service.iter_playlist_from_llm_response(valid_songs()):
+                resolved.append((index, track))
+                yield track_event(index, track)
+        except Exception as e:
+            logger.error(f"Playlist streaming error: {str(e)}")
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+        else:
+            if on_complete is not None:
+                on_complete([track for _, track in sorted(resolved, key=lambda item: item[0])])
+        yield summary_event(requested, len(resolved))
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+def stream_stored_playlist(playlist: List[Track]) -> StreamingResponse:
+    """Stream an already resolved playlist with the same events as stream_playlist."""
+    async def events():
+        for index, track in enumerate(playlist):
+            yield track_event(index, track)
+        yield summary_event(len(playlist), len(playlist))
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.post("/playlist-from-prompt/stream")
+async def playlist_from_prompt_stream(request: PromptRequest):
+    """Like /playlist-from-prompt, but streams tracks as they are resolved"""
+    return stream_playlist(await start_song_stream(request.prompt))
+
+@router.post("/playlist-from-quiz/stream")
+async def playlist_from_quiz_stream(request: QuizRequest):
+    """Like /playlist-from-quiz, but streams tracks as they are resolved"""
+    stored = quiz_store.get(request)
+    if stored is not None:
+        return stream_stored_playlist(stored)
+    return stream_playlist(
+        await start_song_stream(build_prompt_from_quiz(request)),
+        on_complete=lambda playlist: quiz_store.add(request, playlist),
+    )
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer, OAuth2PasswordRequestForm
+import secrets
 import logging
 from jose import JWTError, jwt
 from schemas.user import UserCreate, UserLogin, Token, UserOut
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import get_db
 from db.crud.user import user_crud
 from utils.security import create_access_token, verify_password
@@ -19,7 +20,22 @@ oauth2_scheme = OAuth2PasswordBearer(
     scheme_name="User Authentication"
 )
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+admin_key_scheme = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+async def require_admin(admin_key: str = Depends(admin_key_scheme)):
+    """Allow the request only with the configured admin key"""
+    if not admin_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Admin key required",
+        )
+    if not settings.ADMIN_API_KEY or not secrets.compare_digest(admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized",
+        )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,19 +50,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
         
-    user = user_crud.get_user_by_email(db, email=email)
+    user = await user_crud.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
     return user
 
 
 @router.post("/register", response_model=UserOut)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     try:
         logger.debug(f"Registration attempt for email: {user.email}")
         
         # Check for existing email
-        db_user = user_crud.get_user_by_email(db, user.email)
+        db_user = await user_crud.get_user_by_email(db, user.email)
         if db_user:
             logger.warning(f"Email already registered: {user.email}")
             raise HTTPException(
@@ -54,7 +70,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
                 detail="Email already registered"
             )
         # Check for existing username
-        db_user = user_crud.get_user_by_username(db, user.username)
+        db_user = await user_crud.get_user_by_username(db, user.username)
         if db_user:
             logger.warning(f"Username already registered: {user.username}")
             raise HTTPException(
@@ -63,7 +79,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             )
         
         # Create new user
-        new_user = user_crud.create_user(db=db, user=user)
+        new_user = await user_crud.create_user(db=db, user=user)
         logger.info(f"Successfully registered user with ID: {new_user.id}")
         return new_user
         
@@ -81,11 +97,11 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Use email as username
-        user = user_crud.get_user_by_email(db, email=form_data.username)
+        user = await user_crud.get_user_by_email(db, email=form_data.username)
         if not user or not verify_password(form_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,6 +120,6 @@ async def login(
         raise
 
 @router.get("/me", response_model=UserOut)
-async def read_current_user(current_user = Depends(get_current_user)):
+async def read_current_user(current_user = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get current authenticated user's information"""
-    return current_user
+    return await user_crud.get_user(db, current_user.id)
@@ -1,87 +1,182 @@
 from fastapi import APIRouter, Query
 from lastfm_client import get_lastfm_top_tracks, search_lastfm_tracks, get_lastfm_top_artists, get_tracks_by_tags
-from schemas import TrackBase, SearchResponse, Artist, Track
-from deezer_client import search_deezer_track_image, search_deezer_artist_image
+from schemas import TrackBase, SearchResponse, SuggestResponse, Artist, Track
+from db.crud.track import track_crud
+from db.session import SessionLocal
+from enrichment_service import IncompleteEnrichment, background_enricher, image_enricher
+from genre_pool import GenrePool
+from search_index import search_index
+from suggest_index import PrefixIndex, TRACK, ARTIST
+from utils.cache import normalize_query
+from utils.config import settings
+from utils.snapshot import PartialValue, Snapshot
 from typing import List
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+
+async def load_top_tracks() -> List[Track]:
+    tracks = await get_lastfm_top_tracks()
+    pairs = [(track.get("name"), track.get("artist", {}).get("name")) for track in tracks]
+    try:
+        images = await background_enricher.track_images(pairs, strict=True)
+    except IncompleteEnrichment as e:
+        raise PartialValue(build_top_tracks(pairs, e.images), f"top tracks: {str(e)}", settings.SNAPSHOT_RETRY_AFTER)
+    return build_top_tracks(pairs, images)
+
+def build_top_tracks(pairs, images) -> List[Track]:
+    return [
+        Track(title=name, artist=artist, image=image)
+        for (name, artist), image in zip(pairs, images)
+    ]
+
+async def load_top_artists() -> List[Artist]:
+    artists_raw = await get_lastfm_top_artists()
+    try:
+        images = await background_enricher.artist_images(
+            [artist.get("name") for artist in artists_raw], strict=True
+        )
+    except IncompleteEnrichment as e:
+        raise PartialValue(build_top_artists(artists_raw, e.images), f"top artists: {str(e)}", settings.SNAPSHOT_RETRY_AFTER)
+    return build_top_artists(artists_raw, images)
+
+def build_top_artists(artists_raw, images) -> List[Artist]:
+    artists = []
+    for artist, deezer_image in zip(artists_raw, images):
+        artists.append(Artist(
+            name=artist.get("name"),
+            playcount=int(artist.get("playcount", 0)),
+            listeners=int(artist.get("listeners", 0)),
+            mbid=artist.get("mbid"),
+            url=artist.get("url"),
+            streamable=artist.get("streamable") == "1",
+            image=deezer_image 
+        ))
+    return artists
+
+# The charts change a few times a day: serve enriched snapshots and
+# refresh them in the background once they are older than the max age
+top_tracks_snapshot = Snapshot("top_tracks", load_top_tracks, settings.CHART_SNAPSHOT_MAX_AGE)
+top_artists_snapshot = Snapshot("top_artists", load_top_artists, settings.CHART_SNAPSHOT_MAX_AGE)
+
+# Genre pages are sampled from a prefetched pool instead of a random live page
+genre_pool = GenrePool(
+    lambda tag, page: get_tracks_by_tags(tag, settings.GENRE_POOL_PAGE_SIZE, page)
+)
+
+# Popularity scores for typeahead suggestions
+CHART_SCORE = 1000
+SAVED_TRACK_SCORE = 50
+GENRE_POOL_SCORE = 1
+
+async def saved_track_counts():
+    async with SessionLocal() as db:
+        return await track_crud.get_saved_track_counts(db)
+
+async def load_suggestions() -> PrefixIndex:
+    suggestions = []
+    for source, kind in ((top_tracks_snapshot, TRACK), (top_artists_snapshot, ARTIST)):
+        try:
+            items = await source.get()
+        except Exception as e:
+            logger.warning(f"Suggestions built without {source.name}: {str(e)}")
+            continue
+        for rank, item in enumerate(items):
+            if kind == TRACK:
+                suggestions.append((TRACK, item.title, item.artist, CHART_SCORE - rank))
+                suggestions.append((ARTIST, None, item.artist, CHART_SCORE - rank))
+            else:
+                suggestions.append((ARTIST, None, item.name, CHART_SCORE - rank))
+    for track in genre_pool.cached_tracks():
+        suggestions.append((TRACK, track.title, track.artist, GENRE_POOL_SCORE))
+    try:
+        for name, artist, count in await saved_track_counts():
+            suggestions.append((TRACK, name, artist, SAVED_TRACK_SCORE * count))
+    except Exception as e:
+        logger.warning(f"Suggestions built without saved tracks: {str(e)}")
+    index = PrefixIndex.build(suggestions, settings.SUGGEST_MAX_ENTRIES)
+    logger.info(f"Suggestion index built with {len(index)} entries")
+    return index
+
+# Rebuilt in the background; tracks saved in between are added incrementally
+suggestions_snapshot = Snapshot("suggestions", load_suggestions, settings.SUGGEST_INDEX_MAX_AGE)
+
+def suggest_saved_track(name: str, artist: str):
+    """Make a newly saved track suggestible without waiting for the next rebuild."""
+    if suggestions_snapshot.value is not None:
+        suggestions_snapshot.value.add(TRACK, name, artist, SAVED_TRACK_SCORE)
+
+
 @router.get("/lastfm-top-tracks", response_model=SearchResponse)
 async def lastfm_top_tracks():
     try:
-        tracks = get_lastfm_top_tracks()
-        simplified_tracks = []
-        for track in tracks:
-            image = search_deezer_track_image(f"{track.get('name')} {track.get('artist', {}).get('name')}")
-            simplified_tracks.append(
-                Track(
-                    title=track.get("name"),
-                    artist=track.get("artist", {}).get("name"),
-                    image=image,
-                )
-            )
-        return {"results": simplified_tracks}
+        return {"results": await top_tracks_snapshot.get()}
     except Exception as e:
         return {"results": [], "error": str(e)}
 
 @router.get("/search", response_model=SearchResponse)
-async def search_tracks(q: str = Query(..., description="Song name or artist to search")):
+async def search_tracks(q: str = Query(..., description="Song name or artist to search"), limit: int = Query(10, ge=1, le=50)):
+    # Local full-text index first; Last.fm only when it has too few matches
+    local = search_index.search(q, limit)
+    pairs = [(t["title"], t["artist"]) for t in local]
+    images = [t["image"] for t in local]
+    error = None
+    if len(local) < min(limit, settings.SEARCH_MIN_LOCAL_RESULTS):
+        search_index.upstream_fallbacks += 1
+        try:
+            # Search results are written to the catalog, and from there to the index
+            tracks = await search_lastfm_tracks(q, limit)
+        except Exception as e:
+            # Still answer with the local matches we have
+            logger.warning(f"Last.fm search failed for '{q}': {str(e)}")
+            error = str(e)
+        else:
+            upstream = [
+                (track.get("name") or "Unknown Title", track.get("artist") or "Unknown Artist")
+                for track in tracks
+                if isinstance(track, dict)  # skip invalid entries
+            ]
+            # Keep local matches Last.fm did not return
+            seen = {(normalize_query(title), normalize_query(artist)) for title, artist in upstream}
+            kept = [
+                i for i, (title, artist) in enumerate(pairs)
+                if (normalize_query(title), normalize_query(artist)) not in seen
+            ][:max(limit - len(upstream), 0)]
+            pairs = upstream + [pairs[i] for i in kept]
+            images = [None] * len(upstream) + [images[i] for i in kept]
+
+    missing = [i for i, image in enumerate(images) if not image]
     try:
-        tracks = search_lastfm_tracks(q)
-        simplified_tracks = []
-        for track in tracks:
-            if not isinstance(track, dict):
-                continue  # skip invalid entries
-            artist = track.get("artist") or "Unknown Artist"
-            name = track.get("name") or "Unknown Title"
-            image = search_deezer_track_image(f"{name} {artist}")
-            simplified_tracks.append(
-                Track(
-                    title=name,
-                    artist=artist,
-                    image=image,
-                )
-            )
-        return {"results": simplified_tracks}
+        for i, image in zip(missing, await image_enricher.track_images([pairs[i] for i in missing])):
+            images[i] = image
     except Exception as e:
-        return {"error": str(e)}
+        logger.warning(f"Image enrichment failed for search '{q}': {str(e)}")
+    simplified_tracks = [
+        Track(title=name, artist=artist, image=image)
+        for (name, artist), image in zip(pairs, images)
+    ]
+    return {"results": simplified_tracks, "error": error}
     
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(q: str = Query(..., description="Typed prefix"), limit: int = Query(8, ge=1, le=20)):
+    """Typeahead suggestions for tracks and artists, most popular first"""
+    index = await suggestions_snapshot.get()
+    return {"results": index.suggest(q, limit)}
+
 @router.get("/lastfm-top-artists", response_model=List[Artist])
 async def lastfm_top_artists():
     try:
-        artists_raw = get_lastfm_top_artists()
-        artists = []
-        for artist in artists_raw:
-            deezer_image = search_deezer_artist_image(artist.get("name") or "")
-            artists.append(Artist(
-                name=artist.get("name"),
-                playcount=int(artist.get("playcount", 0)),
-                listeners=int(artist.get("listeners", 0)),
-                mbid=artist.get("mbid"),
-                url=artist.get("url"),
-                streamable=artist.get("streamable") == "1",
-                image=deezer_image 
-            ))
-        return artists
+        return await top_artists_snapshot.get()
     except Exception as e:
         return {"error": str(e)}
     
 @router.get("/genre/{tag_name}", response_model=List[Track])
 async def get_tracks_for_genre(tag_name: str, limit: int = Query(20, le=50)):
     try:
-        raw_tracks = get_tracks_by_tags(tag_name, limit)
-        tracks=[]
-        for t in raw_tracks:
-            image = search_deezer_track_image(f"{t.get('name')} {t.get('artist', {}).get('name')}")
-            tracks.append(Track(
-                title=t["name"],
-                artist=t["artist"]["name"],
-                image=image,
-            ))
-        return tracks[:limit]
+        return await genre_pool.sample(tag_name, limit)
     except Exception as e:
         logger.warning(f"Error getting tracks for genre {tag_name}: {str(e)}")
         return []
-    
\ No newline at end of file
+    
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
 import logging
-from youtube_client import search_youtube_video
+from typing import List, Optional, Tuple
+from youtube_client import resolve_youtube_video, resolve_youtube_videos, invalidate_youtube_video
 from db.crud.playlist import playlist_crud
 from db.crud.track import track_crud
 from db.session import get_db
-from schemas.track import TrackCreate, TrackOut
-from routes.auth import get_current_user
+from search_index import search_index
+from routes.lastfm import suggest_saved_track
+from schemas.track import TrackBatchCreate, TrackCreate, TrackOut, YouTubeBatchRequest, YouTubeBatchResponse, YouTubeVideoResult
+from routes.auth import get_current_user, require_admin
 
 
 router = APIRouter(prefix="/track", tags=["Track"])
@@ -18,12 +23,12 @@ async def add_track_to_playlist(
     playlist_id: int,
     track: TrackCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add a track to a playlist"""
     try:
         # Check playlist exists and user owns it
-        playlist = playlist_crud.get_playlist(db, playlist_id)
+        playlist = await playlist_crud.get_playlist(db, playlist_id)
         if not playlist:
             raise HTTPException(status_code=404, detail="Playlist not found")
         if playlist.user_id != current_user.id:
@@ -31,7 +36,10 @@ async def add_track_to_playlist(
 
         # Add track
         track.playlist_id = playlist_id  # Ensure correct playlist ID
-        return track_crud.add_track_to_playlist(db, track)
+        db_track = await track_crud.add_track_to_playlist(db, track)
+        search_index.add(db_track.name, db_track.artist, saved=True)
+        suggest_saved_track(db_track.name, db_track.artist)
+        return db_track
 
     except HTTPException:
         raise
@@ -39,28 +47,57 @@ async def add_track_to_playlist(
         logger.error(f"Error adding track: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/{playlist_id}/tracks/batch", response_model=List[TrackOut])
+async def add_tracks_to_playlist(
+    playlist_id: int,
+    batch: TrackBatchCreate,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Add several tracks to a playlist in one transaction"""
+    try:
+        owner_id = await playlist_crud.get_playlist_owner(db, playlist_id)
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Playlist not found")
+        if owner_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to modify this playlist")
+
+        tracks = await track_crud.add_tracks_to_playlist(db, playlist_id, batch.tracks)
+        search_index.add_many(
+            ({"title": track["name"], "artist": track["artist"]} for track in tracks), saved=True
+        )
+        for track in tracks:
+            suggest_saved_track(track["name"], track["artist"])
+        return tracks
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error adding tracks: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.delete("/{playlist_id}/tracks/{track_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_track_from_playlist(
     playlist_id: int,
     track_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove a track from a playlist"""
     try:
         # Check playlist exists and user owns it
-        playlist = playlist_crud.get_playlist(db, playlist_id)
+        playlist = await playlist_crud.get_playlist(db, playlist_id)
         if not playlist:
             raise HTTPException(status_code=404, detail="Playlist not found")
         if playlist.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to modify this playlist")
 
         # Check track exists and belongs to playlist
-        track = track_crud.get_track(db, track_id)
+        track = await track_crud.get_track(db, track_id)
         if not track or track.playlist_id != playlist_id:
             raise HTTPException(status_code=404, detail="Track not found in playlist")
 
-        track_crud.remove_track(db, track_id)
+        await track_crud.remove_track(db, track_id)
         return None
 
     except HTTPException:
@@ -72,11 +109,59 @@ async def remove_track_from_playlist(
 @router.get("/youtube-track")
 async def get_youtube_video(track_title: str = Query(...), artist: str = Query(...)):
     try:
-        query = f"{track_title} {artist}"
-        video_id = search_youtube_video(query)
+        video_id = await resolve_youtube_video(track_title, artist)
         if not video_id:
             return {"error": "Video not found"}
         return {"video_id": video_id}
     except Exception as e:
         logger.error(f"YouTube search error: {str(e)}")
         return {"error": str(e)}
+
+async def _youtube_batch(tracks: List[Tuple[str, str]], stream: bool):
+    """Resolve a batch of tracks, either as one JSON body or as an NDJSON stream."""
+    def to_result(index, video_id, error):
+        title, artist = tracks[index]
+        return YouTubeVideoResult(index=index, title=title, artist=artist, video_id=video_id, error=error)
+
+    if stream:
+        async def ndjson():
+            async for index, video_id, error in resolve_youtube_videos(tracks):
+                yield json.dumps(to_result(index, video_id, error).model_dump()) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    results = [None] * len(tracks)
+    async for index, video_id, error in resolve_youtube_videos(tracks):
+        results[index] = to_result(index, video_id, error)
+    return YouTubeBatchResponse(results=results)
+
+@router.post("/youtube-tracks", response_model=YouTubeBatchResponse)
+async def get_youtube_videos(
+    batch: YouTubeBatchRequest,
+    stream: bool = Query(False, description="Stream results as NDJSON as they resolve")
+):
+    """Resolve YouTube video IDs for a list of tracks"""
+    return await _youtube_batch([(t.title, t.artist) for t in batch.tracks], stream)
+
+@router.get("/{playlist_id}/youtube-tracks", response_model=YouTubeBatchResponse)
+async def get_playlist_youtube_videos(
+    playlist_id: int,
+    stream: bool = Query(False, description="Stream results as NDJSON as they resolve"),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Resolve YouTube video IDs for every track in a playlist"""
+    playlist = await playlist_crud.get_playlist(db, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    tracks = [(track.name, track.artist) for track in playlist.tracks]
+    return await _youtube_batch(tracks, stream)
+
+@router.delete("/youtube-cache", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
+async def invalidate_youtube_cache(
+    track_title: Optional[str] = Query(None),
+    artist: Optional[str] = Query(None)
+):
+    """Invalidate a cached YouTube video ID, or the whole cache (admin only)"""
+    if not await invalidate_youtube_video(track_title, artist):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    return None
@@ -2,6 +2,7 @@ from .track import TrackBase, Track
 from .playlist import (
     PlaylistOut,
     SearchResponse,
+    SuggestResponse,
     PlaylistCreate,
     PlaylistUpdate,PlaylistPromptRequest, 
     PlaylistBase, PlaylistSummary
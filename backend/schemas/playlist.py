@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
-from .track import TrackBase, TrackOut, Track
+from .track import TrackBase, TrackOut, Track, MAX_TRACK_BATCH
 from datetime import datetime
 
 
@@ -9,11 +9,11 @@ class PlaylistBase(BaseModel):
     description: Optional[str] = Field(None, max_length=500)
 
 class PlaylistCreate(PlaylistBase):
-    tracks: List[TrackBase] = []
+    tracks: List[TrackBase] = Field([], max_length=MAX_TRACK_BATCH)
 
 class PlaylistUpdate(PlaylistBase):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
-    tracks: Optional[List[TrackBase]] = None
+    tracks: Optional[List[TrackBase]] = Field(None, max_length=MAX_TRACK_BATCH)
 
 class PlaylistOut(PlaylistBase):
     id: int
@@ -28,6 +28,14 @@ class SearchResponse(BaseModel):
     results: List[Track]
     error: Optional[str] = None
 
+class Suggestion(BaseModel):
+    type: str  # "track" or "artist"
+    title: Optional[str] = None
+    artist: Optional[str] = None
+
+class SuggestResponse(BaseModel):
+    results: List[Suggestion]
+
 class PlaylistPromptRequest(BaseModel):
     prompt: str
 
@@ -35,6 +43,8 @@ class PlaylistSummary(PlaylistBase):
     id: int
     created_at: datetime
     is_favorite: Optional[bool] = None  # Only here, set per-request
+    track_count: int = 0
+    favorite_count: int = 0
 
     class Config:
         from_attributes = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 class TrackBase(BaseModel):
@@ -6,9 +6,15 @@ class TrackBase(BaseModel):
     artist: str
     url: Optional[str] = None
 
+# Most tracks one request may save to a playlist
+MAX_TRACK_BATCH = 200
+
 class TrackCreate(TrackBase):
     playlist_id: int
 
+class TrackBatchCreate(BaseModel):
+    tracks: List[TrackBase] = Field(..., min_length=1, max_length=MAX_TRACK_BATCH)
+
 class TrackOut(TrackBase):
     id: int
     playlist_id: int
@@ -30,4 +36,20 @@ class LLMResponseItem(BaseModel):
 class LLMResponse(BaseModel):
     songs: List[LLMResponseItem]
 
+class YouTubeTrackQuery(BaseModel):
+    title: str
+    artist: str
+
+class YouTubeBatchRequest(BaseModel):
+    tracks: List[YouTubeTrackQuery] = Field(..., min_length=1, max_length=100)
+
+class YouTubeVideoResult(BaseModel):
+    index: int
+    title: str
+    artist: str
+    video_id: Optional[str] = None
+    error: Optional[str] = None
+
+class YouTubeBatchResponse(BaseModel):
+    results: List[YouTubeVideoResult]
 
@@ -0,0 +1,161 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+from utils.cache import normalize_query
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    words = normalize_query(text).split()
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class TrackSearchIndex:
+    """
+    Full-text index over track titles and artists (SQLite FTS5), fed from
+    the track catalog and from tracks users save. Every word of a query
+    matches as a prefix, results are ranked by BM25 with a boost for tracks
+    saved by users, and tracks are deduplicated by normalized title/artist.
+    """
+
+    # Completed with how the saves column is updated
+    _UPSERT = (
+        "INSERT INTO search_tracks (key, title, artist, image, saves) VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT(key) DO UPDATE SET"
+        " image = COALESCE(excluded.image, image),"
+    )
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.CACHE_DB_PATH
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.upstream_fallbacks = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=2000")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_tracks (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                image TEXT,
+                saves INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_tracks_fts USING fts5(
+                title, artist,
+                content='search_tracks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS search_tracks_ai AFTER INSERT ON search_tracks BEGIN
+                INSERT INTO search_tracks_fts(rowid, title, artist) VALUES (new.id, new.title, new.artist);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_tracks_ad AFTER DELETE ON search_tracks BEGIN
+                INSERT INTO search_tracks_fts(search_tracks_fts, rowid, title, artist)
+                VALUES ('delete', old.id, old.title, old.artist);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_tracks_au AFTER UPDATE OF title, artist ON search_tracks BEGIN
+                INSERT INTO search_tracks_fts(search_tracks_fts, rowid, title, artist)
+                VALUES ('delete', old.id, old.title, old.artist);
+                INSERT INTO search_tracks_fts(rowid, title, artist) VALUES (new.id, new.title, new.artist);
+            END;
+            """
+        )
+
+    def add_many(self, tracks: Iterable[Dict], saved: bool = False):
+        """
+        Index {"title", "artist", "image"} dicts. Known tracks keep their
+        image unless a new one is given; `saved` counts a user save (or
+        "saves" in a dict gives the number of saves to add).
+        """
+        rows = self._rows(tracks, saved)
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(self._UPSERT + " saves = saves + excluded.saves", rows)
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Search index update failed: {str(e)}")
+            self._rollback()
+
+    @staticmethod
+    def _rows(tracks: Iterable[Dict], saved: bool = False) -> List[tuple]:
+        return [
+            (f"{normalize_query(t['title'])}|{normalize_query(t['artist'])}",
+             t["title"], t["artist"], t.get("image"), int(t.get("saves", saved)))
+            for t in tracks
+            if t.get("title") and t.get("artist")
+        ]
+
+    def _rollback(self):
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+
+    def rebuild(self, tracks: Iterable[Dict], saved: Iterable[Dict]):
+        """
+        Replace the whole index with the given tracks, and set the save
+        counts from `saved` ({"title", "artist", "saves"} dicts). The index
+        file is shared by all workers, so this runs as one write transaction:
+        concurrent rebuilds queue up instead of interleaving, and running it
+        twice gives the same result.
+        """
+        rows = self._rows(tracks)
+        saved_rows = self._rows(saved)
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM search_tracks")
+                self._conn.executemany(self._UPSERT + " saves = saves + excluded.saves", rows)
+                self._conn.executemany(self._UPSERT + " saves = excluded.saves", saved_rows)
+                self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            self._rollback()
+            raise
+
+    def add(self, title: str, artist: str, image: str = None, saved: bool = False):
+        self.add_many([{"title": title, "artist": artist, "image": image}], saved=saved)
+
+    def search(self, text: str, limit: int = 10) -> List[Dict]:
+        query = fts_query(text)
+        self.queries += 1
+        if query is None:
+            return []
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT t.title, t.artist, t.image FROM search_tracks_fts"
+                    " JOIN search_tracks t ON t.id = search_tracks_fts.rowid"
+                    " WHERE search_tracks_fts MATCH ?"
+                    " ORDER BY bm25(search_tracks_fts, 2.0, 1.0) - MIN(t.saves, 10) * 0.2"
+                    " LIMIT ?",
+                    (query, limit),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Search index query failed: {str(e)}")
+            return []
+        return [{"title": title, "artist": artist, "image": image} for title, artist, image in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM search_tracks")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM search_tracks").fetchone()[0]
+        return {"size": size, "queries": self.queries, "upstream_fallbacks": self.upstream_fallbacks}
+
+
+search_index = TrackSearchIndex()
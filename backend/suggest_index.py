@@ -0,0 +1,155 @@
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.cache import normalize_query
+
+TRACK = "track"
+ARTIST = "artist"
+
+# Results for very short prefixes cover large parts of the index, so they
+# are memoized (up to MEMO_SIZE of them) until the next update
+MEMO_PREFIX_LENGTH = 2
+MEMO_SIZE = 20
+
+
+class PrefixIndex:
+    """
+    Typeahead index over track titles and artist names.
+
+    Every suggestion is stored once and reachable under a few normalized
+    keys (the full text and each later word), kept in one sorted list so a
+    prefix lookup is a bisect plus a short scan. Matches are ranked by a
+    popularity score that callers accumulate with add(). The number of
+    suggestions is capped; once full, only more popular ones get in.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        # Sorted "key\x00id" strings: one flat list keeps memory low and
+        # ties on the key stay ordered
+        self._keys: List[str] = []
+        self._ids: Dict[Tuple[str, str, str], int] = {}
+        # id -> [score, kind, title, artist]
+        self._items: Dict[int, list] = {}
+        self._next_id = 0
+        self._memo: Dict[str, List[Dict]] = {}
+        # (score, id) min-heap for eviction; scores only grow, so entries
+        # with an outdated score are re-pushed when they surface
+        self._by_score: List[Tuple[float, int]] = []
+
+    @classmethod
+    def build(cls, suggestions: Iterable[Tuple[str, Optional[str], Optional[str], float]],
+              max_entries: int = 50000) -> "PrefixIndex":
+        """
+        Build an index from (kind, title, artist, score) tuples in one pass,
+        keeping the max_entries most popular suggestions.
+        """
+        index = cls(max_entries)
+        merged: Dict[Tuple[str, str, str], list] = {}
+        for kind, title, artist, score in suggestions:
+            identity = index._identity(kind, title, artist)
+            if identity is None:
+                continue
+            if identity in merged:
+                merged[identity][0] += score
+            else:
+                merged[identity] = [score, kind, title if kind == TRACK else None, artist]
+
+        kept = heapq.nlargest(max_entries, merged.items(), key=lambda entry: entry[1][0])
+        for item_id, (identity, item) in enumerate(kept):
+            index._ids[identity] = item_id
+            index._items[item_id] = item
+            text = item[2] if item[1] == TRACK else item[3]
+            index._keys.extend(f"{key}\x00{item_id}" for key in index._index_keys(text))
+        index._keys.sort()
+        index._by_score = [(item[0], item_id) for item_id, item in index._items.items()]
+        heapq.heapify(index._by_score)
+        index._next_id = len(kept)
+        return index
+
+    @staticmethod
+    def _identity(kind: str, title: Optional[str], artist: Optional[str]) -> Optional[Tuple[str, str, str]]:
+        text = title if kind == TRACK else artist
+        if not text:
+            return None
+        return kind, normalize_query(text), normalize_query(artist or "")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def _index_keys(text: str) -> List[str]:
+        words = normalize_query(text).split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def add(self, kind: str, title: Optional[str], artist: Optional[str] = None, score: float = 1.0):
+        """Add a suggestion, or raise the score of an existing one."""
+        identity = self._identity(kind, title, artist)
+        if identity is None:
+            return
+        text = title if kind == TRACK else artist
+        item_id = self._ids.get(identity)
+        if item_id is not None:
+            self._items[item_id][0] += score
+            self._memo.clear()
+            return
+        if len(self._items) >= self.max_entries and not self._evict_below(score):
+            return
+
+        item_id = self._next_id
+        self._next_id += 1
+        self._ids[identity] = item_id
+        self._items[item_id] = [score, kind, title if kind == TRACK else None, artist]
+        heapq.heappush(self._by_score, (score, item_id))
+        for key in self._index_keys(text):
+            insort(self._keys, f"{key}\x00{item_id}")
+        self._memo.clear()
+
+    def _evict_below(self, score: float) -> bool:
+        """Make room by dropping the least popular suggestion, if it is less popular than `score`."""
+        while True:
+            lowest, victim = self._by_score[0]
+            item = self._items.get(victim)
+            if item is None:
+                heapq.heappop(self._by_score)
+            elif item[0] != lowest:
+                heapq.heapreplace(self._by_score, (item[0], victim))
+            else:
+                break
+        if lowest >= score:
+            return False
+        heapq.heappop(self._by_score)
+        _, kind, title, artist = self._items.pop(victim)
+        del self._ids[self._identity(kind, title, artist)]
+        for key in self._index_keys(title if kind == TRACK else artist):
+            entry = f"{key}\x00{victim}"
+            position = bisect_left(self._keys, entry)
+            if position < len(self._keys) and self._keys[position] == entry:
+                del self._keys[position]
+        return True
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return []
+        memoize = len(prefix) <= MEMO_PREFIX_LENGTH
+        if memoize and prefix in self._memo:
+            return self._memo[prefix][:limit]
+
+        ids = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and self._keys[position].startswith(prefix):
+            ids.add(int(self._keys[position].rpartition("\x00")[2]))
+            position += 1
+
+        top = heapq.nlargest(max(limit, MEMO_SIZE) if memoize else limit, ids, key=lambda i: self._items[i][0])
+        results = []
+        for item_id in top:
+            score, kind, title, artist = self._items[item_id]
+            results.append({"type": kind, "title": title, "artist": artist, "score": score})
+        if memoize:
+            self._memo[prefix] = results
+        return results[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        return {"suggestions": len(self._items), "keys": len(self._keys)}
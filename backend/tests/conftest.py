@@ -1,48 +1,114 @@
+import os
+import tempfile
 import pytest
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import sessionmaker
+
+# Keep the local caches out of the working tree during tests
+_data_dir = tempfile.mkdtemp()
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(_data_dir, "cache.db"))
+# The track catalog opens its own sessions, so keep the default database out of the tree too
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_data_dir, 'backend.db')}")
+os.environ.setdefault("WARM_CACHES_ON_STARTUP", "false")
+os.environ.setdefault("QUIZ_PREGENERATE_ON_STARTUP", "false")
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+
+import asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from main import app
 from db.models import User, Track, Playlist, Base
 from db.session import get_db
+from db.migrate import upgrade_database
+from utils.cache import clear_caches
+from utils.snapshot import clear_snapshots
+from routes.lastfm import genre_pool
+from routes.ai import quiz_store
+from catalog import track_catalog
+from search_index import search_index
+from fuzzy_matcher import track_matcher
+from utils.http_client import upstream_clients
 
 # Use SQLite in-memory database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+async def _create_tables(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def _drop_tables(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+async def _empty_tables(engine):
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+# The track catalog opens its own sessions on the application database
+upgrade_database()
 
 @pytest.fixture(scope="session")
 def engine():
-    engine = create_engine(
+    # One shared connection, so every session sees the same in-memory database
+    engine = create_async_engine(
         SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
     )
     # Create all tables before running tests
-    Base.metadata.create_all(bind=engine)
+    asyncio.run(_create_tables(engine))
     
     yield engine
     
     # Drop all tables after tests
-    Base.metadata.drop_all(bind=engine)
+    asyncio.run(_drop_tables(engine))
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    clear_caches()
+    clear_snapshots()
+    genre_pool.clear()
+    quiz_store.clear()
+    asyncio.run(track_catalog.clear())
+    search_index.clear()
+    track_matcher.clear()
+    for breaker in upstream_clients.breakers.values():
+        breaker.reset()
+    yield
 
 @pytest.fixture(scope="function")
 def db_session(engine):
-    connection = engine.connect()
-    transaction = connection.begin()
-    SessionLocal = sessionmaker(bind=connection)
-    session = SessionLocal()
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
-    yield session
+    yield SessionLocal
 
-    session.close()
-    transaction.rollback()
-    connection.close()
+    # Sessions commit for real, so empty the tables between tests
+    asyncio.run(_empty_tables(engine))
 
 @pytest.fixture
 def client(db_session):
-    app.dependency_overrides[get_db] = lambda: db_session
+    async def override_get_db():
+        async with db_session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
+@pytest.fixture
+def query_counter(engine):
+    """Records the SQL statements run on the test database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
 @pytest.fixture
 def test_db(db_session):
     yield db_session
@@ -71,6 +137,10 @@ def auth_headers(client, test_db):
     
     return {"Authorization": f"Bearer {token}"}
 
+@pytest.fixture
+def admin_headers():
+    return {"X-Admin-Key": os.environ["ADMIN_API_KEY"]}
+
 @pytest.fixture
 def create_test_playlist(client, auth_headers):
     def _create_playlist(name="Test Playlist", description="Test playlist description"):
@@ -1,6 +1,8 @@
+import json
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from main import app
+from schemas.track import Track
 
 client = TestClient(app)
 
@@ -96,4 +98,99 @@ def test_ai_service_error(client, test_db):
         
         response = client.post("/ai/playlist-from-prompt", json={"prompt": "some music"})
         assert response.status_code == 500
-        assert "error" in response.json()["detail"].lower()
\ No newline at end of file
+        assert "error" in response.json()["detail"].lower()
+
+def test_playlist_from_prompt_stream(client, test_db):
+    async def fake_search(title, artist):
+        return None if title == "Missing" else Track(title=title, artist=artist)
+
+    async def fake_stream(self, prompt):
+        for song in [
+            {"title": "Imagine", "artist": "John Lennon"},
+            {"title": "Missing", "artist": "Nobody"},
+            {"title": "Yesterday", "artist": "The Beatles"},
+        ]:
+            yield song
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream", fake_stream), \
+         patch("lastfm_client.LastFMClient.search_tracks", side_effect=fake_search):
+        response = client.post("/ai/playlist-from-prompt/stream", json={"prompt": "calm music"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    tracks = sorted((e for e in events if e["event"] == "track"), key=lambda e: e["index"])
+    assert [(e["index"], e["track"]["title"]) for e in tracks] == [(0, "Imagine"), (2, "Yesterday")]
+    assert events[-1] == {"event": "summary", "requested": 3, "resolved": 2, "dropped": 1}
+
+def test_playlist_from_quiz_stream_ai_error(client, test_db):
+    async def failing_stream(self, prompt):
+        raise Exception("AI service unavailable")
+        yield
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream", failing_stream):
+        quiz_data = {
+            "mood": "happy",
+            "activity": "dancing",
+            "preferred_genres": ["pop"],
+            "decade": "90s",
+            "discovery_mode": "mix",
+        }
+        response = client.post("/ai/playlist-from-quiz/stream", json=quiz_data)
+    assert response.status_code == 500
+
+def test_stream_reports_llm_failure_mid_stream(client, test_db):
+    async def broken_stream(self, prompt):
+        yield {"title": "Imagine", "artist": "John Lennon"}
+        raise Exception("AI agent stream error: connection reset")
+
+    async def fake_search(title, artist):
+        return Track(title=title, artist=artist)
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream", broken_stream), \
+         patch("lastfm_client.LastFMClient.search_tracks", side_effect=fake_search):
+        response = client.post("/ai/playlist-from-prompt/stream", json={"prompt": "calm music"})
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["track", "error", "summary"]
+    assert events[-1] == {"event": "summary", "requested": 1, "resolved": 1, "dropped": 0}
+
+
+def test_invalid_llm_items_are_skipped(client, test_db):
+    with patch("ai_agent_client.AIAgentClient.generate", new_callable=AsyncMock) as mock_ai, \
+         patch("playlist_manager.PlaylistService.generate_playlist_from_llm_response", new_callable=AsyncMock) as mock_playlist:
+        mock_ai.return_value = [
+            {"title": "Imagine", "artist": "John Lennon"},
+            {"title": "No Artist"},
+            "Yesterday by The Beatles",
+            {"title": None, "artist": "Nobody"},
+        ]
+        mock_playlist.return_value = [{"title": "Imagine", "artist": "John Lennon"}]
+        response = client.post("/ai/playlist-from-prompt", json={"prompt": "calm music"})
+
+    assert response.status_code == 200
+    songs = mock_playlist.call_args.args[0]
+    assert [(s.title, s.artist) for s in songs] == [("Imagine", "John Lennon")]
+
+def test_stream_skips_invalid_llm_items(client, test_db):
+    async def sloppy_stream(self, prompt):
+        for song in [
+            {"name": "Imagine"},
+            {"title": "Imagine", "artist": "John Lennon"},
+            ["not", "a", "song"],
+            {"title": "Yesterday", "artist": "The Beatles"},
+        ]:
+            yield song
+
+    async def fake_search(title, artist):
+        return Track(title=title, artist=artist)
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream", sloppy_stream), \
+         patch("lastfm_client.LastFMClient.search_tracks", side_effect=fake_search):
+        response = client.post("/ai/playlist-from-prompt/stream", json={"prompt": "calm music"})
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    titles = sorted(e["track"]["title"] for e in events if e["event"] == "track")
+    assert titles == ["Imagine", "Yesterday"]
+    assert events[-1] == {"event": "summary", "requested": 4, "resolved": 2, "dropped": 2}
@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock
+from utils.cache import LRUCache, TieredCache, MISSING, normalize_query
+from deezer_client import search_deezer_track_image
+
+def test_normalize_query():
+    assert normalize_query("  Bohemian   RHAPSODY!", "Queen ") == "bohemian rhapsody queen"
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_entries_expire():
+    cache = LRUCache(ttl=60)
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+def test_tiered_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TieredCache("images", ttl=60, path=path).set("k", "http://img")
+
+    restarted = TieredCache("images", ttl=60, path=path)
+    assert restarted.get("k") == "http://img"
+    assert restarted.stats()["disk"]["hits"] == 1
+    # Promoted into memory, so the next read stays in-process
+    assert restarted.get("k") == "http://img"
+    assert restarted.stats()["memory"]["hits"] == 1
+
+def test_tiered_cache_keeps_negative_results(tmp_path):
+    cache = TieredCache("images", ttl=60, negative_ttl=-1, path=str(tmp_path / "cache.db"))
+    cache.set("known", None, ttl=60)
+    cache.set("expired", None)
+
+    assert cache.get("known") is None
+    assert cache.get("expired") is MISSING
+
+@pytest.mark.asyncio
+async def test_deezer_lookup_is_cached():
+    response = httpx.Response(200, json={"data": [{"album": {"cover_medium": "http://cover"}}]})
+    with patch("deezer_client.request", new_callable=AsyncMock, return_value=response) as mock_request:
+        assert await search_deezer_track_image("Yellow Coldplay") == "http://cover"
+        assert await search_deezer_track_image("yellow  coldplay") == "http://cover"
+    assert mock_request.call_count == 1
+
+@pytest.mark.asyncio
+async def test_deezer_errors_are_not_cached():
+    error = httpx.Response(200, json={"error": {"type": "Exception", "message": "Quota limit exceeded"}})
+    with patch("deezer_client.request", new_callable=AsyncMock, return_value=error) as mock_request:
+        assert await search_deezer_track_image("Yellow Coldplay") is None
+        assert await search_deezer_track_image("Yellow Coldplay") is None
+    assert mock_request.call_count == 2
@@ -0,0 +1,98 @@
+import httpx
+import pytest
+from datetime import datetime, timedelta, UTC
+from unittest.mock import AsyncMock, patch
+from catalog import TrackCatalog, catalog_key, track_catalog
+from db.crud.catalog import catalog_crud
+from enrichment_service import ImageEnrichmentService
+from lastfm_client import LastFMClient
+from youtube_client import resolve_youtube_video
+
+def lastfm_match(name, artist):
+    return httpx.Response(200, json={"results": {"trackmatches": {"track": [{
+        "name": name, "artist": artist, "mbid": "mbid-1", "url": "http://last.fm/x", "image": []
+    }]}}})
+
+def test_catalog_key_normalizes():
+    assert catalog_key("Imagine!", "JOHN  Lennon") == catalog_key("imagine", "john lennon")
+
+@pytest.mark.asyncio
+async def test_resolved_tracks_are_served_from_catalog():
+    lastfm = AsyncMock(return_value=lastfm_match("Imagine", "John Lennon"))
+    with patch("lastfm_client.request", lastfm), \
+         patch("lastfm_client.search_deezer_track_image", new_callable=AsyncMock) as deezer:
+        deezer.return_value = "http://img"
+        client = LastFMClient(api_key="key")
+        first = await client.search_tracks("imagine", "john lennon (remastered)")
+        second = await client.search_tracks("imagine", "john lennon (remastered)")
+        canonical = await client.search_tracks("Imagine", "John Lennon")
+
+    assert first == second == canonical
+    assert first.image == "http://img"
+    assert lastfm.call_count == 1
+    entry = await track_catalog.lookup("Imagine", "John Lennon")
+    assert entry["mbid"] == "mbid-1"
+    assert entry["url"] == "http://last.fm/x"
+
+@pytest.mark.asyncio
+async def test_fallback_images_are_not_stored_in_catalog():
+    lastfm = AsyncMock(return_value=lastfm_match("Obscure", "Artist"))
+    with patch("lastfm_client.request", lastfm), \
+         patch("lastfm_client.search_deezer_track_image", new_callable=AsyncMock) as deezer:
+        deezer.return_value = None
+        client = LastFMClient(api_key="key")
+        first = await client.search_tracks("Obscure", "Artist")
+        deezer.return_value = "http://deezer"
+        second = await client.search_tracks("Obscure", "Artist")
+
+    # The placeholder is only a response-time fallback
+    assert first.image.startswith("https://placehold.co/")
+    assert second.image == "http://deezer"
+    assert lastfm.call_count == 2
+    assert (await track_catalog.lookup("Obscure", "Artist"))["image"] == "http://deezer"
+
+@pytest.mark.asyncio
+async def test_enrichment_only_fetches_missing_images():
+    await track_catalog.remember("Known", "Artist", image="http://known")
+    enricher = ImageEnrichmentService()
+    with patch("enrichment_service.search_deezer_track_image", new_callable=AsyncMock) as deezer:
+        deezer.return_value = "http://fetched"
+        images = await enricher.track_images([("Known", "Artist"), ("New", "Artist")])
+        again = await enricher.track_images([("New", "Artist")])
+
+    assert images == ["http://known", "http://fetched"]
+    assert again == ["http://fetched"]
+    deezer.assert_called_once_with("New Artist", background=False, raise_errors=True)
+
+@pytest.mark.asyncio
+async def test_youtube_ids_are_written_back_and_reused():
+    await track_catalog.remember("Known", "Artist", image="http://known")
+    with patch("youtube_client.search_youtube_video", new_callable=AsyncMock) as search:
+        search.return_value = "vid123"
+        assert await resolve_youtube_video("Known", "Artist") == "vid123"
+
+    entry = await track_catalog.lookup("Known", "Artist")
+    assert entry["youtube_video_id"] == "vid123"
+    # Earlier fields are kept when new ones are written
+    assert entry["image"] == "http://known"
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_misses():
+    await track_catalog.remember("Old", "Artist", image="http://old")
+    async with track_catalog.session_factory() as db:
+        entry = await catalog_crud.get_by_key(db, catalog_key("Old", "Artist"))
+        entry.refreshed_at = datetime.now(UTC) - timedelta(days=365)
+        await db.commit()
+
+    catalog = TrackCatalog(max_age=24 * 3600)
+    assert await catalog.lookup("Old", "Artist") is None
+
+@pytest.mark.asyncio
+async def test_catalog_errors_are_treated_as_misses():
+    def broken_session():
+        raise Exception("database is locked")
+
+    catalog = TrackCatalog(session_factory=broken_session)
+    assert await catalog.lookup("Any", "Artist") is None
+    await catalog.remember("Any", "Artist", image="http://img")
+    assert catalog.stats() == {"hits": 0, "misses": 1, "writes": 0}
@@ -0,0 +1,87 @@
+import time
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.http_client import request, upstream_clients
+from lastfm_client import LastFMClient
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["short_circuited"] == 1
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 31
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 31
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_upstream_call():
+    breaker = upstream_clients.breakers["deezer"]
+    client = upstream_clients.get("deezer")
+    timeout = httpx.ConnectTimeout("timed out")
+    with patch.object(client, "request", new_callable=AsyncMock, side_effect=timeout) as mock_request, \
+         patch("utils.http_client.settings.UPSTREAM_BACKOFF_BASE", 0.001):
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(httpx.ConnectTimeout):
+                await request("deezer", "GET", "http://example.com")
+        calls = mock_request.call_count
+
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await request("deezer", "GET", "http://example.com")
+        assert time.perf_counter() - start < 0.01
+        assert mock_request.call_count == calls
+
+@pytest.mark.asyncio
+async def test_lastfm_image_used_when_deezer_circuit_is_open():
+    upstream_clients.breakers["deezer"].record_failure()
+    upstream_clients.breakers["deezer"].state = "open"
+    upstream_clients.breakers["deezer"].opened_at = time.monotonic()
+
+    lastfm_response = httpx.Response(200, json={"results": {"trackmatches": {"track": [{
+        "name": "Yellow", "artist": "Coldplay",
+        "image": [{"#text": "http://lastfm/small"}, {"#text": "http://lastfm/large"}],
+    }]}}})
+    with patch("lastfm_client.request", new_callable=AsyncMock, return_value=lastfm_response):
+        track = await LastFMClient(api_key="test").search_tracks("Yellow", "Coldplay")
+
+    assert track.image == "http://lastfm/large"
+
+def test_health_reports_breaker_state(client, test_db):
+    resp = client.get("/health")
+    assert resp.json()["status"] == "healthy"
+
+    breaker = upstream_clients.breakers["lastfm"]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    resp = client.get("/health")
+    assert resp.json()["status"] == "degraded"
+    assert resp.json()["circuit_breakers"]["lastfm"]["state"] == "open"
@@ -0,0 +1,16 @@
+from db.session import async_database_url
+
+
+def test_plain_urls_use_async_drivers():
+    assert async_database_url("sqlite:///./backend.db") == "sqlite+aiosqlite:///./backend.db"
+    assert (
+        async_database_url("postgresql://user:secret@db:5432/vibetune")
+        == "postgresql+asyncpg://user:secret@db:5432/vibetune"
+    )
+    assert async_database_url("postgres://user@db/vibetune") == "postgresql+asyncpg://user@db/vibetune"
+
+
+def test_explicit_drivers_are_kept():
+    assert async_database_url("sqlite+aiosqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    assert async_database_url("postgresql+asyncpg://db/vibetune") == "postgresql+asyncpg://db/vibetune"
+    assert async_database_url("sqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
@@ -0,0 +1,69 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from enrichment_service import ImageEnrichmentService, IncompleteEnrichment
+from utils.rate_limit import RateLimitExceeded
+
+async def fake_track_image(query, **kwargs):
+    if query.startswith("slow"):
+        await asyncio.sleep(5)
+    await asyncio.sleep(0.1)
+    return f"http://img/{query}"
+
+@pytest.mark.asyncio
+async def test_track_images_run_concurrently_in_order():
+    service = ImageEnrichmentService(max_concurrency=50, deadline=2.0)
+    pairs = [(f"Song {i}", "Artist") for i in range(50)]
+
+    with patch("enrichment_service.search_deezer_track_image", side_effect=fake_track_image):
+        start = time.perf_counter()
+        images = await service.track_images(pairs)
+        elapsed = time.perf_counter() - start
+
+    assert images == [f"http://img/Song {i} Artist" for i in range(50)]
+    assert elapsed < 1.0
+
+@pytest.mark.asyncio
+async def test_lookups_past_deadline_return_none():
+    service = ImageEnrichmentService(deadline=0.3)
+    pairs = [("fast", "Artist"), ("slow", "Artist")]
+
+    with patch("enrichment_service.search_deezer_track_image", side_effect=fake_track_image):
+        images = await service.track_images(pairs)
+
+    assert images == ["http://img/fast Artist", None]
+
+@pytest.mark.asyncio
+async def test_artist_lookup_errors_return_none():
+    service = ImageEnrichmentService()
+
+    async def flaky(name, **kwargs):
+        if name == "Broken":
+            raise Exception("Deezer error")
+        return f"http://img/{name}"
+
+    with patch("enrichment_service.search_deezer_artist_image", side_effect=flaky):
+        images = await service.artist_images(["Adele", "Broken"])
+
+    assert images == ["http://img/Adele", None]
+
+@pytest.mark.asyncio
+async def test_strict_enrichment_reports_failed_lookups():
+    service = ImageEnrichmentService(background=True)
+
+    async def throttled(query, **kwargs):
+        assert kwargs["background"] is True
+        if query.startswith("Throttled"):
+            raise RateLimitExceeded("queue full")
+        return None if query.startswith("Unknown") else f"http://img/{query}"
+
+    pairs = [("Found", "Artist"), ("Unknown", "Artist"), ("Throttled", "Artist")]
+    with patch("enrichment_service.search_deezer_track_image", side_effect=throttled):
+        # "No image" is a result; a failed lookup is not
+        assert await service.track_images(pairs[:2], strict=True) == ["http://img/Found Artist", None]
+        with pytest.raises(IncompleteEnrichment) as exc:
+            await service.track_images(pairs, strict=True)
+
+    assert exc.value.images == ["http://img/Found Artist", None, None]
+    assert exc.value.failed == 1
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fuzzy_matcher import FuzzyTrackMatcher, clean_artist, clean_title, track_matcher
+from lastfm_client import LastFMClient
+
+@pytest.fixture
+def matcher():
+    matcher = FuzzyTrackMatcher(threshold=0.8)
+    matcher.add("Uptown Funk", "Mark Ronson", "http://funk")
+    matcher.add("Bohemian Rhapsody", "Queen", "http://queen")
+    matcher.add("Hallelujah", "Leonard Cohen", "http://cohen")
+    return matcher
+
+def test_clean_strips_decorations():
+    assert clean_title("Imagine (Remastered 2010)") == "imagine"
+    assert clean_title("Heroes - 2017 Remaster") == "heroes"
+    assert clean_title("Stay With Me") == "stay with me"
+    assert clean_title("Uptown Funk feat. Bruno Mars") == "uptown funk"
+    assert clean_artist("Mark Ronson ft. Bruno Mars") == "mark ronson"
+
+@pytest.mark.parametrize("title,artist,expected", [
+    ("Uptown Funk (feat. Bruno Mars)", "Mark Ronson ft. Bruno Mars", "Uptown Funk"),
+    ("Bohemian Rhapsody!", "Queen", "Bohemian Rhapsody"),
+    ("bohemian rhapsody - remastered 2011", "QUEEN", "Bohemian Rhapsody"),
+])
+def test_variants_match_known_track(matcher, title, artist, expected):
+    assert matcher.match(title, artist)["title"] == expected
+
+@pytest.mark.parametrize("title,artist", [
+    ("Hallelujah", "Jeff Buckley"),  # same title, different artist
+    ("Funky Town", "Lipps Inc."),
+    ("Queen", "Rhapsody"),
+])
+def test_different_tracks_do_not_match(matcher, title, artist):
+    assert matcher.match(title, artist) is None
+
+@pytest.mark.parametrize("known,title", [
+    ("Someone Like You", "Someone Like Me"),
+    ("Hello", "Hell"),
+    ("Yesterday", "Yesterdays"),
+])
+def test_other_songs_by_same_artist_do_not_match(known, title):
+    matcher = FuzzyTrackMatcher(threshold=0.8)
+    matcher.add(known, "Adele")
+    assert matcher.match(title, "Adele") is None
+
+def test_matcher_size_is_capped():
+    matcher = FuzzyTrackMatcher(max_tracks=4)
+    for i in range(5):
+        matcher.add(f"Song number {i}", "Artist", f"http://{i}")
+
+    # The older half was dropped to make room
+    assert len(matcher) == 3
+    assert matcher.match("Song number 0", "Artist") is None
+    assert matcher.match("Song number 4", "Artist")["image"] == "http://4"
+    assert matcher.match("Song number 2", "Artist")["image"] == "http://2"
+
+def test_avoided_lookups_are_counted(matcher):
+    matcher.match("Uptown Funk", "Mark Ronson")
+    matcher.match("Unknown", "Nobody")
+    assert matcher.stats()["avoided_upstream_lookups"] == 1
+    assert matcher.stats()["avoided_rate"] == 0.5
+
+@pytest.mark.asyncio
+async def test_search_tracks_skips_lastfm_for_near_duplicates():
+    track_matcher.add("Uptown Funk", "Mark Ronson", "http://funk")
+    with patch("lastfm_client.request", new_callable=AsyncMock) as lastfm:
+        track = await LastFMClient(api_key="key").search_tracks("Uptown Funk!", "Mark Ronson feat. Bruno Mars")
+
+    assert track.title == "Uptown Funk"
+    assert track.image == "http://funk"
+    lastfm.assert_not_called()
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from enrichment_service import IncompleteEnrichment
+from genre_pool import GenrePool
+
+def page_of(tag, page, size=10):
+    return [{"name": f"{tag} song {page}-{i}", "artist": {"name": "Artist"}} for i in range(size)]
+
+def no_images(pairs, strict=False):
+    return [None] * len(pairs)
+
+@pytest.mark.asyncio
+async def test_pool_prefetches_all_pages_once():
+    fetch_page = AsyncMock(side_effect=lambda tag, page: page_of(tag, page))
+    pool = GenrePool(fetch_page, pages=5)
+
+    with patch.object(pool.enricher, "track_images", new_callable=AsyncMock) as mock_images:
+        mock_images.side_effect = lambda pairs, strict=False: ["http://img"] * len(pairs)
+        await asyncio.gather(*pool.warm(["Rock"]))
+        first = await pool.sample("Rock", 20)
+        second = await pool.sample("rock", 20)
+
+    assert fetch_page.call_count == 5
+    assert mock_images.call_count == 1
+    assert len(first) == len(second) == 20
+    assert len({t.title for t in first}) == 20
+
+@pytest.mark.asyncio
+async def test_cold_known_tag_is_served_from_first_page():
+    fill = asyncio.Event()
+
+    async def fetch_page(tag, page):
+        if page > 1:
+            await fill.wait()
+        return page_of(tag, page)
+
+    pool = GenrePool(fetch_page, pages=5, known_tags=["rock"])
+    with patch.object(pool.enricher, "track_images", new_callable=AsyncMock) as pool_images, \
+         patch.object(pool.page_enricher, "track_images", new_callable=AsyncMock) as page_images:
+        pool_images.side_effect = no_images
+        page_images.side_effect = no_images
+
+        # The full pool is still loading, the request does not wait for it
+        tracks = await asyncio.wait_for(pool.sample("rock", 5), timeout=1)
+        assert len(tracks) == 5
+        assert all(t.title.startswith("rock song 1-") for t in tracks)
+        assert len(page_images.call_args.args[0]) == 5
+
+        fill.set()
+        await pool._pool("rock").refresh()
+        assert pool.stats() == {"rock": 50}
+        await pool.sample("rock", 5)
+
+    assert page_images.call_count == 1
+
+@pytest.mark.asyncio
+async def test_unknown_tags_do_not_get_pools():
+    fetch_page = AsyncMock(side_effect=lambda tag, page: page_of(tag, page))
+    pool = GenrePool(fetch_page, pages=5, known_tags=["rock"])
+    with patch.object(pool.page_enricher, "track_images", new_callable=AsyncMock) as page_images:
+        page_images.side_effect = no_images
+        tracks = await pool.sample("some obscure tag", 5)
+
+    assert len(tracks) == 5
+    assert fetch_page.call_count == 1
+    assert pool.stats() == {}
+
+@pytest.mark.asyncio
+async def test_pool_survives_failed_pages():
+    async def fetch_page(tag, page):
+        if page > 1:
+            raise Exception("Last.fm error")
+        return page_of(tag, page, size=3)
+
+    pool = GenrePool(fetch_page, pages=5)
+    with patch.object(pool.enricher, "track_images", new_callable=AsyncMock) as mock_images:
+        mock_images.side_effect = no_images
+        await asyncio.gather(*pool.warm(["jazz"]))
+        tracks = await pool.sample("jazz", 20)
+
+    assert len(tracks) == 3
+
+@pytest.mark.asyncio
+async def test_pool_evicts_least_recently_used_tags():
+    fetch_page = AsyncMock(side_effect=lambda tag, page: page_of(tag, page, size=1))
+    pool = GenrePool(fetch_page, pages=1, max_tags=2)
+    with patch.object(pool.enricher, "track_images", new_callable=AsyncMock) as mock_images:
+        mock_images.side_effect = no_images
+        for tag in ["pop", "rock", "jazz"]:
+            await asyncio.gather(*pool.warm([tag]))
+
+    assert list(pool.stats()) == ["rock", "jazz"]
+
+@pytest.mark.asyncio
+async def test_rate_limited_pool_is_reloaded_soon():
+    fetch_page = AsyncMock(side_effect=lambda tag, page: page_of(tag, page, size=2))
+    pool = GenrePool(fetch_page, pages=1, max_age=3600)
+
+    def throttled(pairs, strict=False):
+        raise IncompleteEnrichment(["http://img", None], failed=1)
+
+    with patch.object(pool.enricher, "track_images", new_callable=AsyncMock) as mock_images:
+        mock_images.side_effect = throttled
+        await asyncio.gather(*pool.warm(["pop"]))
+        tracks = await pool.sample("pop", 5)
+
+    assert [t.image for t in tracks if t.image] == ["http://img"]
+    snapshot = pool._pool("pop")
+    assert not snapshot.complete
+    assert snapshot.age > 3000
+
+def test_genre_route_answers_unknown_tags_from_one_page(client, test_db):
+    with patch('routes.lastfm.get_tracks_by_tags') as mock_genre, \
+         patch('routes.lastfm.genre_pool.page_enricher.track_images', new_callable=AsyncMock) as mock_images:
+        mock_images.side_effect = no_images
+        mock_genre.side_effect = lambda tag, limit, page: page_of(tag, page)
+        first = client.get("/genre/shoegaze revival", params={"limit": 5})
+        second = client.get("/genre/shoegaze revival", params={"limit": 5})
+
+    assert first.status_code == 200
+    assert len(first.json()) == len(second.json()) == 5
+    assert [call.args[2] for call in mock_genre.call_args_list] == [1, 1]
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import pytest
+import httpx
+from unittest.mock import patch
+from utils.http_client import UpstreamClients, PROVIDERS
+from deezer_client import search_deezer_track_image
+
+@pytest.mark.asyncio
+async def test_client_is_shared_per_provider():
+    clients = UpstreamClients()
+    deezer = clients.get("deezer")
+    assert clients.get("deezer") is deezer
+    assert clients.get("lastfm") is not deezer
+    assert deezer.timeout.read == PROVIDERS["deezer"].timeout
+
+    await clients.aclose()
+    assert deezer.is_closed
+
+@pytest.mark.asyncio
+async def test_background_deezer_has_own_limiter_only():
+    clients = UpstreamClients()
+    assert clients.get("deezer_background") is clients.get("deezer")
+    assert clients.breakers["deezer_background"] is clients.breakers["deezer"]
+    assert clients.limiters["deezer_background"] is not clients.limiters["deezer"]
+    assert clients.limiters["deezer_background"].max_wait is None
+    assert "deezer_background" not in clients.breaker_stats()
+    await clients.aclose()
+
+@pytest.mark.asyncio
+async def test_background_lookups_use_background_budget():
+    providers = []
+
+    async def fake_request(provider, method, url, **kwargs):
+        providers.append(provider)
+        return httpx.Response(200, json={"data": []})
+
+    with patch("deezer_client.request", side_effect=fake_request):
+        await search_deezer_track_image("live song")
+        await search_deezer_track_image("warmup song", background=True)
+
+    assert providers == ["deezer", "deezer_background"]
+
+def test_clients_of_a_running_loop_are_closed_on_loop_change():
+    clients = UpstreamClients()
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever)
+    thread.start()
+    try:
+        async def get_client():
+            return clients.get("deezer")
+        old = asyncio.run_coroutine_threadsafe(get_client(), other_loop).result()
+
+        new = asyncio.run(get_client())
+        assert new is not old
+        deadline = time.time() + 2
+        while not old.is_closed and time.time() < deadline:
+            time.sleep(0.01)
+        assert old.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
+
+def test_clients_of_a_finished_loop_are_reported(caplog):
+    clients = UpstreamClients()
+
+    async def get_client():
+        return clients.get("lastfm")
+
+    old = asyncio.run(get_client())
+    with caplog.at_level("WARNING", logger="utils.http_client"):
+        assert asyncio.run(get_client()) is not old
+    assert "lastfm client of a finished event loop was not closed" in caplog.text
+
+@pytest.mark.asyncio
+async def test_unknown_provider():
+    with pytest.raises(ValueError):
+        UpstreamClients().get("spotify")
+
+@pytest.mark.asyncio
+async def test_deezer_lookups_do_not_block_each_other():
+    async def slow_request(provider, method, url, **kwargs):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"data": [{"album": {"cover_medium": "http://img"}}]})
+
+    with patch("deezer_client.request", side_effect=slow_request):
+        start = time.perf_counter()
+        images = await asyncio.gather(*(search_deezer_track_image(f"song {i}") for i in range(10)))
+        elapsed = time.perf_counter() - start
+
+    assert images == ["http://img"] * 10
+    assert elapsed < 1.0
+
+@pytest.mark.asyncio
+async def test_ai_agent_stream_yields_songs_line_by_line():
+    from ai_agent_client import AIAgentClient
+    from utils.http_client import upstream_clients
+
+    body = (
+        '{"title": "Imagine", "artist": "John Lennon"}\n'
+        '\n'
+        '{"title": "Yesterday", "artist": "The Beatles"}\n'
+    )
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+    client = httpx.AsyncClient(transport=transport)
+
+    with patch.object(upstream_clients, "get", return_value=client):
+        songs = [song async for song in AIAgentClient("http://agent").generate_stream("calm")]
+
+    assert songs == [
+        {"title": "Imagine", "artist": "John Lennon"},
+        {"title": "Yesterday", "artist": "The Beatles"},
+    ]
+    await client.aclose()
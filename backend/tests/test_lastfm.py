@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 def test_get_lastfm_top_tracks(client, test_db):
     with patch('routes.lastfm.get_lastfm_top_tracks') as mock_top_tracks:
@@ -33,6 +33,54 @@ def test_search_tracks(client, test_db):
         assert resp.json()["results"][0]["title"] == "Found Track"
         assert resp.json()["results"][0]["artist"] == "Found Artist"
 
+def test_search_is_answered_from_local_index(client, test_db):
+    from search_index import search_index
+    search_index.add_many(
+        {"title": f"Yellow Submarine {i}", "artist": "The Beatles", "image": "http://img"}
+        for i in range(5)
+    )
+    with patch('routes.lastfm.search_lastfm_tracks') as mock_search:
+        resp = client.get("/search?q=yellow sub")
+
+    assert resp.status_code == 200
+    assert len(resp.json()["results"]) == 5
+    mock_search.assert_not_called()
+
+def test_search_falls_back_to_lastfm_and_keeps_local_matches(client, test_db):
+    from search_index import search_index
+    search_index.add("Local Song", "Local Artist", image="http://local")
+    fallbacks = search_index.upstream_fallbacks
+    with patch('routes.lastfm.search_lastfm_tracks', new_callable=AsyncMock) as mock_search, \
+         patch('routes.lastfm.image_enricher.track_images', new_callable=AsyncMock) as mock_images:
+        mock_search.return_value = [{"name": "Local Song Remix", "artist": "DJ"}]
+        mock_images.return_value = ["http://remix"]
+        resp = client.get("/search?q=local song")
+
+    titles = [t["title"] for t in resp.json()["results"]]
+    assert titles == ["Local Song Remix", "Local Song"]
+    assert search_index.upstream_fallbacks == fallbacks + 1
+
+def test_search_serves_local_matches_when_lastfm_fails(client, test_db):
+    from search_index import search_index
+    search_index.add("Local Song", "Local Artist", image="http://local")
+    with patch('routes.lastfm.search_lastfm_tracks', new_callable=AsyncMock) as mock_search:
+        mock_search.side_effect = Exception("Last.fm down")
+        resp = client.get("/search?q=local song")
+
+    assert resp.status_code == 200
+    assert [t["title"] for t in resp.json()["results"]] == ["Local Song"]
+    assert resp.json()["error"] == "Last.fm down"
+
+    with patch('routes.lastfm.search_lastfm_tracks', new_callable=AsyncMock) as mock_search:
+        mock_search.side_effect = Exception("Last.fm down")
+        resp = client.get("/search?q=nothing known")
+
+    assert resp.json()["results"] == []
+
+def test_search_limit_must_be_positive(client, test_db):
+    assert client.get("/search?q=test&limit=-1").status_code == 422
+    assert client.get("/search?q=test&limit=0").status_code == 422
+
 def test_get_lastfm_top_artists(client, test_db):
     with patch('routes.lastfm.get_lastfm_top_artists') as mock_artists:
         mock_artists.return_value = [{
@@ -0,0 +1,48 @@
+import os
+import sqlite3
+from db.migrate import upgrade_database
+
+
+def test_upgrade_indexes_foreign_keys_and_dedupes_favorites(tmp_path):
+    path = os.path.join(tmp_path, "old.db")
+    # The schema create_all produced before migrations existed
+    upgrade_database(f"sqlite:///{path}", "0001")
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'u', 'u@example.com', 'x')")
+    conn.execute("INSERT INTO playlists (id, name, user_id) VALUES (1, 'p', 1)")
+    conn.executemany(
+        "INSERT INTO user_favorites (user_id, playlist_id) VALUES (?, ?)",
+        [(1, 1), (1, 1), (1, None)],
+    )
+    conn.commit()
+    conn.close()
+
+    upgrade_database(f"sqlite:///{path}")
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT user_id, playlist_id FROM user_favorites").fetchall() == [(1, 1)]
+    primary_key = [row[1] for row in sorted(conn.execute("PRAGMA table_info(user_favorites)"), key=lambda r: r[5]) if row[5]]
+    assert primary_key == ["user_id", "playlist_id"]
+    indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type = 'index'")}
+    assert {"ix_tracks_playlist_id", "ix_playlists_user_id", "ix_user_favorites_playlist_id"} <= indexes
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM tracks WHERE playlist_id = 1").fetchall()
+    assert "ix_tracks_playlist_id" in plan[0][3]
+    conn.close()
+
+
+def test_upgrade_adopts_tables_created_without_migrations(tmp_path):
+    path = os.path.join(tmp_path, "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL, first_name VARCHAR,"
+                 " last_name VARCHAR, email VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL)")
+    conn.execute("INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'kept', 'k@example.com', 'x')")
+    conn.commit()
+    conn.close()
+
+    upgrade_database(f"sqlite:///{path}")
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT username FROM users").fetchall() == [("kept",)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"playlists", "tracks", "user_favorites", "catalog_tracks", "alembic_version"} <= tables
+    conn.close()
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from main import app
+from unittest.mock import patch
 
 def test_create_playlist(client, test_db, auth_headers,create_test_playlist):
     playlist = create_test_playlist()
@@ -85,4 +86,149 @@ def test_unauthorized_access(client, test_db):
             resp = client.get(endpoint)
             
         assert resp.status_code == 401
-        assert resp.json()["detail"] == "Not authenticated"
\ No newline at end of file
+        assert resp.json()["detail"] == "Not authenticated"
+def test_playlist_summaries_include_counts(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    liked = create_test_playlist("Liked", "Has tracks")
+    create_test_playlist("Empty", "No tracks")
+    create_test_track(liked["id"], "Song A")
+    create_test_track(liked["id"], "Song B")
+    client.post(f"/playlist/{liked['id']}/favorite", headers=auth_headers)
+
+    resp = client.get("/playlist/my-playlists", headers=auth_headers)
+    assert resp.status_code == 200
+    summaries = {summary["name"]: summary for summary in resp.json()}
+    assert summaries["Liked"]["track_count"] == 2
+    assert summaries["Liked"]["favorite_count"] == 1
+    assert summaries["Liked"]["is_favorite"] is True
+    assert summaries["Empty"]["track_count"] == 0
+    assert summaries["Empty"]["is_favorite"] is False
+
+    resp = client.get("/playlist/favorites", headers=auth_headers)
+    assert [summary["name"] for summary in resp.json()] == ["Liked"]
+    assert resp.json()[0]["track_count"] == 2
+
+def test_playlist_summaries_use_a_fixed_number_of_queries(client, test_db, auth_headers, create_test_playlist, query_counter):
+    create_test_playlist("First", "One")
+    query_counter.clear()
+    client.get("/playlist/my-playlists", headers=auth_headers)
+    few = len(query_counter)
+
+    for i in range(5):
+        playlist = create_test_playlist(f"More {i}", "Many")
+        client.post(f"/playlist/{playlist['id']}/favorite", headers=auth_headers)
+    query_counter.clear()
+    resp = client.get("/playlist/my-playlists", headers=auth_headers)
+    assert len(resp.json()) == 6
+    assert len(query_counter) == few
+
+def test_get_playlist_reports_tracks_and_favorite(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist("Detail", "With tracks")
+    first = create_test_track(playlist["id"], "Song A")
+    second = create_test_track(playlist["id"], "Song B")
+
+    resp = client.get(f"/playlist/{playlist['id']}", headers=auth_headers)
+    assert resp.status_code == 200
+    assert [track["id"] for track in resp.json()["tracks"]] == [first["id"], second["id"]]
+    assert resp.json()["is_favorite"] is False
+
+    client.post(f"/playlist/{playlist['id']}/favorite", headers=auth_headers)
+    assert client.get(f"/playlist/{playlist['id']}", headers=auth_headers).json()["is_favorite"] is True
+    client.delete(f"/playlist/{playlist['id']}/favorite", headers=auth_headers)
+    assert client.get(f"/playlist/{playlist['id']}", headers=auth_headers).json()["is_favorite"] is False
+
+def test_get_playlist_uses_a_fixed_number_of_queries(client, test_db, auth_headers, create_test_playlist, create_test_track, query_counter):
+    playlist = create_test_playlist("Growing", "Gets more tracks")
+    create_test_track(playlist["id"], "Song 0")
+    query_counter.clear()
+    client.get(f"/playlist/{playlist['id']}", headers=auth_headers)
+    few = len(query_counter)
+
+    for i in range(1, 10):
+        create_test_track(playlist["id"], f"Song {i}")
+    client.post(f"/playlist/{playlist['id']}/favorite", headers=auth_headers)
+    query_counter.clear()
+    resp = client.get(f"/playlist/{playlist['id']}", headers=auth_headers)
+    assert len(resp.json()["tracks"]) == 10
+    assert len(query_counter) == few
+    # Only the authenticated user is read; favoriters are never loaded
+    assert sum("FROM users" in statement for statement in query_counter) == 1
+
+def test_delete_favorited_playlist(client, test_db, auth_headers, create_test_playlist):
+    playlist = create_test_playlist("Loved", "Then deleted")
+    client.post(f"/playlist/{playlist['id']}/favorite", headers=auth_headers)
+
+    assert client.delete(f"/playlist/{playlist['id']}", headers=auth_headers).status_code == 204
+    assert client.get("/playlist/favorites", headers=auth_headers).json() == []
+
+def test_create_playlist_with_tracks(client, test_db, auth_headers, query_counter):
+    tracks = [{"name": f"Song {i}", "artist": "Artist"} for i in range(12)]
+
+    query_counter.clear()
+    resp = client.post("/playlist", json={"name": "Generated", "description": "AI", "tracks": tracks}, headers=auth_headers)
+    assert resp.status_code == 200
+    created = resp.json()
+    assert [track["name"] for track in created["tracks"]] == [f"Song {i}" for i in range(12)]
+    assert all(track["playlist_id"] == created["id"] for track in created["tracks"])
+    assert sum(statement.startswith("INSERT INTO tracks") for statement in query_counter) == 1
+
+    detail = client.get(f"/playlist/{created['id']}", headers=auth_headers).json()
+    assert [track["id"] for track in detail["tracks"]] == [track["id"] for track in created["tracks"]]
+    assert detail == created
+
+def test_create_playlist_is_atomic(client, test_db, auth_headers):
+    tracks = [{"name": "Song", "artist": "Artist"}]
+
+    with patch("db.crud.track.insert", side_effect=Exception("disk full")):
+        resp = client.post("/playlist", json={"name": "Broken", "tracks": tracks}, headers=auth_headers)
+    assert resp.status_code == 500
+    assert client.get("/playlist/my-playlists", headers=auth_headers).json() == []
+
+def test_update_playlist_applies_track_diff(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist()
+    kept = create_test_track(playlist["id"], "Keep")
+    create_test_track(playlist["id"], "Drop")
+
+    tracks = [
+        {"name": "Keep", "artist": "Test Artist", "url": "http://example.com/track"},
+        {"name": "New", "artist": "Test Artist"},
+    ]
+    resp = client.put(f"/playlist/{playlist['id']}", json={"tracks": tracks}, headers=auth_headers)
+    assert resp.status_code == 200
+    updated = resp.json()
+    assert updated["name"] == "Test Playlist"
+    assert [track["name"] for track in updated["tracks"]] == ["Keep", "New"]
+    # Unchanged tracks keep their rows
+    assert updated["tracks"][0]["id"] == kept["id"]
+
+def test_update_playlist_without_tracks_keeps_them(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist()
+    create_test_track(playlist["id"], "Stays")
+
+    resp = client.put(f"/playlist/{playlist['id']}", json={"name": "Renamed"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Renamed"
+    assert [track["name"] for track in resp.json()["tracks"]] == ["Stays"]
+
+def test_update_playlist_keeps_track_order(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist()
+    create_test_track(playlist["id"], "A")
+    create_test_track(playlist["id"], "B")
+
+    tracks = [{"name": name, "artist": "Test Artist", "url": "http://example.com/track"} for name in ("B", "A")]
+    resp = client.put(f"/playlist/{playlist['id']}", json={"tracks": tracks}, headers=auth_headers)
+    assert [track["name"] for track in resp.json()["tracks"]] == ["B", "A"]
+    detail = client.get(f"/playlist/{playlist['id']}", headers=auth_headers).json()
+    assert [track["name"] for track in detail["tracks"]] == ["B", "A"]
+
+def test_update_playlist_indexes_new_tracks(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist()
+    create_test_track(playlist["id"], "Old")
+
+    tracks = [
+        {"name": "Brand New", "artist": "Test Artist"},
+        {"name": "Old", "artist": "Test Artist", "url": "http://example.com/track"},
+    ]
+    with patch("routes.playlist.search_index") as index:
+        client.put(f"/playlist/{playlist['id']}", json={"tracks": tracks}, headers=auth_headers)
+    indexed = list(index.add_many.call_args.args[0])
+    assert indexed == [{"title": "Brand New", "artist": "Test Artist"}]
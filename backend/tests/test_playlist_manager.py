@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from playlist_manager import PlaylistService
+from schemas.track import LLMResponseItem, Track
+
+class FakeLastFM:
+    def __init__(self, delays, fail=()):
+        self.delays = delays
+        self.fail = fail
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def search_tracks(self, title, artist):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(title, 0.01))
+            if title in self.fail:
+                raise Exception("Last.fm error")
+            return Track(title=title, artist=artist)
+        finally:
+            self.in_flight -= 1
+
+def make_service(fake, **kwargs):
+    service = PlaylistService(**kwargs)
+    service.lastfm = fake
+    return service
+
+@pytest.mark.asyncio
+async def test_resolution_keeps_llm_order():
+    fake = FakeLastFM({"First": 0.1, "Second": 0.05, "Third": 0.01})
+    service = make_service(fake)
+    songs = [LLMResponseItem(title=t, artist="Artist") for t in ["First", "Second", "Third"]]
+
+    playlist = await service.generate_playlist_from_llm_response(songs)
+    assert [t.title for t in playlist] == ["First", "Second", "Third"]
+
+@pytest.mark.asyncio
+async def test_resolution_respects_concurrency_cap():
+    fake = FakeLastFM({})
+    service = make_service(fake, max_concurrency=3)
+    songs = [LLMResponseItem(title=f"Song {i}", artist="Artist") for i in range(12)]
+
+    playlist = await service.generate_playlist_from_llm_response(songs)
+    assert len(playlist) == 12
+    assert fake.max_in_flight == 3
+
+@pytest.mark.asyncio
+async def test_failed_and_slow_songs_are_dropped():
+    fake = FakeLastFM({"Slow": 1.0}, fail={"Broken"})
+    service = make_service(fake, song_timeout=0.1)
+    songs = [LLMResponseItem(title=t, artist="Artist") for t in ["Good", "Slow", "Broken", "Fine"]]
+
+    playlist = await service.generate_playlist_from_llm_response(songs)
+    assert [t.title for t in playlist] == ["Good", "Fine"]
+
+@pytest.mark.asyncio
+async def test_streamed_songs_resolve_while_llm_is_generating():
+    fake = FakeLastFM({})
+    service = make_service(fake)
+    resolved_before_llm_finished = []
+
+    async def llm_stream():
+        for title in ["One", "Two", "Three"]:
+            yield LLMResponseItem(title=title, artist="Artist")
+            await asyncio.sleep(0.05)
+        resolved_before_llm_finished.extend(seen)
+
+    seen = []
+    async for index, track in service.iter_playlist_from_llm_response(llm_stream()):
+        seen.append((index, track.title))
+
+    assert seen == [(0, "One"), (1, "Two"), (2, "Three")]
+    assert len(resolved_before_llm_finished) == 3
@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from quiz_playlists import QuizPlaylistStore, quiz_key, quiz_matrix
+from schemas import QuizRequest
+from schemas.track import Track
+
+def quiz(**overrides):
+    data = {
+        "mood": "happy",
+        "activity": "party",
+        "preferred_genres": ["Pop", "Rock"],
+        "decade": "90s",
+        "discovery_mode": "mix",
+    }
+    data.update(overrides)
+    return QuizRequest(**data)
+
+def playlist(name):
+    return [Track(title=f"{name} {i}", artist="Artist") for i in range(3)]
+
+def test_quiz_key_ignores_genre_order_and_case():
+    assert quiz_key(quiz(preferred_genres=["rock", "POP"])) == quiz_key(quiz())
+    assert quiz_key(quiz(mood="sleepy")) != quiz_key(quiz())
+
+def test_matrix_covers_every_single_genre_combination():
+    combos = list(quiz_matrix())
+    assert len(combos) == 5 * 5 * 8 * 5 * 3
+    assert len({quiz_key(c) for c in combos}) == len(combos)
+    # The first options of every question come first
+    assert quiz_key(combos[0]) == "happy|studying|pop|80s|mix"
+
+def test_store_serves_stored_variants():
+    store = QuizPlaylistStore(AsyncMock(), variants=2)
+    assert store.get(quiz()) is None
+
+    store.add(quiz(), playlist("a"))
+    store.add(quiz(), playlist("b"))
+    store.add(quiz(), playlist("c"))
+
+    served = {store.get(quiz())[0].title for _ in range(30)}
+    assert served == {"a 0", "b 0"}
+    assert store.stats()["hits"] == 30
+
+@pytest.mark.asyncio
+async def test_pregenerate_respects_budget_and_prefers_requested_combinations():
+    generate = AsyncMock(side_effect=lambda request: playlist(request.mood))
+    store = QuizPlaylistStore(generate, variants=2)
+    store.get(quiz(mood="sleepy"))
+
+    stored = await store.pregenerate(budget=3, delay=0)
+
+    assert stored == 3
+    assert generate.call_count == 3
+    assert generate.call_args_list[0].args[0].mood == "sleepy"
+    assert store.get(quiz(mood="sleepy")) is not None
+    assert store.stats()["pending_demand"] == 0
+
+@pytest.mark.asyncio
+async def test_pregenerate_stops_after_repeated_failures():
+    generate = AsyncMock(side_effect=Exception("AI service unavailable"))
+    store = QuizPlaylistStore(generate)
+
+    assert await store.pregenerate(budget=50, delay=0) == 0
+    assert generate.call_count == 3
+
+@pytest.mark.asyncio
+async def test_pregenerate_skips_keys_completed_by_live_requests():
+    store = QuizPlaylistStore(None, variants=1)
+
+    async def generate(request):
+        # A live request completes the other demanded key meanwhile
+        store.add(quiz(mood="calm"), playlist("live"))
+        return playlist(request.mood)
+
+    store.generate = generate
+    store.get(quiz(mood="sleepy"))
+    store.get(quiz(mood="sleepy"))
+    store.get(quiz(mood="calm"))
+
+    assert await store.pregenerate(budget=2, delay=0) == 2
+    assert store.get(quiz(mood="calm"))[0].title == "live 0"
+    assert store.stats()["pending_demand"] == 0
+
+@pytest.mark.asyncio
+async def test_background_pregeneration_survives_errors():
+    store = QuizPlaylistStore(AsyncMock())
+    runs = []
+
+    async def failing_run():
+        runs.append(1)
+        raise KeyError("boom")
+
+    with patch.object(store, "pregenerate", failing_run):
+        store.start(interval=0.01)
+        await asyncio.sleep(0.05)
+        assert len(runs) > 1
+        assert not store._task.done()
+        await store.stop()
+
+def test_quiz_route_answers_from_store(client, test_db):
+    from routes.ai import quiz_store
+    quiz_store.add(quiz(), playlist("stored"))
+
+    with patch("ai_agent_client.AIAgentClient.generate", new_callable=AsyncMock) as mock_ai:
+        response = client.post("/ai/playlist-from-quiz", json=quiz().model_dump())
+
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "stored 0"
+    mock_ai.assert_not_called()
+
+def test_quiz_stream_answers_from_store(client, test_db):
+    import json
+    from routes.ai import quiz_store
+    quiz_store.add(quiz(), playlist("stored"))
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream") as mock_stream:
+        response = client.post("/ai/playlist-from-quiz/stream", json=quiz().model_dump())
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["track"]["title"] for e in events if e["event"] == "track"] == ["stored 0", "stored 1", "stored 2"]
+    assert events[-1] == {"event": "summary", "requested": 3, "resolved": 3, "dropped": 0}
+    mock_stream.assert_not_called()
+
+def test_quiz_stream_stores_resolved_playlist(client, test_db):
+    from routes.ai import quiz_store
+
+    async def fake_stream(self, prompt):
+        for title in ["First", "Second"]:
+            yield {"title": title, "artist": "Artist"}
+
+    async def fake_search(title, artist):
+        return Track(title=title, artist=artist)
+
+    with patch("ai_agent_client.AIAgentClient.generate_stream", fake_stream), \
+         patch("lastfm_client.LastFMClient.search_tracks", side_effect=fake_search):
+        response = client.post("/ai/playlist-from-quiz/stream", json=quiz().model_dump())
+
+    assert response.status_code == 200
+    assert [t.title for t in quiz_store.get(quiz())] == ["First", "Second"]
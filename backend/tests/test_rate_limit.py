@@ -0,0 +1,119 @@
+import asyncio
+import time
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from utils.rate_limit import TokenBucket, RateLimitExceeded, retry_after_seconds
+from utils.http_client import request, upstream_clients
+
+@pytest.mark.asyncio
+async def test_bucket_queues_requests_instead_of_failing():
+    bucket = TokenBucket(rate=20, burst=2, max_wait=1.0)
+    start = time.perf_counter()
+    await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+    elapsed = time.perf_counter() - start
+
+    # 2 from the burst, then 4 more at 20/s
+    assert 0.15 < elapsed < 0.5
+    assert bucket.stats()["throttled"] == 4
+    assert bucket.stats()["queue_depth"] == 0
+
+@pytest.mark.asyncio
+async def test_bucket_rejects_after_max_wait():
+    bucket = TokenBucket(rate=1, burst=1, max_wait=0.1)
+    await bucket.acquire()
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire()
+    assert bucket.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_bucket_without_max_wait_never_rejects():
+    bucket = TokenBucket(rate=20, burst=1, max_wait=None)
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert bucket.stats()["rejected"] == 0
+    assert bucket.stats()["throttled"] == 4
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+
+@pytest.mark.asyncio
+async def test_request_retries_throttled_responses():
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.05"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"ok": True}),
+    ]
+    client = upstream_clients.get("lastfm")
+    with patch.object(client, "request", new_callable=AsyncMock, side_effect=responses) as mock_request, \
+         patch("utils.http_client.settings.UPSTREAM_BACKOFF_BASE", 0.01):
+        response = await request("lastfm", "GET", "http://example.com")
+
+    assert response.status_code == 200
+    assert mock_request.call_count == 3
+
+@pytest.mark.asyncio
+async def test_request_gives_up_after_max_retries():
+    client = upstream_clients.get("deezer")
+    with patch.object(client, "request", new_callable=AsyncMock, return_value=httpx.Response(502)) as mock_request, \
+         patch("utils.http_client.settings.UPSTREAM_BACKOFF_BASE", 0.01):
+        response = await request("deezer", "GET", "http://example.com")
+
+    assert response.status_code == 502
+    assert mock_request.call_count == upstream_clients.providers["deezer"].max_retries + 1
+
+@pytest.mark.asyncio
+async def test_long_retry_after_is_not_waited_out():
+    client = upstream_clients.get("youtube")
+    throttled = httpx.Response(429, headers={"Retry-After": "3600"})
+    with patch.object(client, "request", new_callable=AsyncMock, return_value=throttled) as mock_request:
+        response = await request("youtube", "GET", "http://example.com")
+
+    assert response.status_code == 429
+    assert mock_request.call_count == 1
+    upstream_clients.limiters["youtube"].paused_until = 0
+
+@pytest.mark.asyncio
+async def test_deezer_quota_error_is_treated_as_throttling():
+    quota = {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 4}}
+    responses = [httpx.Response(200, json=quota), httpx.Response(200, json={"data": []})]
+    client = upstream_clients.get("deezer")
+    live, background = upstream_clients.limiters["deezer"], upstream_clients.limiters["deezer_background"]
+    pauses = live.pauses, background.pauses
+    with patch.object(client, "request", new_callable=AsyncMock, side_effect=responses) as mock_request, \
+         patch("utils.http_client.settings.UPSTREAM_BACKOFF_BASE", 0.01):
+        response = await request("deezer", "GET", "http://example.com")
+
+    assert response.json() == {"data": []}
+    assert mock_request.call_count == 2
+    # Both Deezer budgets share the quota, so both are paused
+    assert (live.pauses, background.pauses) == (pauses[0] + 1, pauses[1] + 1)
+
+@pytest.mark.asyncio
+async def test_youtube_quota_pauses_the_limiter():
+    quota = {"error": {"code": 403, "errors": [{"reason": "quotaExceeded"}]}}
+    client = upstream_clients.get("youtube")
+    try:
+        with patch.object(client, "request", new_callable=AsyncMock,
+                          return_value=httpx.Response(403, json=quota)) as mock_request:
+            response = await request("youtube", "GET", "http://example.com")
+            assert response.status_code == 403
+            # Later calls fail fast instead of reaching Google
+            with pytest.raises(RateLimitExceeded):
+                await request("youtube", "GET", "http://example.com")
+        assert mock_request.call_count == 1
+    finally:
+        upstream_clients.limiters["youtube"].paused_until = 0
+
+def test_throttled_ai_agent_returns_503(client, test_db):
+    throttled = httpx.HTTPStatusError(
+        "Too Many Requests",
+        request=httpx.Request("POST", "http://ai_agent:8003/generate"),
+        response=httpx.Response(429, headers={"Retry-After": "30"}),
+    )
+    with patch("ai_agent_client.AIAgentClient.generate", new_callable=AsyncMock, side_effect=throttled):
+        resp = client.post("/ai/playlist-from-prompt", json={"prompt": "some music"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "30"
@@ -0,0 +1,67 @@
+import threading
+import time
+from search_index import TrackSearchIndex, fts_query
+
+def make_index(tmp_path):
+    return TrackSearchIndex(str(tmp_path / "search.db"))
+
+def test_fts_query_matches_words_as_prefixes():
+    assert fts_query("Bohemian Rhaps") == '"bohemian"* "rhaps"*'
+    assert fts_query('"; DROP') == '"drop"*'
+    assert fts_query("!!") is None
+
+def test_prefix_search_over_title_and_artist(tmp_path):
+    index = make_index(tmp_path)
+    index.add_many([
+        {"title": "Bohemian Rhapsody", "artist": "Queen"},
+        {"title": "Radio Ga Ga", "artist": "Queen"},
+        {"title": "Rhapsody in Blue", "artist": "George Gershwin"},
+    ])
+
+    assert [t["title"] for t in index.search("rhaps queen")] == ["Bohemian Rhapsody"]
+    assert {t["title"] for t in index.search("que")} == {"Bohemian Rhapsody", "Radio Ga Ga"}
+    assert index.search("Beyoncé") == []
+
+def test_tracks_are_deduplicated_and_keep_their_image(tmp_path):
+    index = make_index(tmp_path)
+    index.add("Imagine", "John Lennon", image="http://img")
+    index.add("imagine", "JOHN LENNON")
+
+    results = index.search("imagine")
+    assert results == [{"title": "Imagine", "artist": "John Lennon", "image": "http://img"}]
+
+def test_saved_tracks_rank_higher(tmp_path):
+    index = make_index(tmp_path)
+    index.add("Love Song", "Artist A")
+    index.add("Love Song", "Artist B", saved=True)
+    index.add("Love Song", "Artist B", saved=True)
+
+    assert index.search("love song")[0]["artist"] == "Artist B"
+
+def test_rebuild_from_several_workers_is_idempotent(tmp_path):
+    # Two workers sharing one index file rebuild it at the same time
+    workers = [make_index(tmp_path), make_index(tmp_path)]
+    workers[0].add("Stale Song", "Gone", saved=True)
+    tracks = [{"title": f"Song {i}", "artist": "Artist", "image": None} for i in range(500)]
+    saved = [{"title": "Song 1", "artist": "Artist", "saves": 3}]
+
+    threads = [threading.Thread(target=w.rebuild, args=(tracks, saved)) for w in workers * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = workers[0]
+    assert index.stats()["size"] == 500
+    assert index.search("stale") == []
+    saves = index._conn.execute("SELECT saves FROM search_tracks WHERE key = 'song 1|artist'").fetchone()
+    assert saves == (3,)
+
+def test_local_search_is_fast(tmp_path):
+    index = make_index(tmp_path)
+    index.add_many({"title": f"Song {i}", "artist": f"Artist {i % 500}"} for i in range(20000))
+
+    start = time.perf_counter()
+    for _ in range(100):
+        index.search("artist 42 song", 10)
+    assert (time.perf_counter() - start) / 100 < 0.01
@@ -0,0 +1,71 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from utils.singleflight import SingleFlight, singleflight
+from deezer_client import search_deezer_track_image, deezer_flight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request():
+    group = SingleFlight("test")
+    calls = 0
+
+    @singleflight(group)
+    async def fetch(tag):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [tag]
+
+    results = await asyncio.gather(*(fetch("rock") for _ in range(20)), fetch("jazz"))
+    assert results[0] == ["rock"] and results[-1] == ["jazz"]
+    assert calls == 2
+    assert group.stats() == {"calls": 2, "coalesced": 19, "in_flight": 0}
+
+    # Once the request is done, the next call goes upstream again
+    await fetch("rock")
+    assert calls == 3
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_remembered():
+    group = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise Exception("Last.fm down")
+
+    results = await asyncio.gather(*(group.do("k", failing) for _ in range(3)), return_exceptions=True)
+    assert all(str(r) == "Last.fm down" for r in results)
+    assert group.stats()["calls"] == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_request():
+    group = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    first = asyncio.ensure_future(group.do("k", slow))
+    second = asyncio.ensure_future(group.do("k", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "done"
+
+@pytest.mark.asyncio
+async def test_deezer_lookups_are_coalesced():
+    upstream_calls = 0
+
+    async def slow_request(provider, method, url, **kwargs):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"data": [{"album": {"cover_medium": "http://cover"}}]})
+
+    before = deezer_flight.coalesced
+    with patch("deezer_client.request", side_effect=slow_request):
+        images = await asyncio.gather(*(search_deezer_track_image("Hello Adele") for _ in range(10)))
+
+    assert images == ["http://cover"] * 10
+    assert upstream_calls == 1
+    assert deezer_flight.coalesced - before == 9
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from utils.snapshot import PartialValue, Snapshot
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise Exception("Last.fm down")
+        return [f"chart v{self.calls}"]
+
+@pytest.mark.asyncio
+async def test_first_read_loads_once():
+    loader = Loader()
+    snapshot = Snapshot("test", loader, max_age=60)
+    results = await asyncio.gather(*(snapshot.get() for _ in range(5)))
+    assert results == [["chart v1"]] * 5
+    assert loader.calls == 1
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_served_while_refreshing():
+    loader = Loader()
+    snapshot = Snapshot("test", loader, max_age=60)
+    await snapshot.get()
+    snapshot.updated_at = time.time() - 120
+
+    # Served straight away; the reload has only been scheduled
+    assert await snapshot.get() == ["chart v1"]
+    assert loader.calls == 1
+
+    await snapshot.refresh()
+    assert await snapshot.get() == ["chart v2"]
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_last_good_snapshot():
+    loader = Loader()
+    snapshot = Snapshot("test", loader, max_age=60)
+    await snapshot.get()
+    loader.fail = True
+    snapshot.updated_at = time.time() - 120
+
+    assert await snapshot.get() == ["chart v1"]
+    with pytest.raises(Exception):
+        await snapshot.refresh()
+    assert await snapshot.get() == ["chart v1"]
+    assert snapshot.stats()["last_error"] == "Last.fm down"
+
+@pytest.mark.asyncio
+async def test_partial_load_is_served_but_retried():
+    results = [PartialValue(["partial"], "rate limited", retry_after=5), ["complete"],
+               PartialValue(["partial again"], "rate limited", retry_after=5)]
+
+    async def loader():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    snapshot = Snapshot("test", loader, max_age=60)
+    assert await snapshot.get() == ["partial"]
+    assert 54 < snapshot.age < 56
+    assert snapshot.stats()["last_error"] == "rate limited"
+
+    snapshot.updated_at = time.time() - 120
+    await snapshot.refresh()
+    assert await snapshot.get() == ["complete"]
+
+    # A partial refresh does not replace a complete value
+    await snapshot.refresh()
+    assert await snapshot.get() == ["complete"]
+    assert snapshot.age > 54
+
+def test_top_tracks_served_from_snapshot(client, test_db):
+    with patch('routes.lastfm.get_lastfm_top_tracks') as mock_top_tracks:
+        mock_top_tracks.return_value = [{"name": "Test Track", "artist": {"name": "Test Artist"}}]
+        for _ in range(3):
+            resp = client.get("/lastfm-top-tracks")
+            assert resp.json()["results"][0]["title"] == "Test Track"
+        assert mock_top_tracks.call_count == 1
+
+    # Last.fm going down does not empty the landing page
+    with patch('routes.lastfm.get_lastfm_top_tracks') as mock_top_tracks:
+        mock_top_tracks.side_effect = Exception("API Error")
+        resp = client.get("/lastfm-top-tracks")
+        assert resp.json()["results"][0]["title"] == "Test Track"
@@ -0,0 +1,53 @@
+from unittest.mock import AsyncMock, patch
+from schemas import Artist, Track
+from suggest_index import PrefixIndex, TRACK, ARTIST
+
+def test_prefix_matches_any_word_ranked_by_popularity():
+    index = PrefixIndex.build([
+        (TRACK, "Bohemian Rhapsody", "Queen", 10),
+        (TRACK, "Rhapsody in Blue", "George Gershwin", 50),
+        (ARTIST, None, "Queen", 100),
+        (TRACK, "Radio Ga Ga", "Queen", 5),
+    ])
+
+    assert [s["title"] for s in index.suggest("rhap")] == ["Rhapsody in Blue", "Bohemian Rhapsody"]
+    assert index.suggest("QUE")[0] == {"type": ARTIST, "title": None, "artist": "Queen", "score": 100}
+    assert index.suggest("r", limit=2)[0]["title"] == "Rhapsody in Blue"
+    assert index.suggest("zzz") == []
+
+def test_duplicate_suggestions_accumulate_score():
+    index = PrefixIndex.build([(TRACK, "Imagine", "John Lennon", 1), (TRACK, "imagine", "JOHN LENNON", 1)])
+    index.add(TRACK, "Imagine", "John Lennon", 5)
+
+    assert len(index) == 1
+    assert index.suggest("im")[0]["score"] == 7
+
+def test_incremental_add_invalidates_memoized_prefixes():
+    index = PrefixIndex.build([(TRACK, "Hello", "Adele", 1)])
+    assert len(index.suggest("h")) == 1
+
+    index.add(TRACK, "Help!", "The Beatles", 2)
+    assert [s["title"] for s in index.suggest("h")] == ["Help!", "Hello"]
+
+def test_size_is_bounded_by_popularity():
+    index = PrefixIndex.build([(TRACK, f"Song {i}", "Artist", i) for i in range(10)], max_entries=5)
+    assert len(index) == 5
+
+    index.add(TRACK, "Unpopular", "Artist", 0)
+    index.add(TRACK, "Hit", "Artist", 100)
+
+    assert len(index) == 5
+    assert index.suggest("unpop") == []
+    assert index.suggest("hit")[0]["title"] == "Hit"
+    assert index.suggest("song 5") == []
+    assert index.stats()["keys"] == 4 * 2 + 1
+
+def test_suggest_route_uses_charts(client, test_db):
+    with patch("routes.lastfm.top_tracks_snapshot.get", new_callable=AsyncMock) as tracks, \
+         patch("routes.lastfm.top_artists_snapshot.get", new_callable=AsyncMock) as artists:
+        tracks.return_value = [Track(title="Espresso", artist="Sabrina Carpenter")]
+        artists.return_value = [Artist(name="Taylor Swift", playcount=1, listeners=1, mbid=None,
+                                       url=None, streamable=False, image=None)]
+        resp = client.get("/suggest?q=es")
+        assert resp.json()["results"] == [{"type": "track", "title": "Espresso", "artist": "Sabrina Carpenter"}]
+        assert client.get("/suggest?q=tay").json()["results"][0]["artist"] == "Taylor Swift"
@@ -1,7 +1,8 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from main import app
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 def test_add_track_to_playlist(client, test_db, auth_headers, create_test_playlist, create_test_track):
     playlist = create_test_playlist()
@@ -50,7 +51,7 @@ def test_unauthorized_track_operations(client, test_db):
     assert resp.json()["detail"] == "Not authenticated"
 
 def test_youtube_track_search(client, test_db):
-    with patch('routes.track.search_youtube_video') as mock_search:
+    with patch('youtube_client.search_youtube_video') as mock_search:
         # Mock successful YouTube search with just video_id
         mock_search.return_value = "fJ9rUzIMcZQ"  # Changed to match route's response format
         
@@ -75,3 +76,146 @@ def test_remove_nonexistent_track(client, test_db, auth_headers, create_test_pla
     )
     assert resp.status_code == 404
     assert resp.json()["detail"] == "Track not found in playlist"
+
+def test_youtube_track_is_cached(client, test_db, admin_headers):
+    with patch('youtube_client.search_youtube_video') as mock_search:
+        mock_search.return_value = "fJ9rUzIMcZQ"
+        params = {"track_title": "Bohemian Rhapsody", "artist": "Queen"}
+
+        assert client.get("/track/youtube-track", params=params).json()["video_id"] == "fJ9rUzIMcZQ"
+        same_track = {"track_title": "bohemian rhapsody", "artist": " QUEEN "}
+        assert client.get("/track/youtube-track", params=same_track).json()["video_id"] == "fJ9rUzIMcZQ"
+        assert mock_search.call_count == 1
+
+        # Invalidating the entry forces a fresh lookup
+        resp = client.delete("/track/youtube-cache", params=params, headers=admin_headers)
+        assert resp.status_code == 204
+        client.get("/track/youtube-track", params=params)
+        assert mock_search.call_count == 2
+
+def test_youtube_not_found_is_cached(client, test_db):
+    with patch('youtube_client.search_youtube_video') as mock_search:
+        mock_search.return_value = None
+        params = {"track_title": "Unknown", "artist": "Nobody"}
+
+        assert client.get("/track/youtube-track", params=params).json() == {"error": "Video not found"}
+        assert client.get("/track/youtube-track", params=params).json() == {"error": "Video not found"}
+        assert mock_search.call_count == 1
+
+def test_youtube_errors_are_not_cached(client, test_db):
+    with patch('youtube_client.search_youtube_video') as mock_search:
+        mock_search.side_effect = Exception("Invalid API key or quota exceeded")
+        params = {"track_title": "Bohemian Rhapsody", "artist": "Queen"}
+
+        assert "error" in client.get("/track/youtube-track", params=params).json()
+        assert "error" in client.get("/track/youtube-track", params=params).json()
+        assert mock_search.call_count == 2
+
+def test_invalidate_missing_youtube_cache_entry(client, test_db, admin_headers):
+    resp = client.delete("/track/youtube-cache", params={"track_title": "Nope", "artist": "Nobody"}, headers=admin_headers)
+    assert resp.status_code == 404
+
+def test_invalidate_youtube_cache_requires_admin_key(client, test_db, auth_headers, admin_headers):
+    with patch('routes.track.invalidate_youtube_video', new_callable=AsyncMock) as invalidate:
+        invalidate.return_value = True
+        assert client.delete("/track/youtube-cache").status_code == 401
+        # A signed-in user is not an admin
+        assert client.delete("/track/youtube-cache", headers=auth_headers).status_code == 401
+        resp = client.delete("/track/youtube-cache", headers={"X-Admin-Key": "wrong"})
+        assert resp.status_code == 403
+        assert invalidate.call_count == 0
+
+        assert client.delete("/track/youtube-cache", headers=admin_headers).status_code == 204
+        invalidate.assert_awaited_once_with(None, None)
+
+def test_youtube_batch(client, test_db):
+    async def fake_search(query):
+        if query.startswith("Broken"):
+            raise Exception("YouTube API error: backend error")
+        return None if query.startswith("Unknown") else f"id-{query.split()[0]}"
+
+    with patch('youtube_client.search_youtube_video', side_effect=fake_search):
+        resp = client.post("/track/youtube-tracks", json={"tracks": [
+            {"title": "Yellow", "artist": "Coldplay"},
+            {"title": "Unknown", "artist": "Nobody"},
+            {"title": "Broken", "artist": "Nobody"},
+        ]})
+
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["video_id"] for r in results] == ["id-Yellow", None, None]
+    assert results[1]["error"] == "Video not found"
+    assert "backend error" in results[2]["error"]
+
+def test_youtube_batch_stream(client, test_db):
+    with patch('youtube_client.search_youtube_video') as mock_search:
+        mock_search.return_value = "abc123"
+        resp = client.post("/track/youtube-tracks?stream=true", json={"tracks": [
+            {"title": "Yellow", "artist": "Coldplay"},
+            {"title": "Fix You", "artist": "Coldplay"},
+        ]})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["video_id"] == "abc123" for line in lines)
+
+def test_playlist_youtube_batch(client, test_db, auth_headers, create_test_playlist, create_test_track):
+    playlist = create_test_playlist()
+    create_test_track(playlist["id"], name="Yellow", artist="Coldplay")
+    create_test_track(playlist["id"], name="Clocks", artist="Coldplay")
+
+    with patch('youtube_client.search_youtube_video') as mock_search:
+        mock_search.return_value = "abc123"
+        resp = client.get(f"/track/{playlist['id']}/youtube-tracks", headers=auth_headers)
+
+    assert resp.status_code == 200
+    assert [r["title"] for r in resp.json()["results"]] == ["Yellow", "Clocks"]
+
+def test_youtube_batch_too_large(client, test_db):
+    tracks = [{"title": f"Song {i}", "artist": "Artist"} for i in range(101)]
+    resp = client.post("/track/youtube-tracks", json={"tracks": tracks})
+    assert resp.status_code == 422
+
+
+def test_add_tracks_in_batch(client, test_db, auth_headers, create_test_playlist):
+    playlist = create_test_playlist()
+    tracks = [{"name": f"Song {i}", "artist": "Batch Artist"} for i in range(12)]
+
+    resp = client.post(f"/track/{playlist['id']}/tracks/batch", json={"tracks": tracks}, headers=auth_headers)
+    assert resp.status_code == 200
+    created = resp.json()
+    assert [track["name"] for track in created] == [f"Song {i}" for i in range(12)]
+    assert all(track["playlist_id"] == playlist["id"] and track["id"] for track in created)
+
+    detail = client.get(f"/playlist/{playlist['id']}", headers=auth_headers).json()
+    assert [track["id"] for track in detail["tracks"]] == [track["id"] for track in created]
+
+def test_add_tracks_in_batch_is_one_insert(client, test_db, auth_headers, create_test_playlist, query_counter):
+    playlist = create_test_playlist()
+    tracks = [{"name": f"Song {i}", "artist": "Batch Artist"} for i in range(12)]
+
+    query_counter.clear()
+    client.post(f"/track/{playlist['id']}/tracks/batch", json={"tracks": tracks}, headers=auth_headers)
+    assert sum(statement.startswith("INSERT INTO tracks") for statement in query_counter) == 1
+
+def test_add_tracks_in_batch_checks_size_and_ownership(client, test_db, auth_headers, create_test_playlist):
+    playlist = create_test_playlist()
+    too_many = [{"name": f"Song {i}", "artist": "Batch Artist"} for i in range(201)]
+
+    resp = client.post(f"/track/{playlist['id']}/tracks/batch", json={"tracks": too_many}, headers=auth_headers)
+    assert resp.status_code == 422
+    resp = client.post(f"/track/{playlist['id']}/tracks/batch", json={"tracks": []}, headers=auth_headers)
+    assert resp.status_code == 422
+    resp = client.post("/track/999/tracks/batch", json={"tracks": too_many[:1]}, headers=auth_headers)
+    assert resp.status_code == 404
+
+def test_add_tracks_in_batch_is_all_or_nothing(client, test_db, auth_headers, create_test_playlist):
+    playlist = create_test_playlist()
+    tracks = [{"name": "Song", "artist": "Batch Artist"}]
+
+    with patch("db.crud.track.insert", side_effect=Exception("disk full")):
+        resp = client.post(f"/track/{playlist['id']}/tracks/batch", json={"tracks": tracks}, headers=auth_headers)
+    assert resp.status_code == 500
+    assert client.get(f"/playlist/{playlist['id']}", headers=auth_headers).json()["tracks"] == []
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Returned by cache lookups on a miss, so that a cached None (a known
+# "not found" result) can be told apart from an absent entry.
+MISSING = object()
+
+_registry: List["TieredCache"] = []
+
+
+def normalize_query(*parts: str) -> str:
+    """Normalize free-text lookup keys: case, Unicode width, punctuation and spacing."""
+    text = " ".join(part or "" for part in parts)
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class LRUCache:
+    """In-process LRU cache with per-entry TTL and a hard size bound."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteCache:
+    """
+    Persistent key/value store on a local SQLite file. WAL mode lets every
+    uvicorn worker on the host read and write the same file concurrently.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, namespace: str, path: str = None):
+        self.namespace = namespace
+        self.path = path or settings.CACHE_DB_PATH
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=2000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def get(self, key: str) -> tuple:
+        """Return (value, expires_at) or MISSING."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+        return cursor.rowcount > 0
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class TieredCache:
+    """
+    Memory-then-disk cache for JSON-serializable values. Lookups hit the
+    LRU layer first and fall back to SQLite, promoting disk hits into memory.
+    """
+
+    def __init__(self, namespace: str, ttl: float, maxsize: int = 1024,
+                 negative_ttl: float = None, path: str = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(namespace, path=path)
+        _registry.append(self)
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        try:
+            entry = self.disk.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"{self.namespace} cache read failed: {str(e)}")
+            return MISSING
+        if entry is MISSING:
+            return MISSING
+        value, expires_at = entry
+        self.memory.set(key, value, ttl=expires_at - time.time())
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        """Store a value; None is cached with the shorter negative TTL."""
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        self.memory.set(key, value, ttl=ttl)
+        try:
+            self.disk.set(key, value, time.time() + ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"{self.namespace} cache write failed: {str(e)}")
+
+    def delete(self, key: str) -> bool:
+        in_memory = self.memory.delete(key)
+        on_disk = self.disk.delete(key)
+        return in_memory or on_disk
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"memory": self.memory.stats(), "disk": self.disk.stats()}
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {cache.namespace: cache.stats() for cache in _registry}
+
+
+def clear_caches():
+    for cache in _registry:
+        cache.clear()
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
+from typing import List
 
 load_dotenv()
 
@@ -8,6 +9,106 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Shared secret for admin-only endpoints (X-Admin-Key header); unset disables them
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./backend.db")
+    # Connection pool for PostgreSQL (SQLite connections are not pooled this way)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_ECHO: bool = False
 
-settings = Settings()
\ No newline at end of file
+    # Upstream HTTP clients (seconds / connection counts per provider)
+    LASTFM_TIMEOUT: float = 5.0
+    LASTFM_MAX_CONNECTIONS: int = 20
+    DEEZER_TIMEOUT: float = 3.0
+    DEEZER_MAX_CONNECTIONS: int = 50
+    YOUTUBE_TIMEOUT: float = 5.0
+    YOUTUBE_MAX_CONNECTIONS: int = 10
+    AI_AGENT_URL: str = "http://ai_agent:8003"
+    AI_AGENT_TIMEOUT: float = 60.0
+    AI_AGENT_MAX_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Upstream rate limits (requests per second and burst size per provider)
+    LASTFM_RATE_LIMIT: float = 5.0
+    LASTFM_BURST: int = 10
+    # Deezer allows 50 requests per 5 seconds, split between live lookups
+    # and background enrichment so warming pools cannot starve requests
+    DEEZER_RATE_LIMIT: float = 6.0
+    DEEZER_BURST: int = 30
+    DEEZER_BACKGROUND_RATE_LIMIT: float = 4.0
+    DEEZER_BACKGROUND_BURST: int = 20
+    YOUTUBE_RATE_LIMIT: float = 5.0
+    YOUTUBE_BURST: int = 10
+    AI_AGENT_RATE_LIMIT: float = 0.25  # Gemini free tier: 15 requests per minute
+    AI_AGENT_BURST: int = 15
+    RATE_LIMIT_MAX_WAIT: float = 2.0
+    AI_AGENT_RATE_LIMIT_MAX_WAIT: float = 10.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    AI_AGENT_MAX_RETRIES: int = 1
+    UPSTREAM_BACKOFF_BASE: float = 0.2
+    UPSTREAM_BACKOFF_MAX: float = 5.0
+    # Pause after YouTube reports its daily quota as spent
+    YOUTUBE_QUOTA_PAUSE: float = 3600.0
+
+    # Circuit breakers: consecutive failures before opening, seconds before a probe
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_TIMEOUT: float = 30.0
+
+    # AI playlist track resolution
+    PLAYLIST_RESOLVE_CONCURRENCY: int = 6
+    PLAYLIST_RESOLVE_TIMEOUT: float = 8.0
+
+    # Deezer image enrichment for browse pages
+    ENRICHMENT_CONCURRENCY: int = 20
+    ENRICHMENT_DEADLINE: float = 4.0
+
+    # Resolved track metadata kept in our own database
+    CATALOG_MAX_AGE: float = 90 * 24 * 3600
+    # Minimum similarity for an LLM suggestion to be matched to a known track
+    FUZZY_MATCH_THRESHOLD: float = 0.8
+    # ...and for its title alone, so other songs by the same artist never match
+    FUZZY_MATCH_MIN_TITLE_SIMILARITY: float = 0.9
+    FUZZY_MATCH_MAX_TRACKS: int = 20000
+    # /search answers locally when the index has at least this many matches
+    SEARCH_MIN_LOCAL_RESULTS: int = 5
+    # Typeahead index, rebuilt from charts, genre pools and saved tracks
+    SUGGEST_MAX_ENTRIES: int = 50000
+    SUGGEST_INDEX_MAX_AGE: float = 15 * 60
+
+    # Local caches (SQLite file shared by all workers on the host)
+    CACHE_DB_PATH: str = "./cache.db"
+    IMAGE_CACHE_TTL: float = 7 * 24 * 3600
+    IMAGE_CACHE_NEGATIVE_TTL: float = 6 * 3600
+    IMAGE_CACHE_MAXSIZE: int = 5000
+    YOUTUBE_CACHE_TTL: float = 30 * 24 * 3600
+    YOUTUBE_CACHE_NEGATIVE_TTL: float = 24 * 3600
+    YOUTUBE_CACHE_MAXSIZE: int = 5000
+    YOUTUBE_BATCH_CONCURRENCY: int = 5
+
+    # Background-refreshed browse data
+    WARM_CACHES_ON_STARTUP: bool = True
+    CHART_SNAPSHOT_MAX_AGE: float = 15 * 60
+    GENRE_POOL_PAGES: int = 5
+    GENRE_POOL_PAGE_SIZE: int = 50
+    GENRE_POOL_MAX_AGE: float = 6 * 3600
+    GENRE_POOL_MAX_TAGS: int = 50
+    # Snapshot enrichment runs in the background: a longer deadline, and a
+    # snapshot with failed lookups is reloaded after the retry delay
+    BACKGROUND_ENRICH_DEADLINE: float = 30.0
+    SNAPSHOT_RETRY_AFTER: float = 60.0
+    # Genres shown on the home page
+    GENRE_WARMUP_TAGS: List[str] = ["pop", "rock", "jazz", "classical", "electronic", "hip-hop"]
+
+    # Pre-generated quiz playlists
+    QUIZ_PLAYLIST_VARIANTS: int = 3
+    QUIZ_PLAYLIST_TTL: float = 7 * 24 * 3600
+    QUIZ_PLAYLIST_MAXSIZE: int = 2000
+    QUIZ_PREGENERATE_ON_STARTUP: bool = True
+    QUIZ_PREGENERATE_BUDGET: int = 100  # LLM calls per run
+    QUIZ_PREGENERATE_DELAY: float = 5.0  # seconds between LLM calls
+    QUIZ_PREGENERATE_INTERVAL: float = 24 * 3600
+
+settings = Settings()
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import httpx
+from .config import settings
+from .circuit_breaker import CircuitBreaker
+from .rate_limit import TokenBucket, backoff_delay, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    timeout: float
+    max_connections: int
+    rate: float
+    burst: int
+    max_wait: Optional[float] = settings.RATE_LIMIT_MAX_WAIT
+    max_retries: int = settings.UPSTREAM_MAX_RETRIES
+    # Use the client and circuit breaker of another provider, with own rate limiter
+    shares: Optional[str] = None
+    # Recognizes throttling reported without a 429 (e.g. a quota error in the body)
+    is_throttled: Optional[Callable[[httpx.Response], bool]] = None
+    # Pause after such a response; None backs off like a 429 without Retry-After
+    throttle_pause: Optional[float] = None
+
+
+DEEZER_QUOTA_ERROR = 4
+YOUTUBE_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+def _json_error(response: httpx.Response) -> Dict[str, Any]:
+    try:
+        data = response.json()
+    except ValueError:
+        return {}
+    error = data.get("error") if isinstance(data, dict) else None
+    return error if isinstance(error, dict) else {}
+
+
+def deezer_quota_exceeded(response: httpx.Response) -> bool:
+    """Deezer answers over-quota requests with 200 and error code 4."""
+    return response.status_code == 200 and _json_error(response).get("code") == DEEZER_QUOTA_ERROR
+
+
+def youtube_quota_exceeded(response: httpx.Response) -> bool:
+    """The YouTube Data API answers 403 with reason quotaExceeded once the daily quota is spent."""
+    if response.status_code != 403:
+        return False
+    reasons = {error.get("reason") for error in _json_error(response).get("errors", []) if isinstance(error, dict)}
+    return bool(reasons & YOUTUBE_QUOTA_REASONS)
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    "lastfm": ProviderConfig(
+        settings.LASTFM_TIMEOUT, settings.LASTFM_MAX_CONNECTIONS,
+        settings.LASTFM_RATE_LIMIT, settings.LASTFM_BURST,
+    ),
+    "deezer": ProviderConfig(
+        settings.DEEZER_TIMEOUT, settings.DEEZER_MAX_CONNECTIONS,
+        settings.DEEZER_RATE_LIMIT, settings.DEEZER_BURST,
+        is_throttled=deezer_quota_exceeded,
+    ),
+    # Background image enrichment (chart snapshots, genre pools) queues on
+    # its own Deezer budget without a wait limit, so it neither fails under
+    # load nor takes tokens from live lookups
+    "deezer_background": ProviderConfig(
+        settings.DEEZER_TIMEOUT, settings.DEEZER_MAX_CONNECTIONS,
+        settings.DEEZER_BACKGROUND_RATE_LIMIT, settings.DEEZER_BACKGROUND_BURST,
+        max_wait=None, shares="deezer", is_throttled=deezer_quota_exceeded,
+    ),
+    "youtube": ProviderConfig(
+        settings.YOUTUBE_TIMEOUT, settings.YOUTUBE_MAX_CONNECTIONS,
+        settings.YOUTUBE_RATE_LIMIT, settings.YOUTUBE_BURST,
+        # The quota resets daily: stop calling instead of retrying
+        is_throttled=youtube_quota_exceeded, throttle_pause=settings.YOUTUBE_QUOTA_PAUSE,
+    ),
+    "ai_agent": ProviderConfig(
+        settings.AI_AGENT_TIMEOUT, settings.AI_AGENT_MAX_CONNECTIONS,
+        settings.AI_AGENT_RATE_LIMIT, settings.AI_AGENT_BURST,
+        max_wait=settings.AI_AGENT_RATE_LIMIT_MAX_WAIT,
+        max_retries=settings.AI_AGENT_MAX_RETRIES,
+    ),
+}
+
+
+class UpstreamClients:
+    """
+    One pooled httpx.AsyncClient per upstream provider, shared for the
+    lifetime of the application so connections are kept alive between calls.
+    """
+
+    def __init__(self, providers: Dict[str, ProviderConfig] = PROVIDERS):
+        self.providers = providers
+        self.limiters: Dict[str, TokenBucket] = {
+            name: TokenBucket(config.rate, config.burst, config.max_wait)
+            for name, config in providers.items()
+        }
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RECOVERY_TIMEOUT)
+            for name, config in providers.items() if not config.shares
+        }
+        for name, config in providers.items():
+            if config.shares:
+                self.breakers[name] = self.breakers[config.shares]
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        config = self.providers[provider]
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        if provider not in self.providers:
+            raise ValueError(f"Unknown upstream provider: {provider}")
+        provider = self.providers[provider].shares or provider
+
+        # Pooled connections are bound to the loop that opened them. Under
+        # uvicorn there is a single loop; short-lived loops (e.g. the test
+        # client) get a fresh set of clients, and the old ones are released.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._release(self._clients, self._loop)
+            self._clients = {}
+            self._loop = loop
+
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build(provider)
+            self._clients[provider] = client
+        return client
+
+    @staticmethod
+    def _release(clients: Dict[str, httpx.AsyncClient], loop: Optional[asyncio.AbstractEventLoop]):
+        """Close clients left on another event loop, or report them if that loop is gone."""
+        for provider, client in clients.items():
+            if client.is_closed:
+                continue
+            if loop is not None and loop.is_running():
+                # Their connections can only be closed on the loop that owns them
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                logger.warning(
+                    f"{provider} client of a finished event loop was not closed; its connections are leaked"
+                )
+
+    def pause(self, provider: str, seconds: float):
+        """Pause the provider's limiter and those of providers sharing its upstream."""
+        upstream = self.providers[provider].shares or provider
+        for name, config in self.providers.items():
+            if (config.shares or name) == upstream:
+                self.limiters[name].pause(seconds)
+
+    def is_throttled(self, provider: str, response: httpx.Response) -> bool:
+        check = self.providers[provider].is_throttled
+        return response.status_code == 429 or (check is not None and check(response))
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for provider, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing {provider} client: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        return {
+            name: breaker.stats() for name, breaker in self.breakers.items()
+            if not self.providers[name].shares
+        }
+
+
+upstream_clients = UpstreamClients()
+
+
+async def request(provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared client of the given provider.
+
+    Calls to a provider whose circuit is open fail immediately with
+    CircuitOpenError so callers can fall back without waiting. Otherwise
+    requests wait for the provider's rate limiter, and 429/5xx responses or
+    transport errors are retried with jittered exponential backoff,
+    honouring Retry-After when the provider sends one.
+    """
+    breaker = upstream_clients.breakers[provider]
+    breaker.before_call()
+    try:
+        response = await _send(provider, method, url, **kwargs)
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # Rate limiter rejections and cancellations say nothing about the provider
+        breaker.release()
+        raise
+    if response.status_code in RETRY_STATUSES or upstream_clients.is_throttled(provider, response):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+@asynccontextmanager
+async def stream(provider: str, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    Streaming counterpart of request(): same circuit breaker and rate
+    limiter, but the body is read incrementally by the caller and the
+    request is not retried.
+    """
+    breaker = upstream_clients.breakers[provider]
+    breaker.before_call()
+    try:
+        await upstream_clients.limiters[provider].acquire()
+        client = upstream_clients.get(provider)
+        async with client.stream(method, url, **kwargs) as response:
+            if response.status_code in RETRY_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            yield response
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    finally:
+        breaker.release()
+
+
+async def _send(provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+    client = upstream_clients.get(provider)
+    limiter = upstream_clients.limiters[provider]
+    config = upstream_clients.providers[provider]
+    max_retries = config.max_retries
+
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        last_attempt = attempt == max_retries
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            delay = backoff_delay(attempt, settings.UPSTREAM_BACKOFF_BASE, settings.UPSTREAM_BACKOFF_MAX)
+        else:
+            throttled = upstream_clients.is_throttled(provider, response)
+            if (response.status_code not in RETRY_STATUSES and not throttled) or last_attempt:
+                return response
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            if retry_after is None and throttled and response.status_code != 429:
+                retry_after = config.throttle_pause
+            if retry_after is not None and retry_after > settings.UPSTREAM_BACKOFF_MAX:
+                # Not worth holding the caller; let it see the throttled response
+                if throttled:
+                    upstream_clients.pause(provider, retry_after)
+                return response
+            if retry_after is None:
+                delay = backoff_delay(attempt, settings.UPSTREAM_BACKOFF_BASE, settings.UPSTREAM_BACKOFF_MAX)
+            else:
+                delay = retry_after
+            if throttled:
+                upstream_clients.pause(provider, delay)
+            logger.info(f"{provider} returned {response.status_code}{' (throttled)' if throttled else ''}, retrying in {delay:.2f}s")
+
+        limiter.retries += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,101 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to queue longer than the limiter allows."""
+
+
+class TokenBucket:
+    """
+    Token bucket limiter for one upstream provider. Callers queue in FIFO
+    order for up to max_wait seconds before being rejected (or indefinitely
+    when max_wait is None), and a 429 (or another throttling signal) from
+    the provider pauses the whole bucket for the Retry-After period.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: Optional[float]):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.retries = 0
+        self.pauses = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        deadline = None if self.max_wait is None else time.monotonic() + self.max_wait
+        self.waiting += 1
+        try:
+            async with self._get_lock():
+                throttled = False
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+                    if deadline is not None and now + wait > deadline:
+                        self.rejected += 1
+                        raise RateLimitExceeded(f"Rate limit queue wait exceeded {self.max_wait}s")
+                    if not throttled:
+                        self.throttled += 1
+                        throttled = True
+                    await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given time (e.g. after a 429)."""
+        self.pauses += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "queue_depth": self.waiting,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "pauses": self.pauses,
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,57 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+_registry: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the
+    upstream request and every caller that arrives while it is in flight
+    awaits the same result (or exception).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        _registry.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and not future.done() and future.get_loop() is loop:
+            self.coalesced += 1
+            # shield: a cancelled waiter must not cancel the shared request
+            return await asyncio.shield(future)
+
+        task = loop.create_task(fn())
+        self._inflight[key] = task
+        self.calls += 1
+
+        def forget(done_task):
+            if self._inflight.get(key) is done_task:
+                del self._inflight[key]
+
+        task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+def singleflight(group: SingleFlight):
+    """Decorator coalescing concurrent calls of an async function with equal arguments."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            return await group.do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    return {group.name: group.stats() for group in _registry}
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weak so that snapshots dropped by their owner (e.g. evicted genre pools) go away
+_registry: "weakref.WeakSet[Snapshot]" = weakref.WeakSet()
+
+
+class PartialValue(Exception):
+    """
+    Raised by a loader whose value is usable but incomplete (e.g. some
+    lookups were rate limited). The snapshot serves it only if it has
+    nothing complete, and loads again after retry_after seconds.
+    """
+
+    def __init__(self, value: Any, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.value = value
+        self.retry_after = retry_after
+
+
+class Snapshot:
+    """
+    Stale-while-revalidate holder for an expensive, slowly changing value.
+
+    The first read loads the value; afterwards reads always return the
+    current value immediately, and a read older than max_age kicks off one
+    background refresh. A failed refresh keeps the last good value, and a
+    partial one is retried soon instead of being kept for max_age.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[Any]], max_age: float):
+        self.name = name
+        self.loader = loader
+        self.max_age = max_age
+        self.value: Any = None
+        self.updated_at: Optional[float] = None
+        self.complete = False
+        self.last_error: Optional[str] = None
+        self.refreshes = 0
+        self.failures = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        _registry.add(self)
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    async def _load(self):
+        try:
+            value = await self.loader()
+        except PartialValue as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Refreshing {self.name} snapshot was incomplete: {str(e)}")
+            if not self.complete:
+                self.value = e.value
+            # Backdate so the next read after retry_after starts a reload
+            self.updated_at = time.time() - max(self.max_age - e.retry_after, 0)
+            return self.value
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Refreshing {self.name} snapshot failed: {str(e)}")
+            raise
+        self.value = value
+        self.updated_at = time.time()
+        self.complete = True
+        self.last_error = None
+        self.refreshes += 1
+        return value
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, and return its task."""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.get_running_loop().create_task(self._load())
+            # Background refreshes report through last_error; mark the
+            # exception retrieved so it is not logged again by asyncio
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refresh_task = task
+        return task
+
+    async def get(self) -> Any:
+        if self.updated_at is None:
+            # Nothing to serve yet: wait for the (shared) initial load
+            return await asyncio.shield(self.refresh())
+        if self.age > self.max_age:
+            self.refresh()
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.updated_at = None
+        self.complete = False
+        self.last_error = None
+        self._refresh_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "age": self.age,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+def snapshot_stats() -> Dict[str, Dict[str, Any]]:
+    return {snapshot.name: snapshot.stats() for snapshot in list(_registry)}
+
+
+def clear_snapshots():
+    for snapshot in list(_registry):
+        snapshot.reset()
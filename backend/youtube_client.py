@@ -1,13 +1,32 @@
+import asyncio
 import os
-import requests
-from typing import Optional
+import httpx
+from typing import AsyncIterator, List, Optional, Tuple
 from dotenv import load_dotenv
+from catalog import track_catalog
+from utils.cache import MISSING, TieredCache, normalize_query
+from utils.config import settings
+from utils.http_client import request, youtube_quota_exceeded
+from utils.rate_limit import RateLimitExceeded
+from utils.singleflight import SingleFlight
 
 load_dotenv()
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-def search_youtube_video(query: str) -> Optional[str]:
+# search.list costs 100 quota units, so resolved IDs are kept for a long time
+video_cache = TieredCache(
+    "youtube_videos",
+    ttl=settings.YOUTUBE_CACHE_TTL,
+    negative_ttl=settings.YOUTUBE_CACHE_NEGATIVE_TTL,
+    maxsize=settings.YOUTUBE_CACHE_MAXSIZE,
+)
+youtube_flight = SingleFlight("youtube")
+
+def video_cache_key(title: str, artist: str) -> str:
+    return f"{normalize_query(title)}|{normalize_query(artist)}"
+
+async def search_youtube_video(query: str) -> Optional[str]:
     if not YOUTUBE_API_KEY:
         raise Exception("Missing YouTube API key")
 
@@ -20,8 +39,11 @@ def search_youtube_video(query: str) -> Optional[str]:
         "key": YOUTUBE_API_KEY
     }
     try:
-        response = requests.get(url, params=params)
-        
+        response = await request("youtube", "GET", url, params=params)
+
+        if youtube_quota_exceeded(response):
+            # The limiter is paused now, so further searches fail fast
+            raise RateLimitExceeded("YouTube quota exceeded")
         if response.status_code == 403:
             raise Exception("Invalid API key or quota exceeded")
             
@@ -36,6 +58,63 @@ def search_youtube_video(query: str) -> Optional[str]:
             return items[0]["id"]["videoId"]
         return None
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise Exception(f"Network error: {str(e)}")
-    
\ No newline at end of file
+
+async def resolve_youtube_video(title: str, artist: str) -> Optional[str]:
+    """
+    Return the video ID for a track, reading the cache and the track
+    catalog first. Not-found results are cached with a shorter TTL; API
+    errors are not cached.
+    """
+    key = video_cache_key(title, artist)
+    video_id = video_cache.get(key)
+    if video_id is not MISSING:
+        return video_id
+
+    async def search_and_store():
+        entry = await track_catalog.lookup(title, artist, field="youtube_video_id")
+        if entry is not None:
+            video_id = entry["youtube_video_id"]
+        else:
+            video_id = await search_youtube_video(f"{title} {artist}")
+            if video_id:
+                await track_catalog.remember(title, artist, youtube_video_id=video_id)
+        video_cache.set(key, video_id)
+        return video_id
+
+    return await youtube_flight.do(key, search_and_store)
+
+async def resolve_youtube_videos(
+    tracks: List[Tuple[str, str]], max_concurrency: int = None
+) -> AsyncIterator[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Resolve many (title, artist) pairs concurrently, yielding
+    (index, video_id, error) in completion order so callers can start
+    playback before the whole batch is done.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.YOUTUBE_BATCH_CONCURRENCY)
+
+    async def resolve(index: int, title: str, artist: str):
+        async with semaphore:
+            try:
+                video_id = await resolve_youtube_video(title, artist)
+            except Exception as e:
+                return index, None, str(e)
+        return index, video_id, None if video_id else "Video not found"
+
+    tasks = [asyncio.ensure_future(resolve(i, title, artist)) for i, (title, artist) in enumerate(tracks)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def invalidate_youtube_video(title: str = None, artist: str = None) -> bool:
+    """Drop one cached (title, artist) entry, or the whole cache when no track is given."""
+    in_catalog = await track_catalog.forget("youtube_video_id", title, artist)
+    if title is None and artist is None:
+        video_cache.clear()
+        return True
+    return video_cache.delete(video_cache_key(title or "", artist or "")) or in_catalog
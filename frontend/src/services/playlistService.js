@@ -79,7 +79,9 @@ async getPlaylists() {
       name: playlist.name,
       description: playlist.description,
       created_at: playlist.created_at,
-      is_favorite: playlist.is_favorite || false
+      is_favorite: playlist.is_favorite || false,
+      track_count: playlist.track_count || 0,
+      favorite_count: playlist.favorite_count || 0
     }));
   } catch (error) {
     console.error('Error fetching playlists:', error);
@@ -94,7 +96,7 @@ async getPlaylists() {
     }
 
     try {
-      // First create playlist without tracks
+      // The playlist and its tracks are saved together in one request
       const response = await fetch(`${API_BASE_URL}/playlist`, {
         method: 'POST',
         headers: { 
@@ -103,7 +105,12 @@ async getPlaylists() {
         },
         body: JSON.stringify({
           name: playlistData.name,
-          description: playlistData.description
+          description: playlistData.description,
+          tracks: (playlistData.tracks || []).map(track => ({
+            name: track.name || track.title,
+            artist: track.artist,
+            url: track.url || null
+          }))
         })
       });
 
@@ -112,14 +119,7 @@ async getPlaylists() {
         throw new Error(error.detail || 'Failed to create playlist');
       }
 
-      const playlist = await response.json();
-      
-      // Then add tracks using the existing endpoint
-      if (playlistData.tracks && playlistData.tracks.length > 0) {
-        await this.addTracksToPlaylist(playlist.id, playlistData.tracks);
-      }
-
-      return playlist;
+      return response.json();
     } catch (error) {
       console.error('Playlist creation error:', error);
       throw error;
@@ -130,30 +130,27 @@ async addTracksToPlaylist(playlistId, tracks) {
   const token = localStorage.getItem('token');
   
   try {
-    // Add tracks one by one using the track endpoint
-    const addTrackPromises = tracks.map(track => 
-      fetch(`${API_BASE_URL}/track/${playlistId}/tracks`, {
-        method: 'POST',
-        headers: { 
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
-        },
-        body: JSON.stringify({
+    // Add all tracks in one request; the backend saves them in one transaction
+    const response = await fetch(`${API_BASE_URL}/track/${playlistId}/tracks/batch`, {
+      method: 'POST',
+      headers: { 
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${token}`
+      },
+      body: JSON.stringify({
+        tracks: tracks.map(track => ({
           name: track.name || track.title,
           artist: track.artist,
-          url: track.url || null,
-          playlist_id: playlistId 
-        })
-      }).then(response => {
-        if (!response.ok) {
-          throw new Error('Failed to add track');
-        }
-        return response.json();
+          url: track.url || null
+        }))
       })
-    );
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to add tracks');
+    }
 
-    // Wait for all tracks to be added
-    const results = await Promise.all(addTrackPromises);
+    const results = await response.json();
     console.log('Added tracks:', results);
     
     return results;
@@ -190,7 +187,9 @@ async getFavoritePlaylists() {
       name: playlist.name,
       description: playlist.description,
       created_at: playlist.created_at,
-      is_favorite: true // These are favorite playlists, so always true
+      is_favorite: true, // These are favorite playlists, so always true
+      track_count: playlist.track_count || 0,
+      favorite_count: playlist.favorite_count || 0
     }));
   } catch (error) {
     console.error('Error fetching favorite playlists:', error);